@@ -0,0 +1,391 @@
+"""
+Headless NewsGenie: run the graph from the command line, without the UI.
+
+Usage:
+    python -m app query "latest tech news" [--category technology] [--json]
+    python -m app query "explain inflation" --repeat 50 --concurrency 8 --timings
+    python -m app batch -i queries.jsonl -o answers.jsonl [--concurrency 8] [--sessions]
+    python -m app repl [--session ID]
+
+Batch input is one query per line: a JSON object with "query" (and
+optionally "news_category" / "session_id"), a JSON string, or plain text.
+Output lines come back in input order. --timings adds per-query latency
+(and time to first token with --stream); --profile prints per-stage
+latency from telemetry when the run ends. All modes share one compiled
+graph and one event loop.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import sys
+import time
+import uuid
+from collections import deque
+from typing import Callable, Dict, IO, Iterator, List, Optional, Tuple
+
+# Requests a batch keeps in flight or finished-but-unwritten, per unit of
+# concurrency; bounds memory while output stays in input order
+_WINDOW_PER_WORKER = 4
+
+
+def _log(message: str) -> None:
+    # Answers go to stdout; progress and reports go to stderr
+    print(message, file=sys.stderr, flush=True)
+
+
+async def _run_turn(
+    graph,
+    query: str,
+    category: Optional[str] = None,
+    session_id: Optional[str] = None,
+    memory: Optional[Dict] = None,
+    on_token: Optional[Callable[[str], None]] = None,
+    stream: bool = False,
+) -> Tuple[Dict, Dict[str, float]]:
+    """
+    Run one query; return (final state, timings in ms).
+    With session_id the graph restores and saves the session's memory
+    itself; otherwise `memory` (chat_history, history_summary) is passed in.
+    """
+    state: Dict = {"user_query": query, "news_category": category, "stream": stream}
+    if session_id is None:
+        state.update(memory or {"chat_history": []})
+    config = None
+    # Checkpoint once per turn (see app/server.py); only valid with a session
+    options: Dict = {}
+    if session_id:
+        config = {"configurable": {"thread_id": session_id}}
+        options["durability"] = "exit"
+
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    if stream:
+        result: Dict = {}
+        async for mode, chunk in graph.astream(
+            state, config, stream_mode=["custom", "values"], **options
+        ):
+            if mode == "values":
+                result = chunk
+            elif chunk.get("type") == "token":
+                if "first_token_ms" not in timings:
+                    timings["first_token_ms"] = round((time.perf_counter() - start) * 1000, 2)
+                if on_token is not None:
+                    on_token(chunk["text"])
+    else:
+        result = await graph.ainvoke(state, config, **options)
+    timings["total_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return result, timings
+
+
+def _payload(result: Dict) -> Dict:
+    from .articles import as_dicts
+
+    return {
+        "answer": result.get("final_answer", ""),
+        "query_type": result.get("query_type"),
+        "news_results": as_dicts(result.get("news_results", [])),
+        "news_as_of": result.get("news_as_of"),
+        "error": result.get("error"),
+    }
+
+
+def _print_sources(result: Dict) -> None:
+    for item in result.get("news_results") or []:
+        print(f"  - {item.get('title', 'Untitled')} ({item.get('source', '')}) {item.get('url', '')}")
+
+
+def _write_token(text: str) -> None:
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+def _report(latencies: List[float], errors: int, wall: float) -> None:
+    from .telemetry import percentile
+
+    latencies = sorted(latencies)
+    n = len(latencies)
+    _log(
+        f"[INFO] {n} queries in {wall:.2f}s ({n / wall if wall else 0.0:.2f}/s), "
+        f"{errors} errors; latency ms p50 {percentile(latencies, 50):.0f}, "
+        f"p95 {percentile(latencies, 95):.0f}, p99 {percentile(latencies, 99):.0f}, "
+        f"max {latencies[-1] if latencies else 0.0:.0f}"
+    )
+
+
+def _report_profile() -> None:
+    from .telemetry import telemetry
+
+    rows = sorted(telemetry.span_summary().items(), key=lambda kv: -kv[1][1])
+    _log(f"{'span':<32} {'count':>7} {'mean ms':>10} {'total s':>9}")
+    for name, (count, total) in rows:
+        _log(f"{name:<32} {count:7d} {total / max(count, 1) * 1000:10.1f} {total:9.2f}")
+
+
+# -- modes --------------------------------------------------------------------
+
+async def _query_mode(graph, args) -> int:
+    if args.repeat > 1:
+        # Load test: the same query `repeat` times, `concurrency` at once
+        semaphore = asyncio.Semaphore(max(args.concurrency, 1))
+        latencies: List[float] = []
+        errors = 0
+
+        async def one() -> None:
+            nonlocal errors
+            async with semaphore:
+                try:
+                    result, timings = await _run_turn(
+                        graph, args.query, args.category, stream=args.stream
+                    )
+                    errors += bool(result.get("error"))
+                    latencies.append(timings["total_ms"])
+                except Exception as e:
+                    errors += 1
+                    _log(f"[WARN] Query failed: {e}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(args.repeat)))
+        _report(latencies, errors, time.perf_counter() - start)
+        return 1 if errors else 0
+
+    stream_to_stdout = not args.json
+    result, timings = await _run_turn(
+        graph,
+        args.query,
+        args.category,
+        on_token=_write_token if stream_to_stdout else None,
+        stream=stream_to_stdout or args.stream,
+    )
+    if args.json:
+        payload = _payload(result)
+        if args.timings:
+            payload["timings"] = timings
+        print(json.dumps(payload, ensure_ascii=False, indent=2))
+    else:
+        print()
+        _print_sources(result)
+        if args.timings:
+            _log(f"[INFO] timings: {timings}")
+    return 1 if result.get("error") else 0
+
+
+def _read_records(stream: IO[str], limit: Optional[int]) -> Iterator[Dict]:
+    """
+    Parse batch input lines into {"query", "news_category"?, "session_id"?}.
+    """
+    count = 0
+    for lineno, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if limit is not None and count >= limit:
+            return
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            record = line
+        if isinstance(record, str):
+            record = {"query": record}
+        elif not isinstance(record, dict):
+            _log(f"[WARN] Skipping line {lineno}: expected an object or a string")
+            continue
+        query = (record.get("query") or record.get("user_query") or "").strip()
+        if not query:
+            _log(f"[WARN] Skipping line {lineno}: no query")
+            continue
+        count += 1
+        yield {
+            "line": lineno,
+            "query": query,
+            "news_category": record.get("news_category") or None,
+            "session_id": record.get("session_id") or None,
+        }
+
+
+async def _batch_mode(graph, args) -> int:
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    semaphore = asyncio.Semaphore(max(args.concurrency, 1))
+    if args.sessions:
+        from .sessions import get_session_checkpointer
+
+        session_checkpointer = get_session_checkpointer()
+    # Turns of one session must not interleave (they share its memory)
+    session_locks: Dict[str, asyncio.Lock] = {}
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(index: int, record: Dict) -> Dict:
+        out: Dict = {"index": index, "line": record["line"], "query": record["query"]}
+        session_id = record["session_id"] if args.sessions else None
+        if session_id:
+            out["session_id"] = session_id
+        elif args.sessions:
+            # The checkpointed graph needs a thread; use a throwaway one
+            session_id = f"batch-{uuid.uuid4().hex}"
+        lock = session_locks.setdefault(session_id, asyncio.Lock()) if session_id else None
+        async with semaphore, (lock or contextlib.nullcontext()):
+            try:
+                result, timings = await _run_turn(
+                    graph,
+                    record["query"],
+                    record["news_category"],
+                    session_id=session_id,
+                    stream=args.stream,
+                )
+                out.update(_payload(result))
+                if args.timings:
+                    out["timings"] = timings
+                latencies.append(timings["total_ms"])
+            except Exception as e:
+                out["error"] = str(e)
+            finally:
+                if session_id and "session_id" not in out:
+                    session_locks.pop(session_id, None)
+                    await session_checkpointer.adelete_thread(session_id)
+        return out
+
+    def write(out: Dict) -> None:
+        nonlocal errors
+        errors += bool(out.get("error"))
+        sink.write(json.dumps(out, ensure_ascii=False) + "\n")
+        sink.flush()
+
+    start = time.perf_counter()
+    window = max(args.concurrency, 1) * _WINDOW_PER_WORKER
+    pending: "deque[asyncio.Future]" = deque()
+    try:
+        for index, record in enumerate(_read_records(source, args.limit)):
+            pending.append(asyncio.ensure_future(one(index, record)))
+            if len(pending) >= window:
+                write(await pending.popleft())
+        for task in pending:
+            write(await task)
+    finally:
+        for task in pending:
+            task.cancel()
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    _report(latencies, errors, time.perf_counter() - start)
+    return 1 if errors else 0
+
+
+_REPL_HELP = "Commands: /category NAME (or /category to clear), /reset, /quit"
+
+
+async def _repl_mode(graph, args) -> int:
+    from .sessions import get_session_checkpointer
+
+    session_checkpointer = get_session_checkpointer()
+    session_id = args.session
+    memory: Dict = {"chat_history": [], "history_summary": None}
+    category = args.category
+    _log(f"NewsGenie REPL. {_REPL_HELP}")
+    while True:
+        try:
+            line = (await asyncio.to_thread(input, "> ")).strip()
+        except (EOFError, KeyboardInterrupt):
+            print()
+            return 0
+        if not line:
+            continue
+        if line in ("/quit", "/exit"):
+            return 0
+        if line == "/reset":
+            memory = {"chat_history": [], "history_summary": None}
+            if session_id:
+                await session_checkpointer.adelete_thread(session_id)
+            _log("[INFO] Conversation cleared.")
+            continue
+        if line.startswith("/category"):
+            category = line[len("/category"):].strip().lower() or None
+            _log(f"[INFO] Category: {category or 'auto'}")
+            continue
+        if line.startswith("/"):
+            _log(_REPL_HELP)
+            continue
+
+        try:
+            result, timings = await _run_turn(
+                graph, line, category, session_id=session_id, memory=memory,
+                on_token=_write_token, stream=True,
+            )
+        except Exception as e:
+            _log(f"[WARN] Query failed: {e}")
+            continue
+        print()
+        _print_sources(result)
+        memory = {
+            "chat_history": result.get("chat_history", []),
+            "history_summary": result.get("history_summary"),
+        }
+        if args.timings:
+            _log(f"[INFO] timings: {timings}")
+
+
+# -- entry point --------------------------------------------------------------
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m app", description=__doc__.strip().splitlines()[0]
+    )
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--timings", action="store_true", help="report per-query latency")
+    common.add_argument("--profile", action="store_true",
+                        help="print per-stage latency (telemetry spans) at the end")
+    common.add_argument("--category", help="news category (default: inferred)")
+    modes = parser.add_subparsers(dest="mode", required=True)
+
+    query = modes.add_parser("query", parents=[common], help="answer one query")
+    query.add_argument("query")
+    query.add_argument("--json", action="store_true", help="print the answer as JSON")
+    query.add_argument("--stream", action="store_true",
+                       help="stream even with --json/--repeat (measures first token)")
+    query.add_argument("--repeat", type=int, default=1,
+                       help="run the query this many times and report latency")
+    query.add_argument("--concurrency", type=int, default=1)
+
+    batch = modes.add_parser("batch", parents=[common], help="answer JSONL queries")
+    batch.add_argument("-i", "--input", default="-", help="JSONL input (default: stdin)")
+    batch.add_argument("-o", "--output", default="-", help="JSONL output (default: stdout)")
+    batch.add_argument("--concurrency", type=int, default=8)
+    batch.add_argument("--limit", type=int, help="stop after this many queries")
+    batch.add_argument("--stream", action="store_true",
+                       help="run streamed (adds first_token_ms with --timings)")
+    batch.add_argument("--sessions", action="store_true",
+                       help="replay conversations: keep memory per record session_id")
+
+    repl = modes.add_parser("repl", parents=[common], help="interactive chat")
+    repl.add_argument("--session", help="persist the conversation under this session id")
+    return parser
+
+
+async def _main_async(args) -> int:
+    # Imported after argument parsing so --help stays instant
+    from .graph import get_graph
+
+    checkpointed = (args.mode == "repl" and bool(args.session)) or (
+        args.mode == "batch" and args.sessions
+    )
+    graph = get_graph(sessions=checkpointed)
+    runner = {"query": _query_mode, "batch": _batch_mode, "repl": _repl_mode}[args.mode]
+    try:
+        return await runner(graph, args)
+    finally:
+        if args.profile:
+            _report_profile()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    # One event loop for the whole run: LLM clients are bound to the loop
+    # they are first used on
+    return asyncio.run(_main_async(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,31 @@
-from typing import List, Dict, Optional, Literal
+from typing import AsyncIterator, Callable, Iterator, List, Dict, Optional, Literal, Tuple
+import asyncio
+import re
+import time
 
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, SystemMessage  # <-- fixed import
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 
+from .articles import ArticleDelta
+from .classifier import classify
 from .config import settings
+from .digests import content_hash, fingerprint, get_digest_store
+from .history import HistoryManager, count_tokens
+from .llm import LLM_TEMPERATURE, get_llm
+from .llm_cache import get_llm_cache
+from .mapreduce import chunk_by_tokens, gather_bounded, map_bounded
+from .resilience import guard_for
+from .router import Route, model_router
+from .telemetry import record_cache, record_tokens, span
 
 
-# Base LLM configuration
-llm = ChatOpenAI(
-    model="gpt-4o-mini",  # change to any model your account supports
-    temperature=0.2,
-    openai_api_key=settings.openai_api_key,
-)
+# Called with each text chunk as it arrives when streaming
+TokenCallback = Callable[[str], None]
+
+
+llm_guard = guard_for("llm", settings.openai_api_key or "")
+
+# Used by callers that don't pick a route
+DEFAULT_ROUTE = model_router.default()
 
 
 SYSTEM_PROMPT = """
@@ -32,99 +46,372 @@ Guidelines:
 - Be honest about limitations and do not invent sources.
 """
 
+# For short general questions (the "general.short" route), where the full
+# prompt would be a large share of the input
+COMPACT_SYSTEM_PROMPT = """
+You are NewsGenie, an AI-powered information and news assistant.
+Answer clearly and concisely, say when you are unsure, and do not invent sources.
+"""
+
 
-def call_llm(messages: List[HumanMessage | SystemMessage]) -> str:
+def _cache_lookup(
+    messages: List[HumanMessage | SystemMessage], route: Route
+) -> Optional[str]:
+    cached = get_llm_cache().lookup(
+        messages, route.model, LLM_TEMPERATURE, route.max_tokens
+    )
+    record_cache("llm", "miss" if cached is None else "hit")
+    return cached
+
+
+def _record_usage(route: Route, usage: Optional[Dict]) -> None:
+    record_tokens(route.model, usage)
+    model_router.record_usage(route, usage)
+
+
+def stream_llm(
+    messages: List[HumanMessage | SystemMessage], route: Optional[Route] = None
+) -> Iterator[str]:
+    """
+    Stream the LLM answer chunk by chunk.
+    A cached answer is yielded as a single chunk; a fresh one is cached
+    once the stream completes.
+    """
+    route = route or DEFAULT_ROUTE
+    cached = _cache_lookup(messages, route)
+    if cached is not None:
+        yield cached
+        return
+
+    parts: List[str] = []
+    llm = get_llm(route.model)
+    for chunk in llm_guard.stream_sync(
+        lambda: llm.stream(messages, max_tokens=route.max_tokens)
+    ):
+        _record_usage(route, chunk.usage_metadata)
+        if chunk.content:
+            parts.append(chunk.content)
+            yield chunk.content
+
+    get_llm_cache().store(
+        messages, route.model, LLM_TEMPERATURE, "".join(parts), route.max_tokens
+    )
+
+
+async def astream_llm(
+    messages: List[HumanMessage | SystemMessage], route: Optional[Route] = None
+) -> AsyncIterator[str]:
+    """
+    Async version of stream_llm.
+    """
+    route = route or DEFAULT_ROUTE
+    # Cache I/O is blocking (SQLite, optional embedding call), keep it off the loop
+    cached = await asyncio.to_thread(_cache_lookup, messages, route)
+    if cached is not None:
+        yield cached
+        return
+
+    parts: List[str] = []
+    llm = get_llm(route.model)
+    async for chunk in llm_guard.stream(
+        lambda: llm.astream(messages, max_tokens=route.max_tokens)
+    ):
+        _record_usage(route, chunk.usage_metadata)
+        if chunk.content:
+            parts.append(chunk.content)
+            yield chunk.content
+
+    await asyncio.to_thread(
+        get_llm_cache().store,
+        messages, route.model, LLM_TEMPERATURE, "".join(parts), route.max_tokens,
+    )
+
+
+def call_llm(
+    messages: List[HumanMessage | SystemMessage],
+    on_token: Optional[TokenCallback] = None,
+    route: Optional[Route] = None,
+) -> str:
     """
     Helper to call the LLM with a list of messages.
     messages should be langchain_core.messages (SystemMessage, HumanMessage, etc.).
+    If on_token is given, the answer is streamed and each chunk is passed to it.
+    route (see app/router.py) picks the model and completion cap.
+    """
+    route = route or DEFAULT_ROUTE
+    start = time.perf_counter()
+    with span("llm.call", model=route.model, route=route.name, stream=on_token is not None):
+        try:
+            if on_token is not None:
+                parts = []
+                for text in stream_llm(messages, route):
+                    on_token(text)
+                    parts.append(text)
+                return "".join(parts)
+
+            cached = _cache_lookup(messages, route)
+            if cached is not None:
+                return cached
+
+            llm = get_llm(route.model)
+            response = llm_guard.call_sync(
+                lambda: llm.invoke(messages, max_tokens=route.max_tokens)
+            )
+            _record_usage(route, response.usage_metadata)
+            get_llm_cache().store(
+                messages, route.model, LLM_TEMPERATURE, response.content, route.max_tokens
+            )
+            return response.content
+        finally:
+            model_router.record_latency(route, time.perf_counter() - start)
+
+
+async def call_llm_async(
+    messages: List[HumanMessage | SystemMessage],
+    on_token: Optional[TokenCallback] = None,
+    route: Optional[Route] = None,
+) -> str:
+    """
+    Async twin of call_llm, so LLM calls share the caller's event loop.
+    """
+    route = route or DEFAULT_ROUTE
+    start = time.perf_counter()
+    with span("llm.call", model=route.model, route=route.name, stream=on_token is not None):
+        try:
+            if on_token is not None:
+                parts = []
+                async for text in astream_llm(messages, route):
+                    on_token(text)
+                    parts.append(text)
+                return "".join(parts)
+
+            cached = await asyncio.to_thread(_cache_lookup, messages, route)
+            if cached is not None:
+                return cached
+
+            llm = get_llm(route.model)
+            response = await llm_guard.call(
+                lambda: llm.ainvoke(messages, max_tokens=route.max_tokens)
+            )
+            _record_usage(route, response.usage_metadata)
+            await asyncio.to_thread(
+                get_llm_cache().store,
+                messages, route.model, LLM_TEMPERATURE, response.content, route.max_tokens,
+            )
+            return response.content
+        finally:
+            model_router.record_latency(route, time.perf_counter() - start)
+
+
+def message_tokens(messages: List[HumanMessage | SystemMessage | AIMessage]) -> int:
     """
-    response = llm.invoke(messages)
-    return response.content
+    Estimated prompt size, used to pick a route before calling.
+    """
+    return sum(count_tokens(m.content) + 4 for m in messages)
 
 
 def classify_query(user_query: str) -> Literal["news", "general"]:
     """
-    Very simple rule-based classifier for now.
-    We will keep it simple so the logic is easy to explain in the report.
-    Later you could replace this with an LLM-based classifier if desired.
-    """
-    query_lower = user_query.lower()
-
-    news_keywords = [
-        "news",
-        "headline",
-        "headlines",
-        "latest",
-        "today",
-        "market update",
-        "stock market",
-        "breaking",
-        "technology news",
-        "sports scores",
-        "finance news",
-    ]
+    Decide between a news request and a general question.
+    See app/classifier.py for the rules; use classify() there to also get
+    the inferred category and a confidence score.
+    """
+    return classify(user_query).query_type
 
-    # If any news keyword appears, treat as news query
-    if any(keyword in query_lower for keyword in news_keywords):
-        return "news"
 
-    # If user mentions a specific date and asks "what happened on"
-    if "what happened" in query_lower:
-        return "news"
+def _build_history_summary_messages(
+    previous_summary: Optional[str], turns: List[Dict]
+) -> List[HumanMessage | SystemMessage]:
+    transcript = "\n".join(
+        f"{turn.get('role', 'user')}: {turn.get('content', '')}" for turn in turns
+    )
+    prompt = f"""
+Summary of the conversation so far:
+{previous_summary or "(none)"}
 
-    # Default to general informational question
-    return "general"
+New messages:
+{transcript}
 
+Update the summary to include the new messages. Keep facts, names, user
+preferences and open questions; drop small talk. Answer with the summary only,
+in at most 150 words.
+"""
+    return [HumanMessage(content=prompt)]
 
-def generate_general_answer(user_query: str, chat_history: List[Dict]) -> str:
+
+def summarize_history(previous_summary: Optional[str], turns: List[Dict]) -> str:
     """
-    Use the LLM to answer non-news questions, while considering chat history.
+    Fold older chat turns into the rolling conversation summary.
+    """
+    return call_llm(
+        _build_history_summary_messages(previous_summary, turns),
+        route=model_router.route("history"),
+    )
+
+
+async def summarize_history_async(
+    previous_summary: Optional[str], turns: List[Dict]
+) -> str:
+    """
+    Async version of summarize_history.
     """
-    messages: List[HumanMessage | SystemMessage] = [
+    return await call_llm_async(
+        _build_history_summary_messages(previous_summary, turns),
+        route=model_router.route("history"),
+    )
+
+
+history_manager = HistoryManager(
+    max_tokens=settings.history_max_tokens,
+    keep_turns=settings.history_keep_turns,
+    fold_batch=settings.history_fold_batch,
+    summarizer=summarize_history,
+    asummarizer=summarize_history_async,
+)
+
+
+def _build_general_messages(
+    user_query: str,
+    chat_history: List[Dict],
+    history_summary: Optional[str] = None,
+) -> List[HumanMessage | SystemMessage | AIMessage]:
+    messages: List[HumanMessage | SystemMessage | AIMessage] = [
         SystemMessage(content=SYSTEM_PROMPT)
     ]
 
-    for turn in chat_history:
+    if history_summary:
+        messages.append(
+            SystemMessage(content=f"Summary of the earlier conversation:\n{history_summary}")
+        )
+
+    # Only the newest turns that fit the token budget are replayed
+    for turn in history_manager.window(chat_history, history_summary):
         role = turn.get("role")
         content = turn.get("content", "")
         if role == "user":
             messages.append(HumanMessage(content=content))
-        # You could also add assistant messages as AIMessage if desired.
+        elif role == "assistant":
+            messages.append(AIMessage(content=content))
 
     messages.append(HumanMessage(content=user_query))
+    return messages
 
-    return call_llm(messages)
 
+def _route_general(
+    messages: List[HumanMessage | SystemMessage | AIMessage],
+) -> Tuple[List[HumanMessage | SystemMessage | AIMessage], Route]:
+    # Sized without the system prompt: query + history summary + turns
+    route = model_router.route("general", message_tokens(messages[1:]))
+    if route.compact_prompt:
+        messages = [SystemMessage(content=COMPACT_SYSTEM_PROMPT)] + messages[1:]
+    return messages, route
 
-def summarize_news_items(
-    news_items: List[Dict],
+
+def generate_general_answer(
     user_query: str,
-    category: Optional[str] = None,
+    chat_history: List[Dict],
+    on_token: Optional[TokenCallback] = None,
+    history_summary: Optional[str] = None,
 ) -> str:
     """
-    Use the LLM to summarize a list of news items for the user.
+    Use the LLM to answer non-news questions, while considering chat history.
     """
-    if not news_items:
-        return "I couldn't find any relevant news items right now."
+    messages, route = _route_general(
+        _build_general_messages(user_query, chat_history, history_summary)
+    )
+    return call_llm(messages, on_token, route)
+
+
+async def generate_general_answer_async(
+    user_query: str,
+    chat_history: List[Dict],
+    on_token: Optional[TokenCallback] = None,
+    history_summary: Optional[str] = None,
+) -> str:
+    """
+    Async version of generate_general_answer.
+    """
+    messages, route = _route_general(
+        _build_general_messages(user_query, chat_history, history_summary)
+    )
+    return await call_llm_async(messages, on_token, route)
+
+
+NO_NEWS_MESSAGE = "I couldn't find any relevant news items right now."
+
+
+def _format_news_item(item: Dict, description: Optional[str] = None) -> str:
+    if description is None:
+        description = item.get("description", "")
+    return (
+        f"{item.get('title', 'Untitled')} "
+        f"({item.get('source', 'Unknown source')}, "
+        f"{item.get('published_at', 'unknown date')})\n"
+        f"   {description}\n"
+        f"   Link: {item.get('url', '')}"
+    )
+
+
+def _clip(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    if max_chars <= 0:
+        return ""
+    return text[:max_chars].rsplit(" ", 1)[0].rstrip(",.;:") + "…"
+
+
+def _fit_news_items(news_items: List[Dict], max_tokens: int) -> List[str]:
+    """
+    Format articles for a prompt, trimming descriptions so the block fits
+    max_tokens. Titles, sources, dates and links are always kept; the
+    space left is shared so short descriptions stay whole and only the
+    longest ones are cut.
+    """
+    texts = [_format_news_item(item) for item in news_items]
+    if sum(count_tokens(text) for text in texts) <= max_tokens:
+        return texts
+
+    descriptions = [item.get("description") or "" for item in news_items]
+    fixed = sum(count_tokens(_format_news_item(item, "")) for item in news_items)
+    # ~4 characters per token, as in count_tokens' fallback
+    remaining = max(max_tokens - fixed, 0) * 4
+    cap = remaining
+    lengths = sorted(len(d) for d in descriptions)
+    for i, length in enumerate(lengths):
+        share = remaining // (len(lengths) - i)
+        if length > share:
+            cap = share
+            break
+        remaining -= length
+    return [
+        _format_news_item(item, _clip(description, cap))
+        for item, description in zip(news_items, descriptions)
+    ]
 
+
+def _numbered(blocks: List[str]) -> str:
+    return "\n\n".join(f"{idx}. {block}" for idx, block in enumerate(blocks, start=1))
+
+
+def _build_news_messages(
+    news_items: List[Dict], user_query: str
+) -> List[HumanMessage | SystemMessage]:
     # Build a simple text representation of the news list
-    news_text_lines = []
-    for idx, item in enumerate(news_items, start=1):
-        line = (
-            f"{idx}. {item.get('title', 'Untitled')} "
-            f"({item.get('source', 'Unknown source')}, "
-            f"{item.get('published_at', 'unknown date')})\n"
-            f"   {item.get('description', '')}\n"
-            f"   Link: {item.get('url', '')}"
-        )
-        news_text_lines.append(line)
+    news_block = _numbered(_fit_news_items(news_items, settings.news_prompt_max_tokens))
+    return _build_summary_messages(
+        news_block,
+        user_query,
+        "You have the following news articles (title, source, date, description, link)",
+    )
 
-    news_block = "\n\n".join(news_text_lines)
 
+def _build_summary_messages(
+    news_block: str, user_query: str, intro: str
+) -> List[HumanMessage | SystemMessage]:
     prompt = f"""
 The user asked: {user_query}
 
-You have the following news articles (title, source, date, description, link):
+{intro}:
 
 {news_block}
 
@@ -134,9 +421,398 @@ You have the following news articles (title, source, date, description, link):
 4. Do NOT invent facts beyond what is implied by the articles.
 """
 
-    messages: List[HumanMessage | SystemMessage] = [
+    return [
+        SystemMessage(content=SYSTEM_PROMPT),
+        HumanMessage(content=prompt),
+    ]
+
+
+def _digest_query(category: str) -> str:
+    # Query-independent summary so it can be shared by every user
+    return f"What are the latest {category} headlines?"
+
+
+def _build_personalize_messages(
+    digest: str, user_query: str
+) -> List[HumanMessage | SystemMessage]:
+    prompt = f"""
+The user asked: {user_query}
+
+Here is a summary of the current headlines:
+
+{digest}
+
+Answer the user's request using only this summary. Keep its structure,
+drop points that are irrelevant to the request, and do NOT add new facts.
+"""
+    return [
+        SystemMessage(content=SYSTEM_PROMPT),
+        HumanMessage(content=prompt),
+    ]
+
+
+def _answer_from_digest(
+    digest: str, on_token: Optional[TokenCallback]
+) -> str:
+    if on_token is not None:
+        on_token(digest)
+    return digest
+
+
+# -- map-reduce summarization of large article sets --------------------------
+#
+# Map: articles are chunked by token budget and each chunk is condensed to
+# one sentence per article, several chunks at a time. These micro-summaries
+# are cached by URL (digest store), so an article is condensed once however
+# many article sets it appears in. Reduce: the final answer is written from
+# the micro-summaries; if even those exceed the reduce budget they are first
+# collapsed into partial summaries, group by group.
+
+_MICRO_LINE = re.compile(r"^\s*(\d+)[.)]\s*(.+?)\s*$")
+
+
+def _build_map_messages(texts: List[str]) -> List[HumanMessage | SystemMessage]:
+    prompt = f"""
+Summarize each numbered news article below in one factual sentence.
+Keep names, numbers and dates, and do NOT add facts that are not in the article.
+Answer with one line per article, in the form "<number>. <sentence>", and nothing else.
+
+{_numbered(texts)}
+"""
+    return [HumanMessage(content=prompt)]
+
+
+def _build_collapse_messages(lines: List[str]) -> List[HumanMessage | SystemMessage]:
+    prompt = f"""
+Condense these news items into a short paragraph of the key facts.
+Keep names, numbers, dates and sources, and do NOT add facts.
+
+{_numbered(lines)}
+"""
+    return [HumanMessage(content=prompt)]
+
+
+def _parse_micro_summaries(answer: str, count: int) -> Dict[int, str]:
+    parsed: Dict[int, str] = {}
+    for line in answer.splitlines():
+        match = _MICRO_LINE.match(line)
+        if match and 1 <= int(match.group(1)) <= count:
+            parsed[int(match.group(1)) - 1] = match.group(2)
+    return parsed
+
+
+def _micro_line(item: Dict, summary: str) -> str:
+    return (
+        f"{item.get('title', 'Untitled')} "
+        f"({item.get('source', 'Unknown source')}, "
+        f"{item.get('published_at', 'unknown date')}): {summary}\n"
+        f"   Link: {item.get('url', '')}"
+    )
+
+
+def _plan_map(
+    news_items: List[Dict], cached: Dict[str, str]
+) -> Tuple[List[str], List[List[int]]]:
+    """
+    Formatted article texts and the chunks (article indexes) still to map.
+    """
+    texts = [_format_news_item(item) for item in news_items]
+    missing = [i for i, item in enumerate(news_items) if item.get("url") not in cached]
+    chunks = chunk_by_tokens([texts[i] for i in missing], settings.summary_chunk_tokens)
+    return texts, [[missing[j] for j in chunk] for chunk in chunks]
+
+
+def _collect_micro(
+    news_items: List[Dict],
+    cached: Dict[str, str],
+    chunks: List[List[int]],
+    answers: List[str],
+) -> Tuple[List[str], List[Tuple[str, str, str]]]:
+    """
+    (reduce lines, new cache rows). Articles the model skipped fall back
+    to their description and are not cached.
+    """
+    summaries: Dict[int, str] = {
+        i: cached[item["url"]] for i, item in enumerate(news_items) if item.get("url") in cached
+    }
+    rows: List[Tuple[str, str, str]] = []
+    for chunk, answer in zip(chunks, answers):
+        for pos, summary in _parse_micro_summaries(answer, len(chunk)).items():
+            item = news_items[chunk[pos]]
+            summaries[chunk[pos]] = summary
+            if item.get("url"):
+                rows.append((item["url"], content_hash(item), summary))
+    lines = [
+        _micro_line(item, summaries.get(i) or item.get("description") or "")
+        for i, item in enumerate(news_items)
+    ]
+    return lines, rows
+
+
+def _needs_collapse(lines: List[str]) -> bool:
+    return sum(count_tokens(line) for line in lines) > settings.summary_reduce_max_tokens
+
+
+def _collapse_prompts(lines: List[str]) -> List[List[HumanMessage | SystemMessage]]:
+    groups = chunk_by_tokens(lines, settings.summary_chunk_tokens)
+    return [_build_collapse_messages([lines[i] for i in group]) for group in groups]
+
+
+def _build_reduce_messages(
+    lines: List[str], user_query: str, collapsed: bool
+) -> List[HumanMessage | SystemMessage]:
+    if collapsed:
+        intro = "You have the following partial summaries, each covering a group of news articles"
+    else:
+        intro = (
+            "You have the following news articles, each condensed to one sentence "
+            "(title, source, date, summary, link)"
+        )
+    return _build_summary_messages(_numbered(lines), user_query, intro)
+
+
+def _news_route(messages: List[HumanMessage | SystemMessage], article_count: int) -> Route:
+    return model_router.route("news", message_tokens(messages), article_count)
+
+
+def _url_hashes(news_items: List[Dict]) -> Dict[str, str]:
+    return {item["url"]: content_hash(item) for item in news_items if item.get("url")}
+
+
+def _map_reduce(
+    news_items: List[Dict], user_query: str, on_token: Optional[TokenCallback]
+) -> str:
+    with span("llm.map_reduce", articles=len(news_items)):
+        cached = get_digest_store().get_article_summaries(_url_hashes(news_items))
+        texts, chunks = _plan_map(news_items, cached)
+        prompts = [_build_map_messages([texts[i] for i in chunk]) for chunk in chunks]
+        routes = [model_router.route("map", article_count=len(chunk)) for chunk in chunks]
+        answers = map_bounded(
+            [lambda m=m, r=r: call_llm(m, route=r) for m, r in zip(prompts, routes)],
+            settings.summary_map_concurrency,
+        )
+        lines, rows = _collect_micro(news_items, cached, chunks, answers)
+        get_digest_store().put_article_summaries(rows)
+
+        collapsed = _needs_collapse(lines)
+        if collapsed:
+            prompts = _collapse_prompts(lines)
+            collapse = model_router.route("collapse")
+            lines = map_bounded(
+                [lambda m=m: call_llm(m, route=collapse) for m in prompts],
+                settings.summary_map_concurrency,
+            )
+        messages = _build_reduce_messages(lines, user_query, collapsed)
+        return call_llm(messages, on_token, _news_route(messages, len(news_items)))
+
+
+async def _map_reduce_async(
+    news_items: List[Dict], user_query: str, on_token: Optional[TokenCallback]
+) -> str:
+    with span("llm.map_reduce", articles=len(news_items)):
+        cached = await asyncio.to_thread(
+            get_digest_store().get_article_summaries, _url_hashes(news_items)
+        )
+        texts, chunks = _plan_map(news_items, cached)
+        prompts = [_build_map_messages([texts[i] for i in chunk]) for chunk in chunks]
+        routes = [model_router.route("map", article_count=len(chunk)) for chunk in chunks]
+        answers = await gather_bounded(
+            [lambda m=m, r=r: call_llm_async(m, route=r) for m, r in zip(prompts, routes)],
+            settings.summary_map_concurrency,
+        )
+        lines, rows = _collect_micro(news_items, cached, chunks, answers)
+        await asyncio.to_thread(get_digest_store().put_article_summaries, rows)
+
+        collapsed = _needs_collapse(lines)
+        if collapsed:
+            prompts = _collapse_prompts(lines)
+            collapse = model_router.route("collapse")
+            lines = await gather_bounded(
+                [lambda m=m: call_llm_async(m, route=collapse) for m in prompts],
+                settings.summary_map_concurrency,
+            )
+        messages = _build_reduce_messages(lines, user_query, collapsed)
+        return await call_llm_async(
+            messages, on_token, _news_route(messages, len(news_items))
+        )
+
+
+def summarize_articles(
+    news_items: List[Dict], user_query: str, on_token: Optional[TokenCallback] = None
+) -> str:
+    """
+    Summarize an article set for a query: one prompt for small sets,
+    map-reduce for sets of SUMMARY_MAP_REDUCE_MIN_ARTICLES or more.
+    """
+    if len(news_items) < settings.summary_map_reduce_min_articles:
+        messages = _build_news_messages(news_items, user_query)
+        return call_llm(messages, on_token, _news_route(messages, len(news_items)))
+    return _map_reduce(news_items, user_query, on_token)
+
+
+async def summarize_articles_async(
+    news_items: List[Dict], user_query: str, on_token: Optional[TokenCallback] = None
+) -> str:
+    """
+    Async version of summarize_articles.
+    """
+    if len(news_items) < settings.summary_map_reduce_min_articles:
+        messages = _build_news_messages(news_items, user_query)
+        return await call_llm_async(
+            messages, on_token, _news_route(messages, len(news_items))
+        )
+    return await _map_reduce_async(news_items, user_query, on_token)
+
+
+def _build_digest_update_messages(
+    previous: str, delta: ArticleDelta, category: str
+) -> List[HumanMessage | SystemMessage]:
+    updated = _numbered(
+        _fit_news_items(delta.added + delta.changed, settings.news_prompt_max_tokens)
+    ) or "(none)"
+    removed = "\n".join(f"- {item.get('title', 'Untitled')}" for item in delta.removed) or "(none)"
+    prompt = f"""
+Here is the current summary of the latest {category} headlines:
+
+{previous}
+
+Since it was written, these articles were added or updated:
+
+{updated}
+
+And these articles are no longer in the headlines:
+
+{removed}
+
+Update the summary: add the important points from the new articles, drop
+points that only came from removed articles and keep everything else as it
+is. Do NOT invent facts. Answer with the updated summary only.
+"""
+    return [
         SystemMessage(content=SYSTEM_PROMPT),
         HumanMessage(content=prompt),
     ]
 
-    return call_llm(messages)
+
+def _digest_base(
+    news_items: List[Dict], category: str, delta: Optional[ArticleDelta]
+) -> Optional[str]:
+    """
+    The previous digest to patch with `delta`, when the change is small
+    enough (DIGEST_UPDATE_MAX_RATIO of the set) for a patch to be faithful.
+    """
+    if delta is None or delta.empty:
+        return None
+    changes = len(delta.added) + len(delta.changed) + len(delta.removed)
+    if changes > settings.digest_update_max_ratio * len(news_items):
+        return None
+    return get_digest_store().latest(category)
+
+
+def build_digest(
+    news_items: List[Dict], category: str, delta: Optional[ArticleDelta] = None
+) -> Optional[str]:
+    """
+    Summarize a category's article set once and store it by fingerprint.
+    Returns the stored digest (existing or new), or None for an empty set.
+    With a delta against the previous fetch, the latest digest is patched
+    with just the changed articles instead of being rebuilt from scratch.
+    """
+    if not news_items:
+        return None
+    fp = fingerprint(news_items)
+    digest = get_digest_store().get(fp)
+    if digest is None:
+        base = _digest_base(news_items, category, delta)
+        if base is not None:
+            digest = call_llm(
+                _build_digest_update_messages(base, delta, category),
+                route=model_router.route("digest.update"),
+            )
+        else:
+            digest = summarize_articles(news_items, _digest_query(category))
+        get_digest_store().put(fp, category, digest)
+    return digest
+
+
+async def build_digest_async(
+    news_items: List[Dict], category: str, delta: Optional[ArticleDelta] = None
+) -> Optional[str]:
+    """
+    Async version of build_digest.
+    """
+    if not news_items:
+        return None
+    fp = fingerprint(news_items)
+    digest = await asyncio.to_thread(get_digest_store().get, fp)
+    if digest is None:
+        base = await asyncio.to_thread(_digest_base, news_items, category, delta)
+        if base is not None:
+            digest = await call_llm_async(
+                _build_digest_update_messages(base, delta, category),
+                route=model_router.route("digest.update"),
+            )
+        else:
+            digest = await summarize_articles_async(news_items, _digest_query(category))
+        await asyncio.to_thread(get_digest_store().put, fp, category, digest)
+    return digest
+
+
+def summarize_news_items(
+    news_items: List[Dict],
+    user_query: str,
+    category: Optional[str] = None,
+    on_token: Optional[TokenCallback] = None,
+    max_articles: Optional[int] = None,
+) -> str:
+    """
+    Use the LLM to summarize a list of news items for the user.
+    If a digest exists for exactly this article set it is reused,
+    optionally with a short personalization pass. Otherwise only the
+    first max_articles are summarized, so pass the items ranked
+    (see app/ranking.py).
+    """
+    if not news_items:
+        return NO_NEWS_MESSAGE
+
+    digest = get_digest_store().get(fingerprint(news_items))
+    if digest is not None:
+        if not settings.digest_personalize:
+            return _answer_from_digest(digest, on_token)
+        return call_llm(
+            _build_personalize_messages(digest, user_query),
+            on_token,
+            model_router.route("personalize"),
+        )
+
+    if max_articles:
+        news_items = news_items[:max_articles]
+    return summarize_articles(news_items, user_query, on_token)
+
+
+async def summarize_news_items_async(
+    news_items: List[Dict],
+    user_query: str,
+    category: Optional[str] = None,
+    on_token: Optional[TokenCallback] = None,
+    max_articles: Optional[int] = None,
+) -> str:
+    """
+    Async version of summarize_news_items.
+    """
+    if not news_items:
+        return NO_NEWS_MESSAGE
+
+    digest = await asyncio.to_thread(get_digest_store().get, fingerprint(news_items))
+    if digest is not None:
+        if not settings.digest_personalize:
+            return _answer_from_digest(digest, on_token)
+        return await call_llm_async(
+            _build_personalize_messages(digest, user_query),
+            on_token,
+            model_router.route("personalize"),
+        )
+
+    if max_articles:
+        news_items = news_items[:max_articles]
+    return await summarize_articles_async(news_items, user_query, on_token)
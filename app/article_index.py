@@ -0,0 +1,385 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .articles import Article, to_articles
+from .config import settings
+
+# Batch embedder: texts -> vectors (e.g. OpenAIEmbeddings.embed_documents)
+BatchEmbedder = Callable[[List[str]], List[List[float]]]
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Words that say "I want news" rather than what the news is about
+_STOPWORDS = frozenset("""
+a about after all an and any are at be been before breaking by can current
+did do does for from get give going happened happening has have headline
+headlines how i in is it
+its latest me my new news now of on or over recent show so story stories
+tell than that the their there these this to today top update updates was
+we were what whats when where which who why will with you
+""".split())
+
+# Reciprocal rank fusion constant
+_RRF_K = 60
+
+
+def query_terms(query: str) -> List[str]:
+    """
+    Content words of a query, lowercased and without news-request filler.
+    """
+    seen = []
+    for token in _TOKEN_RE.findall((query or "").lower()):
+        if len(token) > 1 and token not in _STOPWORDS and token not in seen:
+            seen.append(token)
+    return seen
+
+
+class ArticleIndex:
+    """
+    Local retrieval index over every article and search hit the tools return.
+
+    - Lexical: SQLite FTS5 over title + description, ranked by bm25.
+    - Vector (optional, needs an embedder and numpy): normalized embeddings
+      stored alongside each row; cosine scores are fused with the lexical
+      ranking by reciprocal rank fusion.
+    - Rows are upserted by URL, so re-ingesting a story only refreshes it,
+      and the table is trimmed to `max_entries` by ingest time.
+    """
+
+    _TRIM_EVERY = 50
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 20000,
+        embedder: Optional[BatchEmbedder] = None,
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.embedder = embedder
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL UNIQUE,
+                kind TEXT NOT NULL,
+                category TEXT,
+                title TEXT NOT NULL,
+                description TEXT NOT NULL,
+                source TEXT NOT NULL,
+                published_at TEXT NOT NULL,
+                ingested_at REAL NOT NULL,
+                vector BLOB
+            );
+            CREATE INDEX IF NOT EXISTS idx_articles_recent
+                ON articles (category, ingested_at);
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                title, description, content='articles', content_rowid='id'
+            );
+            CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+                INSERT INTO articles_fts (rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+            END;
+            DROP TRIGGER IF EXISTS articles_au;
+            -- Only re-index text changes, not touch() bumps of ingested_at
+            CREATE TRIGGER articles_au AFTER UPDATE OF title, description ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+                INSERT INTO articles_fts (rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END;
+            """
+        )
+        self._conn.commit()
+
+        self._np = None
+        if embedder is not None:
+            try:
+                import numpy as np
+
+                self._np = np
+            except ImportError:
+                print("[WARN] numpy is not installed. Article vectors are disabled.")
+                self.embedder = None
+
+    # -- ingest -----------------------------------------------------------
+
+    def _vectors(self, texts: List[str]) -> List[Optional[bytes]]:
+        if self.embedder is None or not texts:
+            return [None] * len(texts)
+        np = self._np
+        try:
+            matrix = np.asarray(self.embedder(texts), dtype=np.float32)
+        except Exception as e:
+            print(f"[WARN] Article embedding failed: {e}")
+            return [None] * len(texts)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms == 0, 1.0, norms)
+        return [row.tobytes() for row in matrix]
+
+    def ingest(
+        self, items: Sequence[Dict], category: Optional[str] = None, kind: str = "news"
+    ) -> int:
+        """
+        Upsert articles (kind="news") or search hits (kind="search", which
+        carry "snippet" instead of "description"). Returns rows written.
+        Never raises: a broken index should only cost retrieval misses.
+        """
+        rows = [item for item in items if item.get("url")]
+        if not rows:
+            return 0
+        now = time.time()
+        vectors = self._vectors([
+            f"{item.get('title', '')}\n{item.get('description') or item.get('snippet', '')}"
+            for item in rows
+        ])
+        try:
+            self._upsert(rows, vectors, category, kind, now)
+        except sqlite3.Error as e:
+            print(f"[WARN] Article index ingest failed: {e}")
+            return 0
+        return len(rows)
+
+    def touch(self, urls: Sequence[str]) -> None:
+        """
+        Mark already indexed articles as seen again (refreshes ingested_at,
+        which lookups use for freshness) without rewriting or re-embedding them.
+        """
+        if not urls:
+            return
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "UPDATE articles SET ingested_at = ? WHERE url = ?",
+                    [(time.time(), url) for url in urls],
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"[WARN] Article index touch failed: {e}")
+
+    def _upsert(self, rows, vectors, category, kind, now) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO articles (url, kind, category, title, description, "
+                "source, published_at, ingested_at, vector) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET "
+                "  kind = excluded.kind, category = excluded.category, "
+                "  title = excluded.title, description = excluded.description, "
+                "  source = excluded.source, published_at = excluded.published_at, "
+                "  ingested_at = excluded.ingested_at, "
+                "  vector = COALESCE(excluded.vector, articles.vector) "
+                # A search hit for a story we already have as news (with its
+                # category, source and publish time) leaves that row alone
+                "WHERE NOT (articles.kind = 'news' AND excluded.kind = 'search')",
+                [
+                    (
+                        item["url"],
+                        kind,
+                        category,
+                        item.get("title") or "",
+                        item.get("description") or item.get("snippet") or "",
+                        item.get("source") or ("web" if kind == "search" else ""),
+                        item.get("published_at") or "",
+                        now,
+                        vector,
+                    )
+                    for item, vector in zip(rows, vectors)
+                ],
+            )
+            self._writes += 1
+            if self._writes % self._TRIM_EVERY == 0:
+                self._conn.execute(
+                    "DELETE FROM articles WHERE id IN ("
+                    "  SELECT id FROM articles ORDER BY ingested_at DESC"
+                    "  LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+            self._conn.commit()
+
+    # -- retrieval --------------------------------------------------------
+
+    @staticmethod
+    def _scope(category: Optional[str]) -> Tuple[str, list]:
+        # Search hits have no category: a category scope only holds news rows
+        if category:
+            return "a.category = ? AND a.kind = 'news'", [category]
+        return "1", []
+
+    def _lexical(self, terms: List[str], scope: str, args: list, cutoff: float, limit: int):
+        # Prefix queries, so "tech" also matches "technology". Search hits
+        # that match the query's words are candidates in any scope
+        match = " OR ".join(f'"{term}"*' for term in terms)
+        return self._conn.execute(
+            "SELECT a.id FROM articles_fts f JOIN articles a ON a.id = f.rowid "
+            f"WHERE articles_fts MATCH ? AND ({scope} OR a.kind = 'search') "
+            "AND a.ingested_at > ? "
+            "ORDER BY bm25(articles_fts) LIMIT ?",
+            [match, *args, cutoff, limit],
+        ).fetchall()
+
+    def _semantic(self, query_vector, scope: str, args: list, cutoff: float, limit: int):
+        np = self._np
+        rows = self._conn.execute(
+            f"SELECT a.id, a.vector FROM articles a WHERE {scope} "
+            "AND a.ingested_at > ? AND a.vector IS NOT NULL "
+            "ORDER BY a.ingested_at DESC LIMIT 2000",
+            [*args, cutoff],
+        ).fetchall()
+        if not rows:
+            return []
+        matrix = np.stack([np.frombuffer(r[1], dtype=np.float32) for r in rows])
+        order = np.argsort(-(matrix @ query_vector))[:limit]
+        return [(rows[i][0],) for i in order]
+
+    def search(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        k: int = 5,
+        max_age: Optional[float] = None,
+    ) -> List[Dict]:
+        """
+        Top-k fresh articles for a query, best first. Web-search hits are
+        included when they match the query's words (lexical ranking only).
+        Queries with no content words ("latest tech news") return the most
+        recently ingested articles of the category instead.
+        """
+        cutoff = time.time() - max_age if max_age else 0.0
+        terms = query_terms(query)
+        scope, args = self._scope(category)
+
+        # Embed outside the lock: it may be a network call
+        query_vector = None
+        if terms and self.embedder is not None:
+            encoded = self._vectors([query])[0]
+            if encoded is not None:
+                query_vector = self._np.frombuffer(encoded, dtype=self._np.float32)
+
+        with self._lock:
+            if not terms:
+                ids = [r[0] for r in self._conn.execute(
+                    "SELECT a.id FROM articles a WHERE a.category = ? AND a.kind = 'news' "
+                    "AND a.ingested_at > ? ORDER BY a.ingested_at DESC, a.published_at DESC "
+                    "LIMIT ?",
+                    (category or "general", cutoff, k),
+                ).fetchall()]
+            else:
+                rankings = [self._lexical(terms, scope, args, cutoff, k * 4)]
+                if query_vector is not None:
+                    rankings.append(self._semantic(query_vector, scope, args, cutoff, k * 4))
+                scores: Dict[int, float] = {}
+                for ranking in rankings:
+                    for rank, (row_id,) in enumerate(ranking):
+                        scores[row_id] = scores.get(row_id, 0.0) + 1.0 / (_RRF_K + rank)
+                ids = sorted(scores, key=scores.get, reverse=True)[:k]
+
+            if not ids:
+                return []
+            placeholders = ",".join("?" * len(ids))
+            rows = self._conn.execute(
+                "SELECT id, title, description, url, source, published_at, ingested_at, kind "
+                f"FROM articles WHERE id IN ({placeholders})",
+                ids,
+            ).fetchall()
+
+        by_id = {
+            r[0]: {
+                "title": r[1],
+                "description": r[2],
+                "url": r[3],
+                "source": r[4],
+                "published_at": r[5],
+                "ingested_at": r[6],
+                "kind": r[7],
+            }
+            for r in rows
+        }
+        return [by_id[i] for i in ids if i in by_id]
+
+    def lookup(
+        self, query: str, category: str, k: int, min_hits: int, max_age: float
+    ) -> Optional[Tuple[List[Article], float]]:
+        """
+        (articles, oldest ingest time) when the index can answer on its own,
+        i.e. it has at least `min_hits` fresh news matches; None on a miss.
+        Matching search hits ride along but don't count towards min_hits.
+        """
+        try:
+            hits = self.search(query, category, k=k, max_age=max_age)
+        except sqlite3.Error as e:
+            print(f"[WARN] Article index lookup failed: {e}")
+            return None
+        if sum(1 for hit in hits if hit["kind"] == "news") < min_hits:
+            return None
+        as_of = min(hit["ingested_at"] for hit in hits)
+        return to_articles(hits), as_of
+
+
+class _NullArticleIndex:
+    def ingest(self, items, category=None, kind="news") -> int:
+        return 0
+
+    def touch(self, urls) -> None:
+        return None
+
+    def search(self, query, category=None, k=5, max_age=None) -> List[Dict]:
+        return []
+
+    def lookup(self, query, category, k, min_hits, max_age):
+        return None
+
+
+def _build_default_index():
+    if not settings.article_index_enabled:
+        return _NullArticleIndex()
+
+    embedder: Optional[BatchEmbedder] = None
+    if settings.article_index_vectors:
+        from .llm import embed_documents
+
+        embedder = embed_documents
+
+    try:
+        return ArticleIndex(
+            settings.article_index_path,
+            max_entries=settings.article_index_max_entries,
+            embedder=embedder,
+        )
+    except sqlite3.Error as e:
+        # e.g. an SQLite build without FTS5
+        print(f"[WARN] Could not open article index at {settings.article_index_path}: {e}")
+        return _NullArticleIndex()
+
+
+# Opened on first use, so importing the app doesn't touch the filesystem
+_default_index = None
+_default_lock = threading.Lock()
+
+
+def get_article_index():
+    """
+    Process-wide article index, created on first call.
+    """
+    global _default_index
+    if _default_index is None:
+        with _default_lock:
+            if _default_index is None:
+                _default_index = _build_default_index()
+    return _default_index
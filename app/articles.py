@@ -0,0 +1,246 @@
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+_KEYS = ("title", "description", "url", "source", "published_at")
+
+
+def parse_timestamp(value: Optional[str]) -> int:
+    """
+    ISO-8601 string -> epoch seconds (0 when missing or unparseable).
+    """
+    if not value:
+        return 0
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return 0
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def format_timestamp(ts: int) -> str:
+    if not ts:
+        return ""
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _intern(value: Optional[str]) -> str:
+    # Source names repeat across thousands of articles; share one copy
+    return sys.intern(value) if value else ""
+
+
+class Article(Mapping):
+    """
+    Compact, read-only news article.
+
+    Behaves like the NewsItem dicts it replaces (item["title"],
+    item.get("source"), dict(item)), but uses __slots__, an interned source
+    name and an int timestamp; published_at is rendered on access.
+    Instances are shared between the response cache, the graph state and
+    callers, so they must not be mutated.
+    """
+
+    __slots__ = ("title", "description", "url", "source", "published_ts")
+
+    def __init__(
+        self, title: str, description: str, url: str, source: str, published_ts: int
+    ) -> None:
+        self.title = title
+        self.description = description
+        self.url = url
+        self.source = _intern(source)
+        self.published_ts = published_ts
+
+    @classmethod
+    def from_dict(cls, item: Mapping) -> "Article":
+        if isinstance(item, Article):
+            return item
+        return cls(
+            item.get("title") or "",
+            item.get("description") or "",
+            item.get("url") or "",
+            item.get("source") or "",
+            parse_timestamp(item.get("published_at")),
+        )
+
+    @property
+    def published_at(self) -> str:
+        return format_timestamp(self.published_ts)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_KEYS)
+
+    def __len__(self) -> int:
+        return len(_KEYS)
+
+    def __repr__(self) -> str:
+        return f"Article({self.title!r}, source={self.source!r}, url={self.url!r})"
+
+    def to_dict(self) -> Dict[str, str]:
+        return {key: getattr(self, key) for key in _KEYS}
+
+
+def to_articles(items: Iterable[Mapping]) -> List[Article]:
+    return [Article.from_dict(item) for item in items]
+
+
+def as_dicts(items: Iterable[Mapping]) -> List[Dict[str, Any]]:
+    """
+    Plain dicts for JSON encoders (json, Starlette, the headline store).
+    """
+    return [item.to_dict() if isinstance(item, Article) else dict(item) for item in items]
+
+
+# -- change detection -------------------------------------------------------
+
+
+def article_key(item: Mapping) -> str:
+    return item.get("url") or item.get("title") or ""
+
+
+def article_hash(item: Mapping) -> str:
+    """
+    Version of an article: its URL and title. A story re-titled under the
+    same URL counts as changed.
+    """
+    text = f"{item.get('url') or ''}\n{item.get('title') or ''}"
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class ArticleDelta(NamedTuple):
+    added: List[Mapping]
+    changed: List[Mapping]
+    removed: List[Mapping]
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.changed or self.removed)
+
+
+def diff_articles(previous: Iterable[Mapping], current: Iterable[Mapping]) -> ArticleDelta:
+    """
+    What changed between two fetches of the same feed, keyed by URL.
+    """
+    old = {article_key(item): item for item in previous}
+    new = {article_key(item): item for item in current}
+    added = [item for key, item in new.items() if key not in old]
+    changed = [
+        item for key, item in new.items()
+        if key in old and article_hash(item) != article_hash(old[key])
+    ]
+    removed = [item for key, item in old.items() if key not in new]
+    return ArticleDelta(added, changed, removed)
+
+
+class SeenArticles:
+    """
+    Bounded record of article versions already passed downstream, per
+    category, so repeated fetches only forward new or changed articles.
+    """
+
+    def __init__(self, max_entries: int = 20000) -> None:
+        self.max_entries = max_entries
+        self._seen: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def split(
+        self, items: Iterable[Mapping], category: str
+    ) -> Tuple[List[Mapping], List[Mapping]]:
+        """
+        (new or changed, unchanged) items; all of them are marked as seen.
+        """
+        fresh: List[Mapping] = []
+        unchanged: List[Mapping] = []
+        with self._lock:
+            for item in items:
+                key = (category, article_key(item))
+                digest = article_hash(item)
+                if self._seen.get(key) == digest:
+                    unchanged.append(item)
+                    self._seen.move_to_end(key)
+                else:
+                    fresh.append(item)
+                    self._seen[key] = digest
+            while len(self._seen) > self.max_entries:
+                self._seen.popitem(last=False)
+        return fresh, unchanged
+
+
+# -- binary encoding --------------------------------------------------------
+#
+# Articles are packed column-wise (struct of arrays): one list per field,
+# a table of distinct source names referenced by index, and int timestamps.
+# The payload is msgpack when msgpack (or ormsgpack) is installed and JSON
+# otherwise; a one-byte tag says which.
+
+_msgpack = None
+for _name in ("msgpack", "ormsgpack"):
+    try:
+        _msgpack = __import__(_name)
+        break
+    except ImportError:
+        continue
+
+
+def encode(obj: Any) -> bytes:
+    if _msgpack is not None:
+        return b"M" + _msgpack.packb(obj)
+    return b"J" + json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def decode(data: bytes) -> Any:
+    tag, body = data[:1], data[1:]
+    if tag == b"M":
+        if _msgpack is None:
+            raise ValueError("msgpack payload but msgpack is not installed")
+        return _msgpack.unpackb(body)
+    if tag == b"J":
+        return json.loads(body.decode("utf-8"))
+    raise ValueError("unknown article payload format")
+
+
+def pack_columns(items: Iterable[Mapping]) -> Dict[str, list]:
+    articles = to_articles(items)
+    sources: Dict[str, int] = {}
+    return {
+        "title": [a.title for a in articles],
+        "description": [a.description for a in articles],
+        "url": [a.url for a in articles],
+        "source": [sources.setdefault(a.source, len(sources)) for a in articles],
+        "published_ts": [a.published_ts for a in articles],
+        "sources": list(sources),
+    }
+
+
+def unpack_columns(columns: Dict[str, list]) -> List[Article]:
+    sources = [_intern(name) for name in columns["sources"]]
+    return [
+        Article(title, description, url, sources[source], ts)
+        for title, description, url, source, ts in zip(
+            columns["title"],
+            columns["description"],
+            columns["url"],
+            columns["source"],
+            columns["published_ts"],
+        )
+    ]
+
+
+def pack_articles(items: Iterable[Mapping]) -> bytes:
+    return encode(pack_columns(items))
+
+
+def unpack_articles(data: bytes) -> List[Article]:
+    return unpack_columns(decode(data))
@@ -0,0 +1,163 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, TypedDict
+
+from .agents import generate_general_answer_async, summarize_news_items_async
+from .classifier import classify_many
+from .config import settings
+from .graph import _fetch_news_and_search
+from .ranking import news_ranker
+from .resilience import TokenBucket
+from .tools.http_client import run_sync
+
+
+class BatchResult(TypedDict, total=False):
+    index: int
+    user_query: str
+    query_type: str
+    news_category: Optional[str]
+    news_results: List[dict]
+    final_answer: str
+    error: Optional[str]
+    # Milliseconds spent per stage: classify, fetch, queue, llm, total
+    timings: Dict[str, float]
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+async def run_batch_async(
+    queries: List[str],
+    categories: Optional[List[Optional[str]]] = None,
+    concurrency: int = 8,
+    requests_per_minute: Optional[float] = None,
+    verbose: bool = False,
+) -> List[BatchResult]:
+    """
+    Run many user queries through the NewsGenie pipeline.
+
+    - Queries are classified in one classify_many() call.
+    - News queries get their articles the way the graph's news node does
+      (article index, warm headlines, then upstream news + web search; see
+      graph._fetch_news_and_search), concurrently. Identical upstream
+      requests are shared through the response cache.
+    - Each query takes the classifier's pick: low-confidence queries are
+      not run speculatively down both branches as in the graph, and there
+      is no session memory. `python -m app batch` runs the full graph per
+      query instead, when answers must match /query exactly.
+    - LLM calls run with at most `concurrency` in flight and, optionally,
+      at most `requests_per_minute` starts per minute. Retries on 429s and
+      transient errors happen in the shared LLM guard (app/resilience.py).
+
+    Results come back in input order with per-item timings. The caller
+    decides what to print; verbose=True logs a one-line summary.
+    """
+    if categories is not None and len(categories) != len(queries):
+        raise ValueError(
+            f"got {len(categories)} categories for {len(queries)} queries"
+        )
+    settings.warn_missing_keys()
+    batch_start = time.perf_counter()
+    categories = categories or [None] * len(queries)
+
+    start = time.perf_counter()
+    classifications = classify_many(queries)
+    classify_ms = _ms((time.perf_counter() - start) / max(len(queries), 1))
+
+    results: List[BatchResult] = []
+    for i, (query, cls) in enumerate(zip(queries, classifications)):
+        category = None
+        if cls.query_type == "news":
+            category = (categories[i] or cls.category).lower()
+        results.append(
+            {
+                "index": i,
+                "user_query": query,
+                "query_type": cls.query_type,
+                "news_category": category,
+                "timings": {"classify": classify_ms},
+            }
+        )
+
+    async def fetch(result: BatchResult) -> bool:
+        # True when the articles had to come from upstream
+        start = time.perf_counter()
+        try:
+            items, _, from_store = await _fetch_news_and_search(
+                result["news_category"], result["user_query"]
+            )
+        except Exception as e:
+            result["error"] = str(e)
+            items, from_store = [], False
+        result["news_results"] = (
+            news_ranker.rank(result["user_query"], items)
+            if settings.news_rank_enabled else items
+        )
+        result["timings"]["fetch"] = _ms(time.perf_counter() - start)
+        return not from_store
+
+    upstream = sum(await asyncio.gather(
+        *(fetch(r) for r in results if r["query_type"] == "news")
+    ))
+
+    semaphore = asyncio.Semaphore(concurrency)
+    # burst=1 spaces starts evenly instead of front-loading a burst
+    limiter = TokenBucket(requests_per_minute / 60, 1) if requests_per_minute else None
+
+    async def answer(result: BatchResult) -> None:
+        queued = time.perf_counter()
+        async with semaphore:
+            start = time.perf_counter()
+            result["timings"]["queue"] = _ms(start - queued)
+            query = result["user_query"]
+            if limiter is not None:
+                await asyncio.sleep(limiter.reserve())
+            try:
+                if result["query_type"] == "news":
+                    result["final_answer"] = await summarize_news_items_async(
+                        result["news_results"], query, category=result["news_category"],
+                        max_articles=news_ranker.top_k if settings.news_rank_enabled else None,
+                    )
+                else:
+                    result["final_answer"] = await generate_general_answer_async(query, [])
+            except Exception as e:
+                result["error"] = str(e)
+                result["final_answer"] = f"Sorry, I could not answer this query. Error: {e}"
+            result["timings"]["llm"] = _ms(time.perf_counter() - start)
+
+    await asyncio.gather(*(answer(r) for r in results))
+
+    for r in results:
+        timings = r["timings"]
+        timings["total"] = round(
+            timings["classify"] + timings.get("fetch", 0.0)
+            + timings["queue"] + timings["llm"], 2
+        )
+    if verbose:
+        print(
+            f"[INFO] Batch of {len(queries)} queries finished in "
+            f"{time.perf_counter() - batch_start:.2f}s ({upstream} upstream news fetches)"
+        )
+    return results
+
+
+def run_batch(
+    queries: List[str],
+    categories: Optional[List[Optional[str]]] = None,
+    concurrency: int = 8,
+    requests_per_minute: Optional[float] = None,
+    verbose: bool = False,
+) -> List[BatchResult]:
+    """
+    Synchronous wrapper around run_batch_async for scripts and jobs.
+    """
+    return run_sync(
+        run_batch_async(
+            queries,
+            categories=categories,
+            concurrency=concurrency,
+            requests_per_minute=requests_per_minute,
+            verbose=verbose,
+        )
+    )
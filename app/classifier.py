@@ -0,0 +1,275 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Literal, NamedTuple, Optional, Tuple
+
+from .config import settings
+
+QueryType = Literal["news", "general"]
+
+
+class Classification(NamedTuple):
+    query_type: QueryType
+    category: str
+    # Probability of the chosen query_type, in [0.5, 1.0]
+    confidence: float
+
+
+# Phrase groups: (weight towards "news" intent, category or None, phrases).
+# Every phrase is matched on word boundaries, so "said" no longer
+# counts as "ai" and "newsletter" no longer counts as "news".
+_TERM_GROUPS: List[Tuple[float, Optional[str], List[str]]] = [
+    (2.5, None, ["news", "headline", "headlines", "breaking", "what happened", "current events"]),
+    (2.5, "finance", ["market update", "stock market", "finance news"]),
+    (2.5, "technology", ["technology news", "tech news"]),
+    (2.5, "sports", ["sports scores", "sports news"]),
+    (
+        2.0,
+        None,
+        [
+            "latest", "today", "tonight", "yesterday", "this week", "this morning",
+            "last night", "update", "updates", "recent", "recently", "who won",
+        ],
+    ),
+    (
+        -1.5,
+        None,
+        [
+            "explain", "define", "definition", "meaning of", "how does",
+            "how do", "why does", "why do", "teach me", "what does",
+        ],
+    ),
+    # A bare category mention is mild evidence for a news request
+    (
+        0.5,
+        "technology",
+        [
+            "tech", "technology", "ai", "artificial intelligence", "software",
+            "gadget", "gadgets", "startup", "startups", "apple", "google",
+            "microsoft", "chip", "chips", "semiconductor", "cyber",
+        ],
+    ),
+    (
+        0.5,
+        "finance",
+        [
+            "stock", "stocks", "market", "markets", "finance", "financial",
+            "economy", "economic", "earnings", "inflation", "interest rate",
+            "interest rates", "crypto", "bitcoin", "nasdaq", "dow",
+        ],
+    ),
+    (
+        0.5,
+        "sports",
+        [
+            "sport", "sports", "game", "games", "score", "scores", "match",
+            "league", "nba", "nfl", "fifa", "olympics", "tournament",
+        ],
+    ),
+]
+
+# Order used to break ties between categories
+_CATEGORIES = ["technology", "finance", "sports"]
+# Calibrated against SPECULATIVE_CONFIDENCE (0.65): no evidence at all is a
+# confident "general" (0.73), one recency word alone a confident "news"
+# (0.73), and weaker or mixed evidence lands in between, where both
+# branches run (see benchmarks/bench_classifier.py --check)
+_BIAS = -1.0
+
+_TERMS: Dict[str, Tuple[float, Optional[str]]] = {
+    phrase: (weight, category)
+    for weight, category, phrases in _TERM_GROUPS
+    for phrase in phrases
+}
+
+
+def _trie_pattern(phrases: List[str]) -> str:
+    """
+    Turn the phrase list into a character trie and render it as a regex,
+    e.g. ["stock", "stocks", "stock market"] -> "stock(?:s|\\s+market)?".
+    The regex engine then walks one branch per position instead of trying
+    every phrase, which keeps matching close to a plain substring scan.
+    """
+    trie: Dict[str, dict] = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def render(node: Dict[str, dict]) -> str:
+        alts = [
+            (r"\s+" if ch == " " else re.escape(ch)) + render(child)
+            for ch, child in sorted(node.items())
+            if ch
+        ]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        # Greedy optional suffix, so the longest phrase wins
+        return f"(?:{body})?" if "" in node else body
+
+    return r"\b" + render(trie) + r"\b"
+
+
+# One automaton pass over the lowercased query finds every term
+_PATTERN = re.compile(_trie_pattern(list(_TERMS)))
+
+
+def _match_terms(query: str) -> List[Tuple[float, Optional[str]]]:
+    terms = _TERMS
+    return [
+        terms.get(m) or terms[" ".join(m.split())]
+        for m in _PATTERN.findall(query.lower())
+    ]
+
+
+def _sigmoid(x: float) -> float:
+    return 1.0 / (1.0 + math.exp(-x))
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+# Small seed set for the optional TF-IDF model (CLASSIFIER_MODEL=tfidf)
+_SEED_EXAMPLES: List[Tuple[str, QueryType]] = [
+    ("show me the latest tech news", "news"),
+    ("give me today's finance headlines", "news"),
+    ("what happened in the election", "news"),
+    ("any updates on the championship game", "news"),
+    ("how did the markets close", "news"),
+    ("who won the match last night", "news"),
+    ("what is going on with the strike", "news"),
+    ("current events in europe", "news"),
+    ("explain inflation", "general"),
+    ("what is a neural network", "general"),
+    ("how does photosynthesis work", "general"),
+    ("define opportunity cost", "general"),
+    ("write a haiku about autumn", "general"),
+    ("what is the capital of france", "general"),
+    ("tell me how compound interest works", "general"),
+    ("why is the sky blue", "general"),
+]
+
+
+class TfidfIntentModel:
+    """
+    Tiny nearest-centroid TF-IDF model (a linear classifier over TF-IDF
+    features). Only consulted for queries where no rule term matched.
+    """
+
+    def __init__(self, examples: List[Tuple[str, QueryType]] = _SEED_EXAMPLES) -> None:
+        docs = [Counter(_TOKEN_RE.findall(text.lower())) for text, _ in examples]
+        df: Counter = Counter()
+        for doc in docs:
+            df.update(doc.keys())
+        n_docs = len(docs)
+        self.idf = {t: math.log((1 + n_docs) / (1 + c)) + 1.0 for t, c in df.items()}
+
+        sums: Dict[str, Counter] = {"news": Counter(), "general": Counter()}
+        for doc, (_, label) in zip(docs, examples):
+            for term, weight in self._vector(doc).items():
+                sums[label][term] += weight
+        self.centroids = {label: self._normalize(vec) for label, vec in sums.items()}
+
+    def _vector(self, tf: Counter) -> Dict[str, float]:
+        vec = {t: c * self.idf[t] for t, c in tf.items() if t in self.idf}
+        return self._normalize(vec)
+
+    @staticmethod
+    def _normalize(vec: Dict[str, float]) -> Dict[str, float]:
+        norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+        return {t: v / norm for t, v in vec.items()}
+
+    def news_logits(self, queries: List[str]) -> List[float]:
+        """
+        Score a batch of queries; positive means news-like.
+        """
+        news, general = self.centroids["news"], self.centroids["general"]
+        logits = []
+        for query in queries:
+            vec = self._vector(Counter(_TOKEN_RE.findall(query.lower())))
+            s_news = sum(w * news.get(t, 0.0) for t, w in vec.items())
+            s_general = sum(w * general.get(t, 0.0) for t, w in vec.items())
+            logits.append(4.0 * (s_news - s_general))
+        return logits
+
+
+class QueryClassifier:
+    """
+    Intent + category classification from one pass of a precompiled regex.
+    The optional TF-IDF model breaks ties for queries with no rule evidence.
+    """
+
+    def __init__(self, model: Optional[TfidfIntentModel] = None) -> None:
+        self.model = model
+
+    def _scan(self, query: str) -> Tuple[float, Dict[str, int], bool]:
+        logit = _BIAS
+        categories: Dict[str, int] = {}
+        terms = _match_terms(query)
+        for weight, category in terms:
+            logit += weight
+            if category is not None:
+                categories[category] = categories.get(category, 0) + 1
+        return logit, categories, bool(terms)
+
+    @staticmethod
+    def _category(categories: Dict[str, int]) -> str:
+        if not categories:
+            return "general"
+        if len(categories) == 1:
+            return next(iter(categories))
+        # Ties go to the first category in _CATEGORIES order
+        return max(_CATEGORIES, key=lambda name: categories.get(name, 0))
+
+    @staticmethod
+    def _result(logit: float, categories: Dict[str, int]) -> Classification:
+        p_news = _sigmoid(logit)
+        category = QueryClassifier._category(categories)
+        if p_news >= 0.5:
+            return Classification("news", category, p_news)
+        return Classification("general", category, 1.0 - p_news)
+
+    def classify(self, query: str) -> Classification:
+        if self.model is not None:
+            return self.classify_many([query])[0]
+        logit, categories, _ = self._scan(query or "")
+        return self._result(logit, categories)
+
+    def classify_many(self, queries: List[str]) -> List[Classification]:
+        """
+        Classify a batch of queries. The TF-IDF model, when enabled, scores
+        all rule-less queries of the batch in one pass.
+        """
+        scans = [self._scan(q or "") for q in queries]
+
+        if self.model is not None:
+            pending = [i for i, (_, _, matched) in enumerate(scans) if not matched]
+            if pending:
+                extra = self.model.news_logits([queries[i] for i in pending])
+                for i, model_logit in zip(pending, extra):
+                    logit, categories, matched = scans[i]
+                    scans[i] = (logit + model_logit, categories, matched)
+
+        return [self._result(logit, categories) for logit, categories, _ in scans]
+
+    def infer_category(self, query: str) -> str:
+        _, categories, _ = self._scan(query or "")
+        return self._category(categories)
+
+
+default_classifier = QueryClassifier(
+    TfidfIntentModel() if settings.classifier_model == "tfidf" else None
+)
+
+
+def classify(query: str) -> Classification:
+    return default_classifier.classify(query)
+
+
+def classify_many(queries: List[str]) -> List[Classification]:
+    return default_classifier.classify_many(queries)
+
+
+def infer_category(query: str) -> str:
+    return default_classifier.infer_category(query)
@@ -0,0 +1,60 @@
+import json
+from typing import Dict, Iterator, Optional, Tuple
+
+import httpx
+
+
+class NewsGenieClient:
+    """
+    Small synchronous client for the API server (app/server.py).
+    """
+
+    def __init__(self, base_url: str, timeout: float = 120.0) -> None:
+        self.base_url = base_url.rstrip("/")
+        self._http = httpx.Client(base_url=self.base_url, timeout=timeout)
+
+    @staticmethod
+    def _body(query: str, session_id: Optional[str], news_category: Optional[str]) -> Dict:
+        return {"query": query, "session_id": session_id, "news_category": news_category}
+
+    def query(
+        self, query: str, session_id: Optional[str] = None, news_category: Optional[str] = None
+    ) -> Dict:
+        response = self._http.post("/query", json=self._body(query, session_id, news_category))
+        response.raise_for_status()
+        return response.json()
+
+    def stream(
+        self, query: str, session_id: Optional[str] = None, news_category: Optional[str] = None
+    ) -> Iterator[Tuple[str, Dict]]:
+        """
+        Yield (event, data) pairs from /query/stream as they arrive.
+        """
+        with self._http.stream(
+            "POST", "/query/stream", json=self._body(query, session_id, news_category)
+        ) as response:
+            if response.status_code >= 400:
+                response.read()
+                response.raise_for_status()
+            event = "message"
+            for line in response.iter_lines():
+                if line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:"):
+                    yield event, json.loads(line[5:])
+                    event = "message"
+
+    def news(self, category: str, since: int = 0) -> Dict:
+        """
+        Warm headlines of a category, or only what changed after `since`
+        (a version from a previous call): {"version", "full", "items", "removed"}.
+        """
+        response = self._http.get(f"/news/{category}", params={"since": since})
+        response.raise_for_status()
+        return response.json()
+
+    def reset(self, session_id: str) -> None:
+        self._http.delete(f"/sessions/{session_id}").raise_for_status()
+
+    def close(self) -> None:
+        self._http.close()
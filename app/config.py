@@ -1,12 +1,58 @@
 import os
+from typing import Dict, List, Tuple
+
 from dotenv import load_dotenv
 
 load_dotenv()  # Load variables from .env
 
 
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _parse_float_map(raw: str) -> Dict[str, float]:
+    """
+    Parse "key=value,key2=value2" strings from the environment into a dict.
+    Malformed pairs are skipped so a typo never stops the app from starting.
+    """
+    result: Dict[str, float] = {}
+    for pair in raw.split(","):
+        key, sep, value = pair.partition("=")
+        if not sep:
+            continue
+        try:
+            result[key.strip().lower()] = float(value)
+        except ValueError:
+            continue
+    return result
+
+
+def _parse_providers(raw: str, default_url: str, default_key: str) -> List[Tuple[str, str, str]]:
+    """
+    Parse NEWS_PROVIDERS ("name=url,name2=url2", in priority order) into
+    (name, url, api_key) tuples. Each provider's key is read from
+    <NAME>_API_KEY and falls back to NEWS_API_KEY.
+    Without NEWS_PROVIDERS the single NEWS_API_BASE_URL provider is used.
+    """
+    providers: List[Tuple[str, str, str]] = []
+    for pair in raw.split(","):
+        name, sep, url = pair.partition("=")
+        name = name.strip().lower()
+        if not sep or not name or not url.strip():
+            continue
+        key = os.getenv(f"{name.upper()}_API_KEY", default_key)
+        providers.append((name, url.strip(), key))
+    return providers or [("newsapi", default_url, default_key)]
+
+
 class Settings:
     def __init__(self) -> None:
         self.openai_api_key = os.getenv("OPENAI_API_KEY", "")
+        # Any OpenAI-compatible endpoint (proxy, local stand-in for benchmarks)
+        self.openai_base_url = os.getenv("OPENAI_BASE_URL", "") or None
         self.news_api_key = os.getenv("NEWS_API_KEY", "")
         self.search_api_key = os.getenv("SEARCH_API_KEY", "")  # optional
 
@@ -24,6 +70,234 @@ class Settings:
             "https://api.example-search.com/v1/search",
         )
 
+        # Multi-provider news fan-out (app/tools/news_providers.py)
+        self.news_providers = _parse_providers(
+            os.getenv("NEWS_PROVIDERS", ""), self.news_api_base_url, self.news_api_key
+        )
+        # Start the next provider if the previous one hasn't answered by then
+        self.news_hedge_delay_ms = float(os.getenv("NEWS_HEDGE_DELAY_MS", "300"))
+        # After the first answer, wait this long for other in-flight providers
+        self.news_merge_window_ms = float(os.getenv("NEWS_MERGE_WINDOW_MS", "50"))
+        # Title shingle Jaccard similarity above which articles are duplicates
+        self.news_dedup_threshold = float(os.getenv("NEWS_DEDUP_THRESHOLD", "0.6"))
+
+        # Shared HTTP connection pool used by all tools (app/tools/http_client.py)
+        self.http_max_connections = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+        self.http_max_keepalive_connections = int(
+            os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")
+        )
+        self.http_keepalive_expiry = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+        self.http_timeout = float(os.getenv("HTTP_TIMEOUT", "10"))
+        self.http_connect_timeout = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+        # Per-host overrides, e.g. "newsapi.org=5,api.example-search.com=3"
+        self.http_host_timeouts = _parse_float_map(
+            os.getenv("HTTP_HOST_TIMEOUTS", "")
+        )
+        # HTTP/2 is only used when the optional `h2` package is installed
+        self.http2_enabled = _env_bool("HTTP2_ENABLED", True)
+
+        # Upstream rate limits, retries and circuit breakers (app/resilience.py)
+        # Calls per second per provider: newsapi (or NEWS_PROVIDERS names),
+        # search, llm. Providers not listed are not rate limited.
+        self.upstream_rate_limits = _parse_float_map(os.getenv("UPSTREAM_RATE_LIMITS", ""))
+        self.upstream_burst = float(os.getenv("UPSTREAM_BURST", "10"))
+        self.upstream_max_retries = int(os.getenv("UPSTREAM_MAX_RETRIES", "2"))
+        self.upstream_backoff_base = float(os.getenv("UPSTREAM_BACKOFF_BASE", "0.25"))
+        self.upstream_backoff_max = float(os.getenv("UPSTREAM_BACKOFF_MAX", "8"))
+        # Longest Retry-After we are willing to honour inside one request
+        self.upstream_retry_after_max = float(os.getenv("UPSTREAM_RETRY_AFTER_MAX", "10"))
+        # Consecutive failures that open a provider's circuit, and for how long
+        self.breaker_failure_threshold = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+        self.breaker_reset_timeout = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+
+        # Response cache in front of the news/search tools (app/tools/cache.py)
+        self.response_cache_enabled = _env_bool("RESPONSE_CACHE_ENABLED", True)
+        self.response_cache_max_entries = int(
+            os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024")
+        )
+        self.response_cache_ttl = float(os.getenv("RESPONSE_CACHE_TTL", "120"))
+        # Per-category TTLs in seconds; "search" applies to web search results
+        self.response_cache_ttls = _parse_float_map(
+            os.getenv(
+                "RESPONSE_CACHE_TTLS",
+                "finance=60,sports=60,technology=120,general=300,search=600",
+            )
+        )
+        # How long an expired entry may still be served while it is refreshed
+        self.response_cache_stale_ttl = float(
+            os.getenv("RESPONSE_CACHE_STALE_TTL", "300")
+        )
+
+        # Expired entries are kept this much longer as last-known-good data,
+        # served only when the upstream call fails (e.g. circuit open)
+        self.response_cache_fallback_ttl = float(
+            os.getenv("RESPONSE_CACHE_FALLBACK_TTL", "86400")
+        )
+
+        # LLM answer cache (app/llm_cache.py)
+        self.llm_cache_enabled = _env_bool("LLM_CACHE_ENABLED", True)
+        self.llm_cache_path = os.getenv(
+            "LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite3")
+        )
+        self.llm_cache_max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+        self.llm_cache_ttl = float(os.getenv("LLM_CACHE_TTL", "86400"))
+        # Optional embedding-similarity tier (extra embedding call per miss)
+        self.llm_semantic_cache = _env_bool("LLM_SEMANTIC_CACHE", False)
+        self.llm_semantic_threshold = float(
+            os.getenv("LLM_SEMANTIC_THRESHOLD", "0.95")
+        )
+        self.llm_embedding_model = os.getenv(
+            "LLM_EMBEDDING_MODEL", "text-embedding-3-small"
+        )
+
+        # Background headline prefetcher (app/prefetch.py)
+        self.prefetch_enabled = _env_bool("PREFETCH_ENABLED", False)
+        self.prefetch_categories = [
+            c.strip().lower()
+            for c in os.getenv("PREFETCH_CATEGORIES", "").split(",")
+            if c.strip()
+        ]
+        self.prefetch_interval = float(os.getenv("PREFETCH_INTERVAL", "900"))
+        self.prefetch_jitter = float(os.getenv("PREFETCH_JITTER", "0.1"))
+        self.prefetch_max_backoff = float(os.getenv("PREFETCH_MAX_BACKOFF", "3600"))
+        # Warm headlines older than this are not served; news_node fetches live
+        self.prefetch_max_age = float(os.getenv("PREFETCH_MAX_AGE", "1800"))
+        self.prefetch_store_path = os.getenv(
+            "PREFETCH_STORE_PATH", os.path.join(".cache", "headlines.bin")
+        )
+
+        # Precomputed per-category summary digests (app/digests.py)
+        self.digest_enabled = _env_bool("DIGEST_ENABLED", True)
+        self.digest_store_path = os.getenv(
+            "DIGEST_STORE_PATH", os.path.join(".cache", "digests.sqlite3")
+        )
+        self.digest_max_entries = int(os.getenv("DIGEST_MAX_ENTRIES", "500"))
+        # Tailor a reused digest to the user's question with a short LLM pass
+        self.digest_personalize = _env_bool("DIGEST_PERSONALIZE", True)
+        # When a poll changes at most this fraction of a category's articles,
+        # the previous digest is patched with the delta instead of rebuilt
+        self.digest_update_max_ratio = float(os.getenv("DIGEST_UPDATE_MAX_RATIO", "0.5"))
+        # Per-article micro-summaries (map step), cached by URL in the digest store
+        self.article_summary_max_entries = int(
+            os.getenv("ARTICLE_SUMMARY_MAX_ENTRIES", "20000")
+        )
+
+        # Map-reduce summarization of large article sets (app/mapreduce.py)
+        # Sets with at least this many articles are summarized map-reduce style
+        self.summary_map_reduce_min_articles = int(
+            os.getenv("SUMMARY_MAP_REDUCE_MIN_ARTICLES", "25")
+        )
+        # Prompt token budget of one map chunk
+        self.summary_chunk_tokens = int(os.getenv("SUMMARY_CHUNK_TOKENS", "3000"))
+        self.summary_map_concurrency = int(os.getenv("SUMMARY_MAP_CONCURRENCY", "4"))
+        # Larger reduce inputs are first collapsed into partial summaries
+        self.summary_reduce_max_tokens = int(os.getenv("SUMMARY_REDUCE_MAX_TOKENS", "6000"))
+
+        # Local article index for retrieval (app/article_index.py)
+        self.article_index_enabled = _env_bool("ARTICLE_INDEX_ENABLED", True)
+        self.article_index_path = os.getenv(
+            "ARTICLE_INDEX_PATH", os.path.join(".cache", "articles.sqlite3")
+        )
+        self.article_index_max_entries = int(os.getenv("ARTICLE_INDEX_MAX_ENTRIES", "20000"))
+        # Index answers only count if ingested within this many seconds
+        self.article_index_max_age = float(os.getenv("ARTICLE_INDEX_MAX_AGE", "900"))
+        self.article_index_top_k = int(os.getenv("ARTICLE_INDEX_TOP_K", "5"))
+        # Fewer fresh matches than this is a miss and goes upstream
+        self.article_index_min_hits = int(os.getenv("ARTICLE_INDEX_MIN_HITS", "3"))
+        # Embed articles (LLM_EMBEDDING_MODEL) for hybrid lexical + vector search
+        self.article_index_vectors = _env_bool("ARTICLE_INDEX_VECTORS", False)
+
+        # Model routing (app/router.py): cheap/fast tier for most calls, a
+        # stronger tier for long inputs and large article syntheses
+        self.llm_model_fast = os.getenv("LLM_MODEL_FAST", "gpt-4o-mini")
+        self.llm_model_strong = os.getenv("LLM_MODEL_STRONG", "gpt-4o-mini")  # e.g. gpt-4o
+        # General questions whose query + history fit in this many tokens take
+        # the short route (compact system prompt, small completion cap)
+        self.llm_short_max_tokens = int(os.getenv("LLM_SHORT_MAX_TOKENS", "400"))
+        # Inputs this large, or news sets with this many articles, use the strong tier
+        self.llm_strong_min_tokens = int(os.getenv("LLM_STRONG_MIN_TOKENS", "6000"))
+        self.llm_strong_min_articles = int(os.getenv("LLM_STRONG_MIN_ARTICLES", "12"))
+        # Completion caps per route, e.g. "general=600,news=800"
+        self.llm_route_max_tokens = _parse_float_map(os.getenv("LLM_ROUTE_MAX_TOKENS", ""))
+        # USD per 1M tokens, by model, for the per-route cost counter
+        self.llm_input_prices = _parse_float_map(
+            os.getenv("LLM_INPUT_PRICES", "gpt-4o-mini=0.15,gpt-4o=2.5")
+        )
+        self.llm_output_prices = _parse_float_map(
+            os.getenv("LLM_OUTPUT_PRICES", "gpt-4o-mini=0.6,gpt-4o=10")
+        )
+        # Article descriptions in a news prompt are trimmed to fit this many tokens
+        self.news_prompt_max_tokens = int(os.getenv("NEWS_PROMPT_MAX_TOKENS", "2000"))
+
+        # Relevance ranking of fetched articles (app/ranking.py): only the
+        # top NEWS_RANK_TOP_K are summarized when no digest covers the set
+        self.news_rank_enabled = _env_bool("NEWS_RANK_ENABLED", True)
+        self.news_rank_top_k = int(os.getenv("NEWS_RANK_TOP_K", "8"))
+        # Share of the score given to recency (vs. BM25 relevance), and the
+        # age in hours at which an article's recency score halves
+        self.news_rank_recency_weight = float(os.getenv("NEWS_RANK_RECENCY_WEIGHT", "0.3"))
+        self.news_rank_half_life_hours = float(os.getenv("NEWS_RANK_HALF_LIFE_HOURS", "24"))
+        # Drop articles matching no query word once this many do match
+        self.news_rank_min_matches = int(os.getenv("NEWS_RANK_MIN_MATCHES", "3"))
+
+        # Query classifier (app/classifier.py): "rules" or "tfidf"
+        self.classifier_model = os.getenv("CLASSIFIER_MODEL", "rules").lower()
+        # Below this classifier confidence (0.5-1.0) the news and general
+        # branches run concurrently and the better answer wins (app/speculative.py)
+        self.speculative_enabled = _env_bool("SPECULATIVE_ENABLED", True)
+        self.speculative_confidence = float(os.getenv("SPECULATIVE_CONFIDENCE", "0.65"))
+
+        # Chat history windowing (app/history.py)
+        self.history_max_tokens = int(os.getenv("HISTORY_MAX_TOKENS", "2000"))
+        self.history_keep_turns = int(os.getenv("HISTORY_KEEP_TURNS", "6"))
+        # Older turns are summarized this many at a time
+        self.history_fold_batch = int(os.getenv("HISTORY_FOLD_BATCH", "4"))
+
+        # API server (app/server.py) and its session store (app/sessions.py)
+        self.server_host = os.getenv("SERVER_HOST", "127.0.0.1")
+        self.server_port = int(os.getenv("SERVER_PORT", "8000"))
+        # Graph runs executing at once; more requests wait in a bounded queue
+        self.server_max_concurrency = int(os.getenv("SERVER_MAX_CONCURRENCY", "32"))
+        # Requests beyond concurrency + queue are rejected with 503
+        self.server_max_queue = int(os.getenv("SERVER_MAX_QUEUE", "128"))
+        self.server_request_timeout = float(os.getenv("SERVER_REQUEST_TIMEOUT", "60"))
+        # "memory", "sqlite" or "redis" (any Redis-protocol server; needs `redis`)
+        self.session_store = os.getenv("SESSION_STORE", "memory").lower()
+        self.session_store_path = os.getenv(
+            "SESSION_STORE_PATH", os.path.join(".cache", "sessions.sqlite3")
+        )
+        self.session_store_url = os.getenv("SESSION_STORE_URL", "redis://localhost:6379/0")
+        self.session_ttl = float(os.getenv("SESSION_TTL", "86400"))
+        self.session_max = int(os.getenv("SESSION_MAX", "10000"))
+        # Streamlit talks to this server; unset = start one in-process
+        self.api_url = os.getenv("NEWSGENIE_API_URL")
+
+        # Tracing and metrics (app/telemetry.py)
+        self.telemetry_enabled = _env_bool("TELEMETRY_ENABLED", True)
+        # Fraction of graph runs whose spans are kept for export;
+        # latency histograms and counters always cover every run
+        self.trace_sample_rate = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+        self.telemetry_max_spans = int(os.getenv("TELEMETRY_MAX_SPANS", "10000"))
+        self.telemetry_service_name = os.getenv("OTEL_SERVICE_NAME", "newsgenie")
+        # OTLP/HTTP collector base URL, e.g. http://localhost:4318
+        self.telemetry_otlp_endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+        # How often the API server pushes buffered spans there (milliseconds,
+        # as in the OpenTelemetry SDKs)
+        self.telemetry_export_interval = (
+            float(os.getenv("OTEL_BSP_SCHEDULE_DELAY", "5000")) / 1000
+        )
+
+        self._warned = False
+
+    def warn_missing_keys(self) -> None:
+        """
+        Print missing-key warnings once per process. Called when the graph
+        or a batch run starts rather than at import, so thin clients and
+        tools that never call the providers stay quiet.
+        """
+        if self._warned:
+            return
+        self._warned = True
         if not self.openai_api_key:
             print(
                 "[WARN] OPENAI_API_KEY is not set. LLM calls will fail until you add it.")
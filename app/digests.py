@@ -0,0 +1,188 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .articles import article_hash
+from .config import settings
+
+
+def fingerprint(news_items: List[Dict]) -> str:
+    """
+    Order-independent fingerprint of an article set, based on article
+    versions (URL + title, see articles.article_hash). Two fetches returning
+    the same articles share a digest; a story re-titled under the same URL
+    makes a new set, so its digest gets patched rather than reused.
+    """
+    versions = sorted(article_hash(item) for item in news_items)
+    return hashlib.sha256("\n".join(versions).encode("utf-8")).hexdigest()
+
+
+def content_hash(item: Dict) -> str:
+    """
+    Hash of the parts of an article a summary is based on, so a cached
+    micro-summary is dropped when the article is edited under the same URL.
+    """
+    text = f"{item.get('title') or ''}\n{item.get('description') or ''}"
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class DigestStore:
+    """
+    SQLite store of precomputed summaries, keyed by article-set fingerprint,
+    plus one-sentence per-article summaries keyed by URL.
+    """
+
+    def __init__(
+        self, path: str, max_entries: int = 500, max_article_summaries: int = 20000
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.max_article_summaries = max_article_summaries
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS digests (
+                fingerprint TEXT PRIMARY KEY,
+                category TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS article_summaries (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, fp: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary FROM digests WHERE fingerprint = ?", (fp,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, fp: str, category: str, summary: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?)",
+                (fp, category, summary, time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM digests WHERE fingerprint IN ("
+                "  SELECT fingerprint FROM digests ORDER BY created_at DESC"
+                "  LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def latest(self, category: str) -> Optional[str]:
+        """
+        Most recent digest for a category, regardless of fingerprint.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary FROM digests WHERE category = ? "
+                "ORDER BY created_at DESC LIMIT 1",
+                (category,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_article_summaries(self, hashes: Dict[str, str]) -> Dict[str, str]:
+        """
+        url -> micro-summary for the given {url: content hash}, skipping
+        articles whose content changed since they were summarized.
+        """
+        if not hashes:
+            return {}
+        urls = list(hashes)
+        placeholders = ",".join("?" * len(urls))
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, content_hash, summary FROM article_summaries "
+                f"WHERE url IN ({placeholders})",
+                urls,
+            ).fetchall()
+        return {url: summary for url, h, summary in rows if hashes.get(url) == h}
+
+    def put_article_summaries(self, rows: List[Tuple[str, str, str]]) -> None:
+        """
+        Store (url, content hash, micro-summary) rows.
+        """
+        if not rows:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO article_summaries VALUES (?, ?, ?, ?)",
+                [(url, h, summary, now) for url, h, summary in rows],
+            )
+            self._conn.execute(
+                "DELETE FROM article_summaries WHERE url IN ("
+                "  SELECT url FROM article_summaries ORDER BY created_at DESC"
+                "  LIMIT -1 OFFSET ?)",
+                (self.max_article_summaries,),
+            )
+            self._conn.commit()
+
+
+class _NullDigestStore:
+    def get(self, fp: str) -> Optional[str]:
+        return None
+
+    def put(self, fp: str, category: str, summary: str) -> None:
+        return None
+
+    def latest(self, category: str) -> Optional[str]:
+        return None
+
+    def get_article_summaries(self, hashes: Dict[str, str]) -> Dict[str, str]:
+        return {}
+
+    def put_article_summaries(self, rows: List[Tuple[str, str, str]]) -> None:
+        return None
+
+
+def _build_default_store():
+    if not settings.digest_enabled:
+        return _NullDigestStore()
+    try:
+        return DigestStore(
+            settings.digest_store_path,
+            settings.digest_max_entries,
+            settings.article_summary_max_entries,
+        )
+    except sqlite3.Error as e:
+        print(f"[WARN] Could not open digest store at {settings.digest_store_path}: {e}")
+        return _NullDigestStore()
+
+
+# Opened on first use, so importing the app doesn't touch the filesystem
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_digest_store():
+    """
+    Process-wide digest store, created on first call.
+    """
+    global _default_store
+    if _default_store is None:
+        with _default_lock:
+            if _default_store is None:
+                _default_store = _build_default_store()
+    return _default_store
@@ -1,37 +1,63 @@
-from typing import TypedDict, Literal, List, Optional
-import asyncio  # <-- new
-
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, TypedDict, Literal, List, Optional, Tuple
+import asyncio
+import contextvars
+import threading
+import time
+
+from langchain_core.runnables import RunnableLambda
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, START, END
 
 from .agents import (
-    classify_query,
+    history_manager,
     generate_general_answer,
+    generate_general_answer_async,
     summarize_news_items,  # <-- make sure this exists in agents.py
+    summarize_news_items_async,
 )
+from .article_index import get_article_index
+from .articles import Article
+from .classifier import classify, infer_category
+from .config import settings
+from .prefetch import get_headline_store
+from .ranking import news_ranker
+from .speculative import TokenGate, news_relevance, news_score
+from .telemetry import record_cache, set_attribute, span, telemetry
+from .tools.http_client import run_sync
 from .tools.news_api import fetch_news_async
 from .tools.web_search import search_web_async
 
 
 # 1. Define the graph state
 
-class NewsItem(TypedDict, total=False):
-    title: str
-    description: str
-    url: str
-    source: str
-    published_at: str
+# Read-only mapping with the old NewsItem keys (title, description, url,
+# source, published_at); see app/articles.py
+NewsItem = Article
 
 
 class GraphState(TypedDict, total=False):
     user_query: str
     query_type: Literal["news", "general"]
-    # [{"role": "user"/"assistant", "content": "..."}]
+    query_confidence: float
+    # Category inferred by the classifier, used when news_category is unset
+    news_category_guess: str
+    # [{"role": "user"/"assistant", "content": "...", "tokens": int}]
+    # Bounded: older turns are folded into history_summary by final_node
     chat_history: List[dict]
+    history_summary: Optional[str]
     # "technology", "finance", "sports", etc.
     news_category: Optional[str]
     news_results: List[NewsItem]
+    # ISO-8601 UTC time the news_results were fetched from upstream
+    news_as_of: Optional[str]
     final_answer: str
     error: Optional[str]
+    # When True, nodes emit "custom" stream events (see _stream_writer)
+    stream: bool
+    # Root span of the current run (see _traced_node); cleared by final
+    trace: Optional[dict]
 
 
 # 2. Node functions
@@ -41,11 +67,206 @@ def classify_node(state: GraphState) -> GraphState:
     Decide whether the user query is a news query or a general informational query.
     """
     query = state.get("user_query", "")
-    qtype = classify_query(query)
-    state["query_type"] = qtype
+    result = classify(query)
+    state["query_type"] = result.query_type
+    state["query_confidence"] = result.confidence
+    state["news_category_guess"] = result.category
     return state
 
 
+def _resolve_category(state: GraphState) -> str:
+    category = (state.get("news_category") or "").lower()
+    if category:
+        return category
+
+    # If UI didn't specify a category, infer one from the query
+    return state.get("news_category_guess") or infer_category(
+        state.get("user_query", "")
+    )
+
+
+def _warm_headlines(category: str) -> Optional[Tuple[List[NewsItem], float]]:
+    """
+    Headlines kept warm by the background prefetcher, if fresh enough.
+    """
+    if not settings.prefetch_enabled:
+        return None
+    return get_headline_store().get_fresh(category, settings.prefetch_max_age)
+
+
+async def _fetch_news_and_search(
+    category: str, user_query: str
+) -> Tuple[List[NewsItem], float, bool]:
+    """
+    Return (news_items, fetched_at, from_store).
+    Fresh matches in the local article index and warm prefetched headlines
+    are served without any upstream wait; otherwise the news fetch and the
+    web search run concurrently (both feed the index for next time).
+    """
+    with span("index.lookup", category=category):
+        indexed = await asyncio.to_thread(
+            get_article_index().lookup,
+            user_query,
+            category,
+            settings.article_index_top_k,
+            settings.article_index_min_hits,
+            settings.article_index_max_age,
+        )
+        record_cache("index", "miss" if indexed is None else "hit")
+    if indexed is not None:
+        return indexed[0], indexed[1], True
+
+    warm = _warm_headlines(category)
+    if warm is not None:
+        return warm[0], warm[1], True
+
+    news_items, _ = await asyncio.gather(
+        fetch_news_async(category=category, query=user_query),
+        # Web search hits aren't summarized here; they are kept in the
+        # article index and retrieved for later queries
+        search_web_async(query=user_query, num_results=2),
+    )
+    return news_items, time.time(), False
+
+
+def _freshness_note(fetched_at: float) -> str:
+    as_of = datetime.fromtimestamp(fetched_at, tz=timezone.utc)
+    return f"\n\n_Headlines as of {as_of:%Y-%m-%d %H:%M} UTC._"
+
+
+def _stream_writer(state: GraphState) -> Optional[Callable[[dict], None]]:
+    """
+    Return the LangGraph custom-stream writer when streaming was requested.
+    Callers use graph.stream(state, stream_mode=["custom", "values"]) and get:
+      {"type": "news_results", "category": ..., "items": [...]}
+      {"type": "token", "text": "..."}
+    """
+    if not state.get("stream"):
+        return None
+    return get_stream_writer()
+
+
+def _token_emitter(writer: Optional[Callable[[dict], None]]):
+    if writer is None:
+        return None
+    return lambda text: writer({"type": "token", "text": text})
+
+
+def _emit_news_results(
+    writer: Optional[Callable[[dict], None]], category: str, news_items: List[NewsItem]
+) -> None:
+    # Sent before summarizing so the UI can show article cards right away
+    if writer is not None:
+        writer({"type": "news_results", "category": category, "items": news_items})
+
+
+def _iso_utc(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+def _with_freshness(
+    summary: str,
+    fetched_at: float,
+    from_store: bool,
+    writer: Optional[Callable[[dict], None]],
+) -> str:
+    """
+    Append the freshness watermark when answering from prefetched headlines.
+    """
+    if not from_store:
+        return summary
+    note = _freshness_note(fetched_at)
+    if writer is not None:
+        writer({"type": "token", "text": note})
+    return summary + note
+
+
+def _record_turn(state: GraphState, answer: str) -> None:
+    """
+    Store the answer and append the turn to chat_history for future turns.
+    """
+    chat_history = state.get("chat_history", []) or []
+    state["final_answer"] = answer
+    chat_history.append({"role": "user", "content": state.get("user_query", "")})
+    chat_history.append({"role": "assistant", "content": answer})
+    state["chat_history"] = chat_history
+
+
+def _record_news_error(state: GraphState, e: Exception) -> None:
+    state["error"] = str(e)
+    _record_turn(
+        state, f"Sorry, I had trouble fetching news right now. Error: {e}"
+    )
+
+
+def _set_news_results(
+    state: GraphState,
+    writer: Optional[Callable[[dict], None]],
+    category: str,
+    news_items: List[NewsItem],
+    fetched_at: float,
+) -> None:
+    state["news_results"] = news_items
+    state["news_as_of"] = _iso_utc(fetched_at)
+    _emit_news_results(writer, category, news_items)
+
+
+def _rank_news(
+    user_query: str, news_items: List[NewsItem]
+) -> Tuple[List[NewsItem], Optional[int]]:
+    """
+    Relevance-rank the fetched articles (app/ranking.py).
+    Return (ranked items, how many of them to summarize).
+    """
+    if not settings.news_rank_enabled:
+        return news_items, None
+    with span("news.rank", candidates=len(news_items)):
+        ranked = news_ranker.rank(user_query, news_items)
+        set_attribute("news.ranked", len(ranked))
+    return ranked, news_ranker.top_k
+
+
+def _answer_news(
+    state: GraphState,
+    writer: Optional[Callable[[dict], None]],
+    category: str,
+    news_items: List[NewsItem],
+    fetched_at: float,
+    from_store: bool,
+) -> None:
+    """
+    Rank and publish the articles, and record their streamed summary as the
+    answer.
+    """
+    user_query = state.get("user_query", "")
+    news_items, top_k = _rank_news(user_query, news_items)
+    _set_news_results(state, writer, category, news_items, fetched_at)
+    summary = summarize_news_items(
+        news_items, user_query, category=category,
+        on_token=_token_emitter(writer), max_articles=top_k)
+    _record_turn(state, _with_freshness(summary, fetched_at, from_store, writer))
+
+
+async def _aanswer_news(
+    state: GraphState,
+    writer: Optional[Callable[[dict], None]],
+    category: str,
+    news_items: List[NewsItem],
+    fetched_at: float,
+    from_store: bool,
+) -> None:
+    """
+    Async version of _answer_news.
+    """
+    user_query = state.get("user_query", "")
+    news_items, top_k = _rank_news(user_query, news_items)
+    _set_news_results(state, writer, category, news_items, fetched_at)
+    summary = await summarize_news_items_async(
+        news_items, user_query, category=category,
+        on_token=_token_emitter(writer), max_articles=top_k)
+    _record_turn(state, _with_freshness(summary, fetched_at, from_store, writer))
+
+
 def news_node(state: GraphState) -> GraphState:
     """
     Handle news-related queries:
@@ -54,52 +275,40 @@ def news_node(state: GraphState) -> GraphState:
     - Summarize using the LLM.
     """
     user_query = state.get("user_query", "")
-    chat_history = state.get("chat_history", []) or []
-    category = (state.get("news_category") or "").lower()
-
-    # If UI didn't specify a category, try to infer a simple one from the query
-    if not category:
-        q_lower = user_query.lower()
-        if "tech" in q_lower or "ai" in q_lower or "software" in q_lower:
-            category = "technology"
-        elif "stock" in q_lower or "market" in q_lower or "finance" in q_lower:
-            category = "finance"
-        elif "sport" in q_lower or "game" in q_lower or "score" in q_lower:
-            category = "sports"
-        else:
-            category = "general"
+    category = _resolve_category(state)
+    writer = _stream_writer(state)
 
     try:
-        # Call async tools from sync code
-        news_items = asyncio.run(
-            fetch_news_async(category=category, query=user_query)
+        # Call async tools from sync code on the shared I/O loop,
+        # so pooled connections are reused across requests
+        news_items, fetched_at, from_store = run_sync(
+            _fetch_news_and_search(category, user_query)
         )
+        _answer_news(state, writer, category, news_items, fetched_at, from_store)
 
-        # Optional: also call web search (not strictly required for every query)
-        # For now, we won't merge them into the summary to keep it simple.
-        _ = asyncio.run(
-            search_web_async(query=user_query, num_results=2)
-        )
+    except Exception as e:
+        _record_news_error(state, e)
+
+    return state
 
-        state["news_results"] = news_items
 
-        summary = summarize_news_items(
-            news_items, user_query, category=category)
-        state["final_answer"] = summary
+async def anews_node(state: GraphState) -> GraphState:
+    """
+    Async version of news_node, used by graph.ainvoke / graph.astream.
+    Fetching, searching and summarizing all run on the caller's event loop.
+    """
+    user_query = state.get("user_query", "")
+    category = _resolve_category(state)
+    writer = _stream_writer(state)
 
-        # Update chat history
-        chat_history.append({"role": "user", "content": user_query})
-        chat_history.append({"role": "assistant", "content": summary})
-        state["chat_history"] = chat_history
+    try:
+        news_items, fetched_at, from_store = await _fetch_news_and_search(
+            category, user_query
+        )
+        await _aanswer_news(state, writer, category, news_items, fetched_at, from_store)
 
     except Exception as e:
-        error_msg = f"Sorry, I had trouble fetching news right now. Error: {e}"
-        state["error"] = str(e)
-        state["final_answer"] = error_msg
-
-        chat_history.append({"role": "user", "content": user_query})
-        chat_history.append({"role": "assistant", "content": error_msg})
-        state["chat_history"] = chat_history
+        _record_news_error(state, e)
 
     return state
 
@@ -109,43 +318,269 @@ def general_node(state: GraphState) -> GraphState:
     Handle general informational questions using the LLM.
     """
     user_query = state.get("user_query", "")
-    chat_history = state.get("chat_history", [])
+    chat_history = state.get("chat_history", []) or []
 
-    answer = generate_general_answer(user_query, chat_history)
-    state["final_answer"] = answer
+    answer = generate_general_answer(
+        user_query,
+        chat_history,
+        on_token=_token_emitter(_stream_writer(state)),
+        history_summary=state.get("history_summary"),
+    )
+    _record_turn(state, answer)
 
-    # Update chat_history for future turns
-    chat_history.append({"role": "user", "content": user_query})
-    chat_history.append({"role": "assistant", "content": answer})
-    state["chat_history"] = chat_history
+    return state
+
+
+async def ageneral_node(state: GraphState) -> GraphState:
+    """
+    Async version of general_node.
+    """
+    user_query = state.get("user_query", "")
+    chat_history = state.get("chat_history", []) or []
+
+    answer = await generate_general_answer_async(
+        user_query,
+        chat_history,
+        on_token=_token_emitter(_stream_writer(state)),
+        history_summary=state.get("history_summary"),
+    )
+    _record_turn(state, answer)
 
     return state
 
 
+async def _fetch_for_speculation(
+    category: str, user_query: str
+) -> Tuple[List[NewsItem], float, bool]:
+    try:
+        return await _fetch_news_and_search(category, user_query)
+    except Exception as e:
+        # The general answer is already on its way, so just let it win
+        print(f"[WARN] Speculative news fetch failed: {e}")
+        return [], time.time(), False
+
+
+def _pick_branch(state: GraphState, news_items: List[NewsItem], general_done: bool) -> str:
+    """
+    Choose "news" or "general" once the articles are in (see news_score),
+    and record the outcome on the span, the metrics and state["query_type"].
+    """
+    user_query = state.get("user_query", "")
+    score = news_score(
+        state.get("query_type", "general"),
+        state.get("query_confidence", 0.5),
+        user_query,
+        news_items,
+    )
+    winner = "news" if score >= 0.5 else "general"
+    cancelled = winner == "news" and not general_done
+    set_attribute("speculative.news_score", round(score, 3))
+    set_attribute("speculative.winner", winner)
+    telemetry.inc(
+        "newsgenie_speculative_runs_total",
+        winner=winner,
+        cancelled="true" if cancelled else "false",
+    )
+    # Report the branch that actually answered
+    state["query_type"] = winner
+    return winner
+
+
+def _keep_related(
+    state: GraphState,
+    writer: Optional[Callable[[dict], None]],
+    category: str,
+    news_items: List[NewsItem],
+    fetched_at: float,
+) -> None:
+    # When general wins, articles that share a topic word with the query
+    # are still shown next to the answer as related headlines
+    if news_items and news_relevance(state.get("user_query", ""), news_items) > 0:
+        _set_news_results(state, writer, category, news_items, fetched_at)
+
+
+def speculative_node(state: GraphState) -> GraphState:
+    """
+    Handle queries the classifier was unsure about by running both branches.
+    The general answer streams into a TokenGate (held back from the client)
+    while the news fetch runs; once the articles are in, _pick_branch
+    decides. If news wins, the general stream is cut at its next token;
+    otherwise its buffered tokens are flushed and it carries on live.
+    """
+    user_query = state.get("user_query", "")
+    category = _resolve_category(state)
+    writer = _stream_writer(state)
+    gate = TokenGate()
+
+    # A thread rather than the I/O loop: LLM clients are bound to the
+    # event loop they are first used on
+    pool = ThreadPoolExecutor(max_workers=1)
+    general = pool.submit(
+        contextvars.copy_context().run,
+        generate_general_answer,
+        user_query,
+        state.get("chat_history", []) or [],
+        gate,
+        state.get("history_summary"),
+    )
+    try:
+        news_items, fetched_at, from_store = run_sync(
+            _fetch_for_speculation(category, user_query)
+        )
+        if _pick_branch(state, news_items, general.done()) == "news":
+            gate.cancel()
+            try:
+                _answer_news(state, writer, category, news_items, fetched_at, from_store)
+            except Exception as e:
+                _record_news_error(state, e)
+            return state
+
+        _keep_related(state, writer, category, news_items, fetched_at)
+        gate.open(_token_emitter(writer))
+        _record_turn(state, general.result())
+        return state
+    finally:
+        gate.cancel()
+        pool.shutdown(wait=False)
+
+
+async def aspeculative_node(state: GraphState) -> GraphState:
+    """
+    Async version of speculative_node. The losing general call is a task
+    that gets cancelled, which closes its LLM stream right away.
+    """
+    user_query = state.get("user_query", "")
+    category = _resolve_category(state)
+    writer = _stream_writer(state)
+    gate = TokenGate()
+
+    general = asyncio.ensure_future(
+        generate_general_answer_async(
+            user_query,
+            state.get("chat_history", []) or [],
+            on_token=gate,
+            history_summary=state.get("history_summary"),
+        )
+    )
+    try:
+        news_items, fetched_at, from_store = await _fetch_for_speculation(
+            category, user_query
+        )
+        if _pick_branch(state, news_items, general.done()) == "news":
+            general.cancel()
+            await asyncio.gather(general, return_exceptions=True)
+            try:
+                await _aanswer_news(
+                    state, writer, category, news_items, fetched_at, from_store
+                )
+            except Exception as e:
+                _record_news_error(state, e)
+            return state
+
+        _keep_related(state, writer, category, news_items, fetched_at)
+        gate.open(_token_emitter(writer))
+        _record_turn(state, await general)
+        return state
+    finally:
+        # Also covers the caller going away mid-run
+        general.cancel()
+
+
 def final_node(state: GraphState) -> GraphState:
     """
-    Final node to possibly post-process output, log, or enforce formatting.
-    Right now, we simply return the state as is.
+    Final node to post-process output.
+    Keeps chat_history bounded by folding old turns into history_summary;
+    this runs after the answer was produced, so it never delays it.
+    """
+    state["chat_history"], state["history_summary"] = history_manager.compact(
+        state.get("chat_history", []) or [], state.get("history_summary")
+    )
+    return state
+
+
+async def afinal_node(state: GraphState) -> GraphState:
+    """
+    Async version of final_node.
     """
+    state["chat_history"], state["history_summary"] = await history_manager.acompact(
+        state.get("chat_history", []) or [], state.get("history_summary")
+    )
     return state
 
 
 # 3. Build the graph
 
-def build_graph():
+def _traced_node(
+    name: str,
+    func: Callable[[GraphState], GraphState],
+    afunc: Optional[Callable] = None,
+    first: bool = False,
+    last: bool = False,
+) -> RunnableLambda:
+    """
+    Wrap a node so each run is timed as a child span of the graph trace.
+    The first node opens the root span and the last one closes it; the
+    trace context travels in state["trace"] between them.
+    """
+    def enter(state: GraphState):
+        if first:
+            state["trace"] = telemetry.start_trace()
+        return telemetry.parent_of(state.get("trace"))
+
+    def leave(state: GraphState) -> GraphState:
+        if last:
+            telemetry.end_trace(
+                state.get("trace"),
+                query_type=state.get("query_type", ""),
+                error=bool(state.get("error")),
+            )
+            state["trace"] = None
+        return state
+
+    def run(state: GraphState) -> GraphState:
+        with telemetry.span(f"node.{name}", parent=enter(state)):
+            state = func(state)
+        return leave(state)
+
+    async def arun(state: GraphState) -> GraphState:
+        with telemetry.span(f"node.{name}", parent=enter(state)):
+            state = await afunc(state)
+        return leave(state)
+
+    return RunnableLambda(run, afunc=arun if afunc else None, name=name)
+
+
+def build_graph(checkpointer=None):
+    """
+    Compile the NewsGenie workflow.
+    The returned graph supports both graph.invoke(state) for sync callers and
+    await graph.ainvoke(state) for async ones; the I/O-heavy nodes have async
+    twins so the whole async run stays on a single event loop.
+    With a checkpointer, runs take config={"configurable": {"thread_id": ...}}
+    and state not passed in (e.g. chat_history) is restored for that thread.
+    """
     graph = StateGraph(GraphState)
 
     # Register nodes
-    graph.add_node("classify", classify_node)
-    graph.add_node("news", news_node)
-    graph.add_node("general", general_node)
-    graph.add_node("final", final_node)
+    graph.add_node("classify", _traced_node("classify", classify_node, first=True))
+    graph.add_node("news", _traced_node("news", news_node, anews_node))
+    graph.add_node("general", _traced_node("general", general_node, ageneral_node))
+    graph.add_node(
+        "speculative", _traced_node("speculative", speculative_node, aspeculative_node)
+    )
+    graph.add_node("final", _traced_node("final", final_node, afinal_node, last=True))
 
     # Edges
     graph.add_edge(START, "classify")
 
-    # Conditional edge: route based on query_type
+    # Conditional edge: route based on query_type, or run both branches
+    # when the classifier is unsure (SPECULATIVE_CONFIDENCE)
     def route_based_on_type(state: GraphState) -> str:
+        if (
+            settings.speculative_enabled
+            and state.get("query_confidence", 1.0) < settings.speculative_confidence
+        ):
+            return "speculative"
         qtype = state.get("query_type", "general")
         if qtype == "news":
             return "news"
@@ -157,13 +592,44 @@ def build_graph():
         {
             "news": "news",
             "general": "general",
+            "speculative": "speculative",
         },
     )
 
-    # From both main branches to final
+    # From every answering branch to final
     graph.add_edge("news", "final")
     graph.add_edge("general", "final")
+    graph.add_edge("speculative", "final")
 
     graph.add_edge("final", END)
 
-    return graph.compile()
+    return graph.compile(checkpointer=checkpointer)
+
+
+_graphs: Dict[bool, object] = {}
+_graph_lock = threading.Lock()
+
+
+def get_graph(sessions: bool = False):
+    """
+    The process-wide compiled graph, built once on first use.
+    Compiled graphs hold no per-call state, so one instance serves every
+    session, request and thread. By default state travels with each call;
+    with sessions=True the graph is compiled with the session checkpointer
+    (app/sessions.py) and each call sends only the new turn plus a thread_id.
+    """
+    graph = _graphs.get(sessions)
+    if graph is None:
+        with _graph_lock:
+            graph = _graphs.get(sessions)
+            if graph is None:
+                settings.warn_missing_keys()
+                checkpointer = None
+                if sessions:
+                    # Imported here so stateless callers never open the session store
+                    from .sessions import get_session_checkpointer
+
+                    checkpointer = get_session_checkpointer()
+                graph = build_graph(checkpointer)
+                _graphs[sessions] = graph
+    return graph
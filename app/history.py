@@ -0,0 +1,140 @@
+import threading
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+# (previous summary or None, turns to fold in) -> new summary
+Summarizer = Callable[[Optional[str], List[Dict]], str]
+AsyncSummarizer = Callable[[Optional[str], List[Dict]], Awaitable[str]]
+
+_encoder = None
+_encoder_lock = threading.Lock()
+_encoder_loaded = False
+
+
+def _get_encoder():
+    """
+    tiktoken encoder for gpt-4o models if available; None means fall back
+    to a character-based estimate (tiktoken may be missing or unable to
+    download its vocabulary).
+    """
+    global _encoder, _encoder_loaded
+    if _encoder_loaded:
+        return _encoder
+    with _encoder_lock:
+        if not _encoder_loaded:
+            try:
+                import tiktoken
+
+                _encoder = tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                print(f"[INFO] tiktoken unavailable ({type(e).__name__}); estimating tokens.")
+                _encoder = None
+            _encoder_loaded = True
+    return _encoder
+
+
+def count_tokens(text: str) -> int:
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text))
+    # Roughly 4 characters per token for English text
+    return len(text) // 4 + 1
+
+
+# Fixed per-message overhead of the chat format (role markers etc.)
+_MESSAGE_OVERHEAD = 4
+
+
+class HistoryManager:
+    """
+    Keeps the prompt-side chat history bounded.
+
+    - Only the newest turns that fit `max_tokens` (and at most `keep_turns`
+      user/assistant pairs) are replayed verbatim.
+    - Once more than keep_turns + fold_batch turns accumulate, the oldest
+      ones are folded into a rolling summary and dropped from the list.
+      Folding is incremental: the new summary is built from the previous
+      summary plus only the newly folded turns.
+    - Token counts are stored on each message dict under "tokens", so a
+      message is tokenized once for the whole session.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        keep_turns: int,
+        fold_batch: int,
+        summarizer: Optional[Summarizer] = None,
+        asummarizer: Optional[AsyncSummarizer] = None,
+    ) -> None:
+        self.max_tokens = max_tokens
+        self.keep_turns = keep_turns
+        self.fold_batch = fold_batch
+        self.summarizer = summarizer
+        self.asummarizer = asummarizer
+
+    @staticmethod
+    def message_tokens(turn: Dict) -> int:
+        tokens = turn.get("tokens")
+        if tokens is None:
+            tokens = count_tokens(turn.get("content", "")) + _MESSAGE_OVERHEAD
+            turn["tokens"] = tokens
+        return tokens
+
+    def window(
+        self, chat_history: List[Dict], summary: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Newest messages that fit the token budget, in chronological order.
+        """
+        budget = self.max_tokens
+        if summary:
+            budget -= count_tokens(summary) + _MESSAGE_OVERHEAD
+
+        selected: List[Dict] = []
+        for turn in reversed(chat_history):
+            if len(selected) >= self.keep_turns * 2:
+                break
+            cost = self.message_tokens(turn)
+            if cost > budget:
+                break
+            budget -= cost
+            selected.append(turn)
+        selected.reverse()
+        return selected
+
+    def _split(self, chat_history: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        limit = (self.keep_turns + self.fold_batch) * 2
+        if len(chat_history) <= limit:
+            return [], chat_history
+        cut = len(chat_history) - self.keep_turns * 2
+        return chat_history[:cut], chat_history[cut:]
+
+    def compact(
+        self, chat_history: List[Dict], summary: Optional[str]
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Fold old turns into the summary. Returns (remaining history, summary).
+        """
+        to_fold, keep = self._split(chat_history)
+        if not to_fold or self.summarizer is None:
+            return chat_history, summary
+        try:
+            return keep, self.summarizer(summary, to_fold)
+        except Exception as e:
+            print(f"[WARN] History summarization failed: {e}")
+            return chat_history, summary
+
+    async def acompact(
+        self, chat_history: List[Dict], summary: Optional[str]
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Async version of compact.
+        """
+        to_fold, keep = self._split(chat_history)
+        if not to_fold or self.asummarizer is None:
+            return chat_history, summary
+        try:
+            return keep, await self.asummarizer(summary, to_fold)
+        except Exception as e:
+            print(f"[WARN] History summarization failed: {e}")
+            return chat_history, summary
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import weakref
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, TypeVar
+
+from .config import settings
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+T = TypeVar("T")
+
+# Known up front so cache keys and telemetry labels don't need the client.
+# Models are picked per call by app/router.py (LLM_MODEL_FAST / LLM_MODEL_STRONG)
+LLM_MODEL = settings.llm_model_fast
+LLM_TEMPERATURE = 0.2
+
+# Clients are built on first use: importing langchain_openai (and the
+# openai SDK behind it) is the slowest part of starting the app, and
+# many entry points (UI client, CLI --help, workers that only fetch
+# headlines) never call the LLM.
+# The async side of a client pools its connections on the event loop that
+# first uses it, so code running inside a loop gets clients of its own for
+# that loop (like app/tools/http_client.py); plain sync callers share one set.
+# langchain_openai caches its default async HTTP client process-wide, so the
+# per-loop clients are also given an HTTP client of their own.
+_clients: Dict[str, object] = {}
+_loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, object]]" = (
+    weakref.WeakKeyDictionary()
+)
+_lock = threading.Lock()
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _shared(key: str, build: Callable[[bool], T]) -> T:
+    loop = _running_loop()
+    with _lock:
+        if loop is None:
+            clients = _clients
+        else:
+            clients = _loop_clients.get(loop)
+            if clients is None:
+                # A pooled client can keep its loop alive, drop the ones left
+                # behind by loops that are done (e.g. repeated asyncio.run)
+                for old in [l for l in _loop_clients if l.is_closed()]:
+                    del _loop_clients[old]
+                clients = _loop_clients[loop] = {}
+        client = clients.get(key)
+        if client is None:
+            client = clients[key] = build(loop is not None)
+        return client
+
+
+def _async_http_client(per_loop: bool) -> Optional[object]:
+    if not per_loop:
+        return None
+    from openai import DefaultAsyncHttpxClient
+
+    return DefaultAsyncHttpxClient()
+
+
+def _build_llm(model: str, per_loop: bool) -> "ChatOpenAI":
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model=model,
+        temperature=LLM_TEMPERATURE,
+        openai_api_key=settings.openai_api_key,
+        base_url=settings.openai_base_url,
+        # Report token usage on the final stream chunk too (for telemetry)
+        stream_usage=True,
+        # Retries, backoff and circuit breaking are done by llm_guard instead
+        max_retries=0,
+        http_async_client=_async_http_client(per_loop),
+    )
+
+
+def _build_embeddings(per_loop: bool) -> "OpenAIEmbeddings":
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings(
+        model=settings.llm_embedding_model,
+        openai_api_key=settings.openai_api_key,
+        base_url=settings.openai_base_url,
+        http_async_client=_async_http_client(per_loop),
+    )
+
+
+def get_llm(model: str = LLM_MODEL) -> "ChatOpenAI":
+    """
+    Chat model client for `model`, created on first call.
+    Shared by sync callers; inside an event loop, shared by that loop only.
+    """
+    return _shared(f"llm:{model}", lambda per_loop: _build_llm(model, per_loop))
+
+
+def get_embeddings() -> "OpenAIEmbeddings":
+    """
+    Embeddings client (LLM_EMBEDDING_MODEL), created on first call and
+    scoped like get_llm.
+    """
+    return _shared("embeddings", _build_embeddings)
+
+
+def embed_query(text: str) -> List[float]:
+    return get_embeddings().embed_query(text)
+
+
+def embed_documents(texts: List[str]) -> List[List[float]]:
+    return get_embeddings().embed_documents(texts)
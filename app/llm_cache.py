@@ -0,0 +1,327 @@
+import abc
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional, Sequence
+
+from langchain_core.messages import BaseMessage
+
+from .config import settings
+
+Embedder = Callable[[str], List[float]]
+
+
+def _message_payload(messages: Sequence[BaseMessage]) -> list:
+    return [[m.type, m.content] for m in messages]
+
+
+def exact_key(
+    messages: Sequence[BaseMessage],
+    model: str,
+    temperature: float,
+    max_tokens: Optional[int] = None,
+) -> str:
+    """
+    Hash of the rendered message list plus the generation parameters.
+    max_tokens is part of it: an answer cut short by a small completion cap
+    must not be served to a call allowed a longer one.
+    """
+    raw = json.dumps(
+        [model, temperature, max_tokens, _message_payload(messages)],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache(abc.ABC):
+    """
+    Interface for LLM response caches used by agents.call_llm.
+    Implementations must never raise: a broken cache should only cost a miss.
+    """
+
+    @abc.abstractmethod
+    def lookup(
+        self,
+        messages: Sequence[BaseMessage],
+        model: str,
+        temperature: float,
+        max_tokens: Optional[int] = None,
+    ) -> Optional[str]:
+        ...
+
+    @abc.abstractmethod
+    def store(
+        self,
+        messages: Sequence[BaseMessage],
+        model: str,
+        temperature: float,
+        response: str,
+        max_tokens: Optional[int] = None,
+    ) -> None:
+        ...
+
+
+class NullLLMCache(LLMCache):
+    """
+    Cache that never stores anything (LLM_CACHE_ENABLED=false).
+    """
+
+    def lookup(self, messages, model, temperature, max_tokens=None) -> Optional[str]:
+        return None
+
+    def store(self, messages, model, temperature, response, max_tokens=None) -> None:
+        return None
+
+
+class SQLiteLLMCache(LLMCache):
+    """
+    Two-tier LLM response cache persisted in SQLite.
+
+    1. Exact tier: keyed by exact_key(), i.e. identical prompts.
+    2. Semantic tier (optional, needs an embedder and numpy): the last
+       message is embedded and compared by cosine similarity against
+       earlier prompts that share the same preceding messages, model and
+       temperature (and completion cap). Hits above `similarity_threshold` are reused.
+
+    Both tiers expire entries after `ttl` seconds and keep at most
+    `max_entries` rows each, evicting the least recently used.
+    """
+
+    _EVICT_EVERY = 50
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 5000,
+        ttl: float = 86400.0,
+        embedder: Optional[Embedder] = None,
+        similarity_threshold: float = 0.95,
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._vectors: "OrderedDict[str, list]" = OrderedDict()
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS exact_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS semantic_cache (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                context_key TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_semantic_context
+                ON semantic_cache (context_key);
+            """
+        )
+        self._conn.commit()
+
+        self._np = None
+        if embedder is not None:
+            try:
+                import numpy as np
+
+                self._np = np
+            except ImportError:
+                print("[WARN] numpy is not installed. Semantic LLM cache is disabled.")
+                self.embedder = None
+
+    # -- exact tier -------------------------------------------------------
+
+    def lookup(self, messages, model, temperature, max_tokens=None) -> Optional[str]:
+        now = time.time()
+        key = exact_key(messages, model, temperature, max_tokens)
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT response FROM exact_cache WHERE key = ? AND created_at > ?",
+                    (key, now - self.ttl),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE exact_cache SET last_access = ? WHERE key = ?",
+                        (now, key),
+                    )
+                    self._conn.commit()
+                    self.stats["exact_hits"] += 1
+                    return row[0]
+
+            if self.embedder is not None and messages:
+                hit = self._semantic_lookup(messages, model, temperature, max_tokens, now)
+                if hit is not None:
+                    self.stats["semantic_hits"] += 1
+                    return hit
+        except Exception as e:
+            print(f"[WARN] LLM cache lookup failed: {e}")
+
+        self.stats["misses"] += 1
+        return None
+
+    def store(self, messages, model, temperature, response, max_tokens=None) -> None:
+        now = time.time()
+        key = exact_key(messages, model, temperature, max_tokens)
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO exact_cache VALUES (?, ?, ?, ?)",
+                    (key, response, now, now),
+                )
+                self._conn.commit()
+
+            if self.embedder is not None and messages:
+                self._semantic_store(messages, model, temperature, max_tokens, response, now)
+
+            self._writes += 1
+            if self._writes % self._EVICT_EVERY == 0:
+                self.evict()
+        except Exception as e:
+            print(f"[WARN] LLM cache store failed: {e}")
+
+    # -- semantic tier ----------------------------------------------------
+
+    def _context_key(self, messages, model, temperature, max_tokens) -> str:
+        return exact_key(messages[:-1], model, temperature, max_tokens)
+
+    def _embed(self, text: str):
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        vector = self._vectors.get(digest)
+        if vector is None:
+            vector = self._np.asarray(self.embedder(text), dtype=self._np.float32)
+            norm = float(self._np.linalg.norm(vector)) or 1.0
+            vector = vector / norm
+            self._vectors[digest] = vector
+            while len(self._vectors) > 256:
+                self._vectors.popitem(last=False)
+        return vector
+
+    def _semantic_lookup(self, messages, model, temperature, max_tokens, now) -> Optional[str]:
+        np = self._np
+        context_key = self._context_key(messages, model, temperature, max_tokens)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, vector, response FROM semantic_cache "
+                "WHERE context_key = ? AND created_at > ?",
+                (context_key, now - self.ttl),
+            ).fetchall()
+        if not rows:
+            return None
+
+        query = self._embed(str(messages[-1].content))
+        matrix = np.stack([np.frombuffer(r[1], dtype=np.float32) for r in rows])
+        scores = matrix @ query
+        best = int(np.argmax(scores))
+        if float(scores[best]) < self.similarity_threshold:
+            return None
+
+        with self._lock:
+            self._conn.execute(
+                "UPDATE semantic_cache SET last_access = ? WHERE id = ?",
+                (now, rows[best][0]),
+            )
+            self._conn.commit()
+        return rows[best][2]
+
+    def _semantic_store(self, messages, model, temperature, max_tokens, response, now) -> None:
+        vector = self._embed(str(messages[-1].content))
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO semantic_cache "
+                "(context_key, vector, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    self._context_key(messages, model, temperature, max_tokens),
+                    vector.tobytes(),
+                    response,
+                    now,
+                    now,
+                ),
+            )
+            self._conn.commit()
+
+    # -- maintenance ------------------------------------------------------
+
+    def evict(self) -> None:
+        """
+        Drop expired rows, then trim each tier to max_entries by LRU.
+        """
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            for table, pk in (("exact_cache", "key"), ("semantic_cache", "id")):
+                self._conn.execute(f"DELETE FROM {table} WHERE created_at <= ?", (cutoff,))
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE {pk} IN ("
+                    f"  SELECT {pk} FROM {table} ORDER BY last_access DESC"
+                    f"  LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM exact_cache")
+            self._conn.execute("DELETE FROM semantic_cache")
+            self._conn.commit()
+
+
+def _build_default_cache() -> LLMCache:
+    if not settings.llm_cache_enabled:
+        return NullLLMCache()
+
+    embedder: Optional[Embedder] = None
+    if settings.llm_semantic_cache:
+        from .llm import embed_query
+
+        embedder = embed_query
+
+    try:
+        return SQLiteLLMCache(
+            settings.llm_cache_path,
+            max_entries=settings.llm_cache_max_entries,
+            ttl=settings.llm_cache_ttl,
+            embedder=embedder,
+            similarity_threshold=settings.llm_semantic_threshold,
+        )
+    except sqlite3.Error as e:
+        print(f"[WARN] Could not open LLM cache at {settings.llm_cache_path}: {e}")
+        return NullLLMCache()
+
+
+# Opened on first use, so importing the app doesn't touch the filesystem
+_default_cache: Optional[LLMCache] = None
+_default_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """
+    Process-wide LLM answer cache, created on first call.
+    """
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = _build_default_cache()
+    return _default_cache
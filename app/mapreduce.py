@@ -0,0 +1,57 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, List, TypeVar
+
+from .history import count_tokens
+
+T = TypeVar("T")
+
+
+def chunk_by_tokens(texts: List[str], budget: int) -> List[List[int]]:
+    """
+    Group text indexes, in order, so each group's token total stays within
+    `budget`. A text larger than the budget gets a group of its own.
+    """
+    chunks: List[List[int]] = []
+    current: List[int] = []
+    used = 0
+    for i, text in enumerate(texts):
+        tokens = count_tokens(text)
+        if current and used + tokens > budget:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def gather_bounded(
+    calls: List[Callable[[], Awaitable[T]]], limit: int
+) -> List[T]:
+    """
+    Run async calls with at most `limit` in flight; results in input order.
+    """
+    semaphore = asyncio.Semaphore(max(limit, 1))
+
+    async def run(call: Callable[[], Awaitable[T]]) -> T:
+        async with semaphore:
+            return await call()
+
+    return await asyncio.gather(*(run(call) for call in calls))
+
+
+def map_bounded(calls: List[Callable[[], T]], limit: int) -> List[T]:
+    """
+    Sync twin of gather_bounded, on a short-lived thread pool. Each call
+    runs in a copy of the caller's context so spans nest correctly.
+    """
+    if len(calls) <= 1 or limit <= 1:
+        return [call() for call in calls]
+    with ThreadPoolExecutor(max_workers=min(limit, len(calls))) as pool:
+        futures = [
+            pool.submit(contextvars.copy_context().run, call) for call in calls
+        ]
+        return [future.result() for future in futures]
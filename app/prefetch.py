@@ -0,0 +1,316 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .agents import build_digest_async
+from .articles import (
+    Article,
+    ArticleDelta,
+    article_key,
+    decode,
+    diff_articles,
+    encode,
+    pack_columns,
+    unpack_columns,
+)
+from .config import settings
+from .tools.http_client import spawn
+from .tools.news_api import NEWS_CATEGORIES, request_news
+from .tools.news_providers import news_providers
+
+
+class HeadlineChanges(NamedTuple):
+    version: int
+    # New or changed articles since the requested version (all when full)
+    items: List[Article]
+    removed: List[str]
+    # The requested version is too old to diff from: items is the full set
+    full: bool
+
+
+# Removed-article records kept per category for delta readers
+_MAX_REMOVED = 500
+
+
+class HeadlineStore:
+    """
+    Warm store of the latest headlines per category.
+    Kept in memory as Article lists and mirrored to a binary file (columns
+    packed with msgpack, or JSON without it) so a restarted worker can serve
+    immediately instead of waiting for the first poll.
+
+    Each category has a version that only moves when its article set
+    changes; changes(category, since) returns just what changed after a
+    version, so readers can patch their view instead of reloading it.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        # category -> {"items": [...], "fetched_at": epoch seconds,
+        #              "version": int, "versions": {article key: version},
+        #              "removed": {article key: version}, "floor": int}
+        self._data: Dict[str, Dict] = {}
+        self._load()
+
+    @staticmethod
+    def _entry(items: List[Article], fetched_at: float, version: int) -> Dict:
+        # floor: oldest version changes() can diff from (history before it is gone)
+        return {
+            "items": items,
+            "fetched_at": fetched_at,
+            "version": version,
+            "versions": {article_key(item): version for item in items},
+            "removed": {},
+            "floor": version,
+        }
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as f:
+                stored = decode(f.read())
+            self._data = {
+                category: self._entry(
+                    unpack_columns(entry["items"]),
+                    entry["fetched_at"],
+                    entry.get("version", 1),
+                )
+                for category, entry in stored.items()
+            }
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"[WARN] Could not read headline store {self.path}: {e}")
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            payload = encode({
+                category: {
+                    "items": pack_columns(entry["items"]),
+                    "fetched_at": entry["fetched_at"],
+                    "version": entry["version"],
+                }
+                for category, entry in self._data.items()
+            })
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[WARN] Could not write headline store {self.path}: {e}")
+
+    def put(
+        self, category: str, items: List[Dict], fetched_at: Optional[float] = None
+    ) -> ArticleDelta:
+        """
+        Store a fresh fetch; returns what changed against the previous one.
+        An unchanged fetch only moves fetched_at (the version stays).
+        """
+        items = [Article.from_dict(item) for item in items]
+        fetched_at = fetched_at if fetched_at is not None else time.time()
+        with self._lock:
+            entry = self._data.get(category)
+            if entry is None:
+                delta = ArticleDelta(items, [], [])
+                self._data[category] = self._entry(items, fetched_at, 1)
+            else:
+                delta = diff_articles(entry["items"], items)
+                entry["fetched_at"] = fetched_at
+                if not delta.empty:
+                    version = entry["version"] + 1
+                    entry["items"] = items
+                    entry["version"] = version
+                    for item in delta.added + delta.changed:
+                        key = article_key(item)
+                        entry["versions"][key] = version
+                        entry["removed"].pop(key, None)
+                    for item in delta.removed:
+                        key = article_key(item)
+                        entry["versions"].pop(key, None)
+                        entry["removed"][key] = version
+                    while len(entry["removed"]) > _MAX_REMOVED:
+                        oldest = next(iter(entry["removed"]))
+                        entry["floor"] = max(entry["floor"], entry["removed"].pop(oldest))
+            self._save()
+        return delta
+
+    def changes(self, category: str, since: int = 0) -> Optional[HeadlineChanges]:
+        """
+        Articles added or changed after version `since`, and keys (URLs) of
+        those removed since then. None if the category was never fetched.
+        """
+        with self._lock:
+            entry = self._data.get(category)
+            if not entry:
+                return None
+            version = entry["version"]
+            if since < entry["floor"] or since > version:
+                return HeadlineChanges(version, list(entry["items"]), [], True)
+            items = [
+                item for item in entry["items"]
+                if entry["versions"].get(article_key(item), 0) > since
+            ]
+            removed = [key for key, v in entry["removed"].items() if v > since]
+        return HeadlineChanges(version, items, removed, False)
+
+    def get(self, category: str) -> Optional[Tuple[List[Article], float]]:
+        """
+        Return (items, fetched_at) for a category, or None if never fetched.
+        """
+        with self._lock:
+            entry = self._data.get(category)
+        if not entry:
+            return None
+        return list(entry["items"]), entry["fetched_at"]
+
+    def get_fresh(
+        self, category: str, max_age: float
+    ) -> Optional[Tuple[List[Article], float]]:
+        """
+        Like get(), but only if the entry is younger than max_age seconds.
+        """
+        entry = self.get(category)
+        if entry is None or time.time() - entry[1] > max_age:
+            return None
+        return entry
+
+    def watermark(self, category: str) -> Optional[float]:
+        entry = self.get(category)
+        return entry[1] if entry else None
+
+
+class HeadlinePrefetcher:
+    """
+    Polls each category in the background and keeps the HeadlineStore warm.
+    Polls are spread with random jitter; failures back off exponentially
+    up to max_backoff seconds.
+    """
+
+    def __init__(
+        self,
+        store: HeadlineStore,
+        categories: List[str],
+        interval: float,
+        jitter: float = 0.1,
+        max_backoff: float = 3600.0,
+        page_size: int = 5,
+    ) -> None:
+        self.store = store
+        self.categories = categories
+        self.interval = interval
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.page_size = page_size
+        self._futures = []
+
+    def _jittered(self, delay: float) -> float:
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    async def refresh(self, category: str) -> List[Dict]:
+        """
+        Fetch one category from upstream and store it. Raises on failure.
+        """
+        items = await request_news(category, None, "en", self.page_size)
+        if not items:
+            return items
+
+        delta = self.store.put(category, items)
+        if delta.empty:
+            # Nothing changed upstream: no re-summarization
+            return items
+
+        # Summarize once per distinct article set, not once per user;
+        # build_digest_async is a no-op when the set already has a digest
+        # and patches the previous digest when only a few articles changed
+        if settings.digest_enabled:
+            try:
+                await build_digest_async(items, category, delta)
+            except Exception as e:
+                print(f"[WARN] Digest for '{category}' failed: {e}")
+        return items
+
+    async def _poll(self, category: str) -> None:
+        failures = 0
+        # Stagger the first round so categories don't all fire at once
+        await asyncio.sleep(random.uniform(0, self.interval * self.jitter))
+        while True:
+            try:
+                await self.refresh(category)
+                failures = 0
+                delay = self.interval
+            except Exception as e:
+                failures += 1
+                delay = min(self.interval * (2 ** failures), self.max_backoff)
+                print(f"[WARN] Prefetch of '{category}' failed ({failures}x): {e}")
+            await asyncio.sleep(self._jittered(delay))
+
+    def start(self) -> None:
+        if self._futures:
+            return
+        self._futures = [spawn(self._poll(c)) for c in self.categories]
+
+    def stop(self) -> None:
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._futures)
+
+
+# Loaded from disk on first use, not at import
+_headline_store: Optional[HeadlineStore] = None
+_store_lock = threading.Lock()
+
+
+def get_headline_store() -> HeadlineStore:
+    """
+    Process-wide warm headline store, loaded on first call.
+    """
+    global _headline_store
+    if _headline_store is None:
+        with _store_lock:
+            if _headline_store is None:
+                _headline_store = HeadlineStore(settings.prefetch_store_path)
+    return _headline_store
+
+_prefetcher: Optional[HeadlinePrefetcher] = None
+_prefetcher_lock = threading.Lock()
+
+
+def start_prefetcher() -> Optional[HeadlinePrefetcher]:
+    """
+    Start the process-wide prefetcher once (no-op when PREFETCH_ENABLED is off
+    or no news provider has an API key, since mock data needs no warming).
+    """
+    global _prefetcher
+    if not settings.prefetch_enabled or not news_providers:
+        return None
+
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = HeadlinePrefetcher(
+                get_headline_store(),
+                settings.prefetch_categories or NEWS_CATEGORIES,
+                interval=settings.prefetch_interval,
+                jitter=settings.prefetch_jitter,
+                max_backoff=settings.prefetch_max_backoff,
+            )
+        _prefetcher.start()
+    return _prefetcher
+
+
+def stop_prefetcher() -> None:
+    """
+    Cancel the prefetcher's polls, if it was started.
+    """
+    with _prefetcher_lock:
+        if _prefetcher is not None:
+            _prefetcher.stop()
@@ -0,0 +1,139 @@
+import math
+import re
+import time
+from collections import Counter
+from typing import List, Mapping, Optional, Sequence, TypeVar
+
+from .articles import parse_timestamp
+from .config import settings
+from .tools.news_providers import dedupe_articles
+
+A = TypeVar("A", bound=Mapping)
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+# Words that say nothing about the topic, including the news-intent words
+# the classifier already weighed ("latest", "headlines", ...), which
+# article text rarely repeats
+_STOPWORDS = frozenset(
+    """
+    a an and any are about at be been but by can could did do does for from
+    give had has have how i in is it its me my of on or please show tell than
+    that the their them there these this those to was were what when where
+    which who whom why will with would you your
+    news headline headlines latest today tonight yesterday recent recently
+    update updates breaking week morning night current events happened
+    """.split()
+)
+
+# BM25 parameters (the usual defaults)
+_K1 = 1.2
+_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    return _WORD_RE.findall((text or "").lower())
+
+
+def query_terms(query: str) -> List[str]:
+    """
+    Distinct topic words of a query, in order.
+    """
+    return [
+        w for w in dict.fromkeys(tokenize(query))
+        if len(w) > 2 and w not in _STOPWORDS
+    ]
+
+
+def bm25_scores(terms: Sequence[str], docs: Sequence[List[str]]) -> List[float]:
+    """
+    Okapi BM25 of each tokenized doc for the query terms, with document
+    frequencies taken from `docs` itself (the candidate set).
+    """
+    if not terms or not docs:
+        return [0.0] * len(docs)
+    counts = [Counter(doc) for doc in docs]
+    avgdl = sum(len(doc) for doc in docs) / len(docs) or 1.0
+    n = len(docs)
+    idf = {}
+    for term in terms:
+        df = sum(1 for c in counts if term in c)
+        idf[term] = math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    scores = []
+    for doc, c in zip(docs, counts):
+        norm = _K1 * (1 - _B + _B * len(doc) / avgdl)
+        scores.append(sum(
+            idf[t] * c[t] * (_K1 + 1) / (c[t] + norm) for t in terms if t in c
+        ))
+    return scores
+
+
+def _published_ts(item: Mapping) -> int:
+    ts = getattr(item, "published_ts", None)
+    if ts is not None:
+        return ts
+    return parse_timestamp(item.get("published_at"))
+
+
+class NewsRanker:
+    """
+    Orders fetched articles by relevance to the query before summarizing.
+
+    Each article gets a BM25 score of its title (counted twice) and
+    description against the query's topic words, normalized to [0, 1] by
+    the best one, blended with an exponential recency decay on its publish
+    time. Near-duplicates are then dropped, keeping the higher-ranked copy.
+    When at least `min_matches` articles mention a query word, the ones
+    that mention none are filtered out; broad queries ("tech headlines")
+    keep everything, ordered by recency. Ties keep provider order.
+    """
+
+    def __init__(
+        self,
+        top_k: int,
+        recency_weight: float,
+        half_life_hours: float,
+        dedup_threshold: float,
+        min_matches: int,
+    ) -> None:
+        self.top_k = top_k
+        self.recency_weight = recency_weight
+        self.half_life = max(half_life_hours, 0.01) * 3600
+        self.dedup_threshold = dedup_threshold
+        self.min_matches = min_matches
+
+    def rank(self, query: str, items: Sequence[A], now: Optional[float] = None) -> List[A]:
+        if not items:
+            return []
+        now = time.time() if now is None else now
+        terms = query_terms(query)
+        docs = [
+            tokenize(item.get("title") or "") * 2 + tokenize(item.get("description") or "")
+            for item in items
+        ]
+        lexical = bm25_scores(terms, docs)
+        best = max(lexical)
+
+        scored = []
+        for i, item in enumerate(items):
+            ts = _published_ts(item)
+            recency = 0.5 ** (max(now - ts, 0) / self.half_life) if ts else 0.0
+            relevance = lexical[i] / best if best > 0 else 0.0
+            score = (1 - self.recency_weight) * relevance + self.recency_weight * recency
+            scored.append((score, i, lexical[i] > 0))
+
+        matches = sum(1 for _, _, matched in scored if matched)
+        if terms and matches >= self.min_matches:
+            scored = [s for s in scored if s[2]]
+        scored.sort(key=lambda s: (-s[0], s[1]))
+        return dedupe_articles([items[i] for _, i, _ in scored], self.dedup_threshold)
+
+
+news_ranker = NewsRanker(
+    top_k=settings.news_rank_top_k,
+    recency_weight=settings.news_rank_recency_weight,
+    half_life_hours=settings.news_rank_half_life_hours,
+    dedup_threshold=settings.news_dedup_threshold,
+    min_matches=settings.news_rank_min_matches,
+)
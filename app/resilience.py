@@ -0,0 +1,339 @@
+import asyncio
+import concurrent.futures
+import hashlib
+import random
+import threading
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, Tuple, TypeVar
+
+import httpx
+
+from .config import settings
+from .telemetry import telemetry
+
+T = TypeVar("T")
+
+# Circuit states, also the values of the newsgenie_circuit_state gauge
+CLOSED, HALF_OPEN, OPEN = 0, 1, 2
+_STATE_NAMES = {CLOSED: "closed", HALF_OPEN: "half_open", OPEN: "open"}
+
+
+class CallAbandoned(Exception):
+    """
+    Base for errors raised to stop a call on purpose (e.g. a losing
+    speculative branch). Says nothing about the provider's health.
+    """
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling a provider whose circuit is open.
+    """
+
+    def __init__(self, provider: str, retry_in: float) -> None:
+        super().__init__(f"{provider} is unavailable (circuit open, retry in {retry_in:.0f}s)")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+class TokenBucket:
+    """
+    Allows `rate` calls per second on average with bursts of up to `burst`.
+    Callers over the limit reserve a future token and sleep until it is due,
+    so waiting callers are served in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.capacity = max(burst, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take a token; return how long to wait before using it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls
+    for `reset_timeout` seconds; then lets one probe through (half-open)
+    and closes again if it succeeds.
+    """
+
+    def __init__(self, provider: str, failure_threshold: int, reset_timeout: float) -> None:
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._publish()
+
+    def _publish(self) -> None:
+        telemetry.set_gauge("newsgenie_circuit_state", self.state, provider=self.provider)
+
+    def _transition(self, state: int) -> None:
+        if state != self.state:
+            print(f"[WARN] Circuit for {self.provider} is now {_STATE_NAMES[state]}")
+            self.state = state
+            self._publish()
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if self.state == OPEN and remaining <= 0:
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+        telemetry.inc("newsgenie_circuit_rejections_total", provider=self.provider)
+        raise CircuitOpenError(self.provider, max(remaining, 0.0))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self._transition(CLOSED)
+
+    def abandon(self) -> None:
+        """
+        The call was cancelled midway: free the half-open probe slot.
+        """
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._transition(OPEN)
+
+
+def _status_code(e: Exception) -> Optional[int]:
+    response = getattr(e, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def is_retryable(e: Exception) -> bool:
+    """
+    Transport errors, timeouts, 429 and 5xx are worth retrying (and count
+    against the provider's health); other errors are the caller's problem.
+    """
+    if isinstance(e, (httpx.TransportError, asyncio.TimeoutError)):
+        return True
+    code = _status_code(e)
+    if code is not None:
+        return code == 429 or code >= 500
+    # OpenAI SDK connection/timeout errors carry no response
+    return type(e).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def retry_after(e: Exception) -> Optional[float]:
+    response = getattr(e, "response", None)
+    headers = getattr(response, "headers", None)
+    value = headers.get("retry-after") if headers is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class Guard:
+    """
+    Rate limit, retry and circuit-break calls to one provider (and key).
+
+    - Each attempt takes a token from the provider's bucket (if limited).
+    - Retryable failures back off exponentially with full jitter, or wait
+      for Retry-After when the provider sends one (capped).
+    - Retryable failures feed the circuit breaker; while it is open calls
+      fail immediately with CircuitOpenError so callers can fall back to
+      cached data instead of waiting on timeouts.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        rate: Optional[float],
+        burst: float,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float,
+        retry_after_max: float,
+        failure_threshold: int,
+        reset_timeout: float,
+    ) -> None:
+        self.provider = provider
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.breaker = CircuitBreaker(provider, failure_threshold, reset_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+
+    def _admit(self) -> float:
+        self.breaker.before_call()
+        wait = self.bucket.reserve() if self.bucket else 0.0
+        if wait > 0:
+            telemetry.inc("newsgenie_rate_limit_wait_seconds_total", wait, provider=self.provider)
+        return wait
+
+    def _on_error(self, e: Exception, attempt: int) -> Optional[float]:
+        """
+        Record the failure; return the delay before retrying, or None to raise.
+        """
+        if isinstance(e, (CallAbandoned, asyncio.CancelledError, concurrent.futures.CancelledError)):
+            # Stopped by us, neither a success nor a failure of the provider
+            self.breaker.abandon()
+            return None
+        if not is_retryable(e):
+            self.breaker.record_success()
+            return None
+        if _status_code(e) == 429:
+            telemetry.inc("newsgenie_upstream_throttled_total", provider=self.provider)
+        self.breaker.record_failure()
+        if attempt >= self.max_retries or self.breaker.state == OPEN:
+            return None
+        telemetry.inc("newsgenie_upstream_retries_total", provider=self.provider)
+        hinted = retry_after(e)
+        if hinted is not None:
+            return min(hinted, self.retry_after_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def call(self, make_call: Callable[[], Awaitable[T]]) -> T:
+        attempt = 0
+        while True:
+            wait = self._admit()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                result = await make_call()
+            except Exception as e:
+                delay = self._on_error(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                self.breaker.abandon()
+                raise
+            self.breaker.record_success()
+            return result
+
+    def call_sync(self, make_call: Callable[[], T]) -> T:
+        attempt = 0
+        while True:
+            wait = self._admit()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                result = make_call()
+            except Exception as e:
+                delay = self._on_error(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                self.breaker.abandon()
+                raise
+            self.breaker.record_success()
+            return result
+
+    def stream_sync(self, make_stream: Callable[[], Iterator[T]]) -> Iterator[T]:
+        """
+        Guarded streaming: retried only while nothing has been yielded yet.
+        """
+        attempt = 0
+        while True:
+            wait = self._admit()
+            if wait > 0:
+                time.sleep(wait)
+            started = False
+            try:
+                for item in make_stream():
+                    started = True
+                    yield item
+            except Exception as e:
+                delay = self._on_error(e, attempt)
+                if delay is None or started:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                self.breaker.abandon()
+                raise
+            self.breaker.record_success()
+            return
+
+    async def stream(self, make_stream: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """
+        Async version of stream_sync.
+        """
+        attempt = 0
+        while True:
+            wait = self._admit()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            started = False
+            try:
+                async for item in make_stream():
+                    started = True
+                    yield item
+            except Exception as e:
+                delay = self._on_error(e, attempt)
+                if delay is None or started:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                self.breaker.abandon()
+                raise
+            self.breaker.record_success()
+            return
+
+
+_guards: Dict[Tuple[str, str], Guard] = {}
+_guards_lock = threading.Lock()
+
+
+def guard_for(provider: str, api_key: str = "") -> Guard:
+    """
+    Shared Guard for a provider and API key (different keys of the same
+    provider have separate quotas, so they get separate buckets/breakers).
+    """
+    key_id = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:8] if api_key else ""
+    with _guards_lock:
+        guard = _guards.get((provider, key_id))
+        if guard is None:
+            guard = Guard(
+                provider,
+                rate=settings.upstream_rate_limits.get(provider),
+                burst=settings.upstream_burst,
+                max_retries=settings.upstream_max_retries,
+                backoff_base=settings.upstream_backoff_base,
+                backoff_max=settings.upstream_backoff_max,
+                retry_after_max=settings.upstream_retry_after_max,
+                failure_threshold=settings.breaker_failure_threshold,
+                reset_timeout=settings.breaker_reset_timeout,
+            )
+            _guards[(provider, key_id)] = guard
+        return guard
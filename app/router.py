@@ -0,0 +1,129 @@
+from typing import Any, Dict, NamedTuple, Optional
+
+from .config import settings
+from .telemetry import telemetry
+
+
+class Route(NamedTuple):
+    name: str
+    model: str
+    max_tokens: int
+    # Use the short system prompt instead of the full SYSTEM_PROMPT
+    compact_prompt: bool = False
+
+
+# Default completion caps per route (LLM_ROUTE_MAX_TOKENS overrides)
+_MAX_TOKENS: Dict[str, int] = {
+    "general.short": 400,
+    "general": 800,
+    "general.long": 1000,
+    "news": 700,
+    "news.synthesis": 1000,
+    "personalize": 500,
+    "digest.update": 800,
+    "history": 250,
+    "collapse": 300,
+    "map": 1200,
+}
+
+# Completion tokens allowed per article in a map (one sentence each)
+_MAP_TOKENS_PER_ARTICLE = 60
+
+
+class ModelRouter:
+    """
+    Picks a model tier and completion cap for each LLM call.
+
+    Tasks map to routes by what the call has to do and how big its input
+    is: short general questions get a compact prompt and a small cap,
+    long inputs and large article syntheses go to the strong tier, and
+    mechanical steps (history folding, map/collapse) stay on the fast one.
+    """
+
+    def __init__(
+        self,
+        fast_model: str,
+        strong_model: str,
+        short_max_tokens: int,
+        strong_min_tokens: int,
+        strong_min_articles: int,
+        max_tokens: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self.fast_model = fast_model
+        self.strong_model = strong_model
+        self.short_max_tokens = short_max_tokens
+        self.strong_min_tokens = strong_min_tokens
+        self.strong_min_articles = strong_min_articles
+        self.max_tokens = dict(_MAX_TOKENS)
+        self.max_tokens.update({k: int(v) for k, v in (max_tokens or {}).items()})
+
+    def _route(self, name: str, model: str, compact_prompt: bool = False) -> Route:
+        return Route(name, model, self.max_tokens[name], compact_prompt)
+
+    def default(self) -> Route:
+        return self._route("general", self.fast_model)
+
+    def route(self, task: str, input_tokens: int = 0, article_count: int = 0) -> Route:
+        """
+        task: "general", "news", "personalize", "digest.update", "history",
+        "map" or "collapse".
+        """
+        if task == "general":
+            if input_tokens >= self.strong_min_tokens:
+                return self._route("general.long", self.strong_model)
+            if input_tokens <= self.short_max_tokens:
+                return self._route("general.short", self.fast_model, compact_prompt=True)
+            return self._route("general", self.fast_model)
+        if task == "news":
+            if (
+                article_count >= self.strong_min_articles
+                or input_tokens >= self.strong_min_tokens
+            ):
+                return self._route("news.synthesis", self.strong_model)
+            return self._route("news", self.fast_model)
+        if task == "map":
+            # Enough for one sentence per article, not a free-form essay
+            cap = min(self.max_tokens["map"], _MAP_TOKENS_PER_ARTICLE * max(article_count, 1))
+            return Route("map", self.fast_model, cap)
+        if task in ("personalize", "digest.update", "history", "collapse"):
+            return self._route(task, self.fast_model)
+        raise ValueError(f"unknown LLM task: {task}")
+
+    @staticmethod
+    def cost(model: str, usage: Optional[Dict[str, Any]]) -> float:
+        """
+        Estimated USD for one call's token usage (0 for unpriced models).
+        """
+        if not usage:
+            return 0.0
+        prompt = int(usage.get("input_tokens", 0) or 0)
+        completion = int(usage.get("output_tokens", 0) or 0)
+        return (
+            prompt * settings.llm_input_prices.get(model.lower(), 0.0)
+            + completion * settings.llm_output_prices.get(model.lower(), 0.0)
+        ) / 1_000_000
+
+    @staticmethod
+    def record_latency(route: Route, seconds: float) -> None:
+        """
+        Per-route latency (span histogram "llm.route.<name>") and call count.
+        """
+        telemetry.observe(f"llm.route.{route.name}", seconds)
+        telemetry.inc("newsgenie_llm_route_calls_total", route=route.name, model=route.model)
+
+    def record_usage(self, route: Route, usage: Optional[Dict[str, Any]]) -> None:
+        cost = self.cost(route.model, usage)
+        if cost:
+            telemetry.inc(
+                "newsgenie_llm_cost_usd_total", cost, route=route.name, model=route.model
+            )
+
+
+model_router = ModelRouter(
+    fast_model=settings.llm_model_fast,
+    strong_model=settings.llm_model_strong,
+    short_max_tokens=settings.llm_short_max_tokens,
+    strong_min_tokens=settings.llm_strong_min_tokens,
+    strong_min_articles=settings.llm_strong_min_articles,
+    max_tokens=settings.llm_route_max_tokens,
+)
@@ -0,0 +1,330 @@
+import asyncio
+import contextlib
+import json
+import socket
+import threading
+import uuid
+import weakref
+from typing import AsyncIterator, Dict, Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from .articles import as_dicts
+from .config import settings
+from .graph import get_graph
+from .prefetch import get_headline_store, start_prefetcher, stop_prefetcher
+from .sessions import get_session_checkpointer
+from .telemetry import export_otlp_forever, flush_otlp, telemetry
+
+
+class Overloaded(Exception):
+    pass
+
+
+class Admission:
+    """
+    Concurrency limit with a bounded wait queue: at most `max_concurrency`
+    graph runs execute at once, at most `max_queue` more wait for a slot,
+    and anything beyond that is rejected immediately (backpressure).
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.active = 0
+        self.waiting = 0
+
+    def check(self) -> None:
+        if self.active >= self.max_concurrency and self.waiting >= self.max_queue:
+            raise Overloaded()
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        self.check()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+
+admission = Admission(settings.server_max_concurrency, settings.server_max_queue)
+
+# One lock per live session, so turns of a session never interleave. Only
+# requests hold references to a lock: its entry goes away with the last
+# request of the session, including the DELETE that ends it
+_session_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def _session_lock(session_id: str) -> asyncio.Lock:
+    lock = _session_locks.get(session_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _session_locks[session_id] = lock
+    return lock
+
+
+def _busy() -> JSONResponse:
+    return JSONResponse(
+        {"error": "server busy, retry later"}, status_code=503, headers={"Retry-After": "1"}
+    )
+
+
+async def _parse_query(request: Request):
+    """
+    Return (session_id, query, news_category) or raise ValueError.
+    """
+    try:
+        body = await request.json()
+    except json.JSONDecodeError:
+        raise ValueError("request body must be JSON")
+    if not isinstance(body, dict):
+        raise ValueError("request body must be a JSON object")
+    query = body.get("query") or ""
+    if not isinstance(query, str):
+        raise ValueError("'query' must be a string")
+    query = query.strip()
+    if not query:
+        raise ValueError("'query' is required")
+    session_id = body.get("session_id") or uuid.uuid4().hex
+    return session_id, query, body.get("news_category") or None
+
+
+def _initial_state(query: str, news_category: Optional[str], stream: bool) -> Dict:
+    # Only the new turn: the session's memory is restored by the checkpointer
+    return {"user_query": query, "news_category": news_category, "stream": stream}
+
+
+def _run_config(session_id: str) -> Dict:
+    return {"configurable": {"thread_id": session_id}}
+
+
+# Checkpoint once per turn, when the run ends, rather than after every node
+_DURABILITY = "exit"
+
+
+def _finish_turn(session_id: str, result: Dict) -> Dict:
+    """
+    Build the response payload (the memory was saved by the checkpointer).
+    """
+    return {
+        "session_id": session_id,
+        "answer": result.get("final_answer", ""),
+        "query_type": result.get("query_type"),
+        "news_results": as_dicts(result.get("news_results", [])),
+        "news_as_of": result.get("news_as_of"),
+        "error": result.get("error"),
+    }
+
+
+# -- endpoints --------------------------------------------------------------
+
+async def query(request: Request) -> JSONResponse:
+    """
+    POST {"query", "session_id"?, "news_category"?} -> answer as JSON.
+    """
+    try:
+        session_id, user_query, category = await _parse_query(request)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    graph = request.app.state.graph
+    try:
+        async with admission.slot(), _session_lock(session_id):
+            state = _initial_state(user_query, category, stream=False)
+            result = await asyncio.wait_for(
+                graph.ainvoke(state, _run_config(session_id), durability=_DURABILITY),
+                settings.server_request_timeout,
+            )
+    except Overloaded:
+        return _busy()
+    except asyncio.TimeoutError:
+        return JSONResponse({"error": "request timed out"}, status_code=504)
+
+    return JSONResponse(_finish_turn(session_id, result))
+
+
+def _sse(event: str, data) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+async def query_stream(request: Request):
+    """
+    Same as /query, answered as Server-Sent Events:
+      event: news_results  data: {"category", "items"}
+      event: token         data: {"text"}
+      event: done          data: <the /query response>
+      event: error         data: {"error"}
+    """
+    try:
+        session_id, user_query, category = await _parse_query(request)
+        # Reject before the 200 goes out; the slot itself is taken in events()
+        admission.check()
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    except Overloaded:
+        return _busy()
+
+    graph = request.app.state.graph
+
+    async def events() -> AsyncIterator[bytes]:
+        try:
+            async with admission.slot(), _session_lock(session_id):
+                state = _initial_state(user_query, category, stream=True)
+                result: Dict = {}
+                async with asyncio.timeout(settings.server_request_timeout):
+                    async for mode, chunk in graph.astream(
+                        state,
+                        _run_config(session_id),
+                        stream_mode=["custom", "values"],
+                        durability=_DURABILITY,
+                    ):
+                        if mode == "values":
+                            result = chunk
+                        elif chunk.get("type") == "token":
+                            yield _sse("token", {"text": chunk["text"]})
+                        elif chunk.get("type") == "news_results":
+                            yield _sse("news_results", {
+                                "category": chunk["category"], "items": as_dicts(chunk["items"]),
+                            })
+                yield _sse("done", _finish_turn(session_id, result))
+        except Overloaded:
+            yield _sse("error", {"error": "server busy, retry later"})
+        except TimeoutError:
+            yield _sse("error", {"error": "request timed out"})
+        except Exception as e:
+            # The 200 is already out: end the stream with an error event
+            print(f"[WARN] Streamed query failed: {e}")
+            yield _sse("error", {"error": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Session-Id": session_id},
+    )
+
+
+async def session(request: Request) -> JSONResponse:
+    """
+    GET returns a session's memory; DELETE forgets it.
+    """
+    session_id = request.path_params["session_id"]
+    if request.method == "DELETE":
+        # Wait for a running turn, so it can't write the session back
+        async with _session_lock(session_id):
+            await get_session_checkpointer().adelete_thread(session_id)
+        return JSONResponse({"session_id": session_id, "deleted": True})
+    memory = await asyncio.to_thread(get_session_checkpointer().memory, session_id)
+    if memory is None:
+        return JSONResponse({"error": "unknown session"}, status_code=404)
+    return JSONResponse({"session_id": session_id, **memory})
+
+
+async def news(request: Request) -> JSONResponse:
+    """
+    Warm headlines of a category. With ?since=<version> only the articles
+    added or changed after that version (and removed URLs) are returned,
+    so clients can patch their cards instead of reloading them.
+    """
+    category = request.path_params["category"]
+    try:
+        since = int(request.query_params.get("since", "0"))
+    except ValueError:
+        return JSONResponse({"error": "since must be an integer"}, status_code=400)
+    changes = get_headline_store().changes(category, since)
+    if changes is None:
+        return JSONResponse({"error": "no headlines for this category yet"}, status_code=404)
+    return JSONResponse({
+        "category": category,
+        "version": changes.version,
+        "full": changes.full,
+        "items": as_dicts(changes.items),
+        "removed": changes.removed,
+    })
+
+
+async def health(request: Request) -> JSONResponse:
+    return JSONResponse({
+        "status": "ok",
+        "active": admission.active,
+        "waiting": admission.waiting,
+    })
+
+
+async def metrics(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(
+        telemetry.render_prometheus(), media_type="text/plain; version=0.0.4"
+    )
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: Starlette):
+    # One compiled graph shared by every session and request; sessions are
+    # checkpointed by thread_id, so requests carry only the new turn
+    app.state.graph = get_graph(sessions=True)
+    # Polls run on the shared I/O loop; their LLM calls use that loop's own
+    # clients (app/llm.py), so requests on this loop are unaffected
+    start_prefetcher()
+    exporter = None
+    if settings.telemetry_enabled and settings.telemetry_otlp_endpoint:
+        exporter = asyncio.create_task(
+            export_otlp_forever(settings.telemetry_export_interval)
+        )
+    try:
+        yield
+    finally:
+        stop_prefetcher()
+        if exporter is not None:
+            exporter.cancel()
+            # Last spans of the run
+            await flush_otlp()
+
+
+app = Starlette(
+    routes=[
+        Route("/query", query, methods=["POST"]),
+        Route("/query/stream", query_stream, methods=["POST"]),
+        Route("/sessions/{session_id}", session, methods=["GET", "DELETE"]),
+        Route("/news/{category}", news),
+        Route("/healthz", health),
+        Route("/metrics", metrics),
+    ],
+    lifespan=lifespan,
+)
+
+
+def start_embedded_server(host: str = "127.0.0.1") -> str:
+    """
+    Serve the app from a daemon thread on a free local port (used by the
+    Streamlit client when NEWSGENIE_API_URL is unset). Returns its base URL.
+    """
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="newsgenie-api", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("embedded API server failed to start")
+        threading.Event().wait(0.05)
+    return f"http://{host}:{port}"
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=settings.server_host, port=settings.server_port)
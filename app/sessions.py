@@ -0,0 +1,375 @@
+import abc
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    empty_checkpoint,
+)
+
+from .config import settings
+from .telemetry import span
+
+# Graph state channels that outlive a turn; everything else (the query,
+# news results, the answer) is per-turn and is not persisted
+MEMORY_KEYS = ("chat_history", "history_summary")
+
+
+def empty_memory() -> Dict:
+    """
+    What the graph remembers about a session between turns.
+    """
+    return {"chat_history": [], "history_summary": None}
+
+
+class SessionStore(abc.ABC):
+    """
+    Interface for per-session graph memory used by the API server.
+    """
+
+    @abc.abstractmethod
+    def get(self, session_id: str) -> Optional[Dict]:
+        ...
+
+    @abc.abstractmethod
+    def put(self, session_id: str, memory: Dict) -> None:
+        ...
+
+    @abc.abstractmethod
+    def delete(self, session_id: str) -> None:
+        ...
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Process-local store; sessions idle for `ttl` seconds expire and the
+    least recently used ones are dropped beyond `max_sessions`.
+    """
+
+    def __init__(self, max_sessions: int = 10000, ttl: float = 86400.0) -> None:
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, Tuple[Dict, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[1] > self.ttl:
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            return entry[0]
+
+    def put(self, session_id: str, memory: Dict) -> None:
+        with self._lock:
+            self._sessions[session_id] = (memory, time.monotonic())
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions persisted as JSON in SQLite, so they survive restarts and can
+    be shared by several server processes on one host.
+    """
+
+    _PRUNE_EVERY = 100
+
+    def __init__(self, path: str, ttl: float = 86400.0) -> None:
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                memory TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT memory FROM sessions WHERE session_id = ? AND updated_at > ?",
+                (session_id, time.time() - self.ttl),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, session_id: str, memory: Dict) -> None:
+        data = json.dumps(memory, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)",
+                (session_id, data, time.time()),
+            )
+            self._writes += 1
+            if self._writes % self._PRUNE_EVERY == 0:
+                self._conn.execute(
+                    "DELETE FROM sessions WHERE updated_at <= ?", (time.time() - self.ttl,)
+                )
+            self._conn.commit()
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Sessions as JSON strings in Redis (or any server speaking its protocol),
+    expiring after `ttl` seconds idle. Lets several hosts share sessions.
+    Needs the optional `redis` package.
+    """
+
+    _PREFIX = "newsgenie:session:"
+
+    def __init__(self, url: str, ttl: float = 86400.0) -> None:
+        import redis
+
+        self.ttl = ttl
+        self._client = redis.Redis.from_url(url)
+        self._client.ping()
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        data = self._client.get(self._PREFIX + session_id)
+        return json.loads(data) if data else None
+
+    def put(self, session_id: str, memory: Dict) -> None:
+        data = json.dumps(memory, ensure_ascii=False, separators=(",", ":"))
+        self._client.set(self._PREFIX + session_id, data, ex=max(int(self.ttl), 1))
+
+    def delete(self, session_id: str) -> None:
+        self._client.delete(self._PREFIX + session_id)
+
+
+class SessionCheckpointer(BaseCheckpointSaver):
+    """
+    LangGraph checkpointer over a SessionStore, keyed by thread_id (the
+    session id). Compiling the graph with it lets callers send only the new
+    turn: chat_history and history_summary are restored from the store and
+    saved back when the run ends.
+
+    Only the latest checkpoint of a thread is kept, and only the MEMORY_KEYS
+    channel values are stored with it (channel versions are kept whole, so
+    the next run still triggers every node). Pending writes are not stored:
+    an interrupted run is not resumed, the next turn simply starts over.
+    """
+
+    def __init__(self, store: SessionStore) -> None:
+        super().__init__()
+        self.store = store
+
+    @staticmethod
+    def _thread_id(config: RunnableConfig) -> str:
+        return str(config["configurable"]["thread_id"])
+
+    def memory(self, thread_id: str) -> Optional[Dict]:
+        """
+        The session's chat_history and history_summary, or None if unknown.
+        """
+        stored = self.store.get(thread_id)
+        if stored is None:
+            return None
+        return {key: stored.get(key, empty_memory()[key]) for key in MEMORY_KEYS}
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        configurable = config["configurable"]
+        if configurable.get("checkpoint_ns"):
+            return None
+        thread_id = self._thread_id(config)
+        with span("session.load"):
+            stored = self.store.get(thread_id)
+        if stored is None:
+            return None
+
+        # Sessions saved before checkpointing have memory but no checkpoint
+        checkpoint = dict(stored.get("checkpoint") or empty_checkpoint())
+        wanted = configurable.get("checkpoint_id")
+        if wanted and wanted != checkpoint["id"]:
+            return None
+        checkpoint["channel_values"] = {
+            key: stored[key] for key in MEMORY_KEYS if key in stored
+        }
+        # Turns append to chat_history in place; keep the stored copy intact
+        if "chat_history" in checkpoint["channel_values"]:
+            checkpoint["channel_values"]["chat_history"] = list(
+                checkpoint["channel_values"]["chat_history"] or []
+            )
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": "",
+                    "checkpoint_id": checkpoint["id"],
+                }
+            },
+            checkpoint=checkpoint,
+            metadata=stored.get("metadata") or {"source": "input", "step": -1},
+            pending_writes=[],
+        )
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        if config is None or before is not None or limit == 0:
+            return
+        latest = self.get_tuple(config)
+        if latest is not None and all(
+            latest.metadata.get(k) == v for k, v in (filter or {}).items()
+        ):
+            yield latest
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = self._thread_id(config)
+        if config["configurable"].get("checkpoint_ns"):
+            return config
+        values = checkpoint["channel_values"]
+        stored: Dict[str, Any] = {key: values[key] for key in MEMORY_KEYS if key in values}
+        stored["checkpoint"] = {k: v for k, v in checkpoint.items() if k != "channel_values"}
+        stored["metadata"] = {
+            k: metadata[k] for k in ("source", "step") if k in metadata
+        }
+        with span("session.save"):
+            self.store.put(thread_id, stored)
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": "",
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        # Intermediate writes only matter for resuming a run, which we don't
+        return None
+
+    def delete_thread(self, thread_id: str) -> None:
+        self.store.delete(thread_id)
+
+    # Store I/O can block (SQLite, Redis), so the async API runs it off the loop
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        tuples = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in tuples:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        return None
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+def _build_default_store() -> SessionStore:
+    if settings.session_store == "sqlite":
+        try:
+            return SQLiteSessionStore(settings.session_store_path, settings.session_ttl)
+        except sqlite3.Error as e:
+            print(f"[WARN] Could not open session store at {settings.session_store_path}: {e}")
+    elif settings.session_store == "redis":
+        try:
+            return RedisSessionStore(settings.session_store_url, settings.session_ttl)
+        except ImportError:
+            print("[WARN] SESSION_STORE=redis needs the 'redis' package; using memory.")
+        except Exception as e:
+            print(f"[WARN] Could not reach session store at {settings.session_store_url}: {e}")
+    return InMemorySessionStore(settings.session_max, settings.session_ttl)
+
+
+# Opened (or connected) on first use, so importing the server does no I/O
+_session_checkpointer: Optional[SessionCheckpointer] = None
+_default_lock = threading.Lock()
+
+
+def get_session_checkpointer() -> SessionCheckpointer:
+    """
+    Process-wide checkpointer over the configured session store (SESSION_STORE),
+    created on first call.
+    """
+    global _session_checkpointer
+    if _session_checkpointer is None:
+        with _default_lock:
+            if _session_checkpointer is None:
+                _session_checkpointer = SessionCheckpointer(_build_default_store())
+    return _session_checkpointer
+
+
+def get_session_store() -> SessionStore:
+    """
+    The store behind get_session_checkpointer().
+    """
+    return get_session_checkpointer().store
@@ -0,0 +1,91 @@
+import threading
+from typing import Callable, List, Mapping, Optional, Sequence
+
+from .ranking import query_terms, tokenize
+from .resilience import CallAbandoned
+
+TokenCallback = Callable[[str], None]
+
+# Only the top articles are checked, like the ones a summary would lead with
+_RELEVANCE_TOP_N = 10
+
+
+def news_relevance(query: str, items: Sequence[Mapping]) -> float:
+    """
+    Best share of the query's topic words found in any one top article's
+    title and description, in [0, 1]. 0.5 (no evidence either way) when
+    the query has no topic words at all.
+    """
+    keywords = query_terms(query)
+    if not keywords:
+        return 0.5
+    best = 0.0
+    for item in items[:_RELEVANCE_TOP_N]:
+        words = set(tokenize(f"{item.get('title') or ''} {item.get('description') or ''}"))
+        best = max(best, sum(k in words for k in keywords) / len(keywords))
+        if best == 1.0:
+            break
+    return best
+
+
+def news_score(
+    query_type: str, confidence: float, query: str, items: Sequence[Mapping]
+) -> float:
+    """
+    Blend the classifier's news probability with how well the fetched
+    articles match the query. >= 0.5 means the news answer should win.
+    """
+    if not items:
+        return 0.0
+    p_news = confidence if query_type == "news" else 1.0 - confidence
+    return 0.5 * p_news + 0.5 * news_relevance(query, items)
+
+
+class SpeculationCancelled(CallAbandoned):
+    """
+    Raised into a losing branch's token stream to stop it.
+    """
+
+
+class TokenGate:
+    """
+    Holds back streamed tokens until a branch is picked.
+    Before open() tokens are buffered; open(emit) flushes them in order and
+    forwards the rest as they arrive. After cancel() the next token raises
+    SpeculationCancelled, which aborts the stream (and the LLM request)
+    feeding the gate. Safe to feed from another thread.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buffer: List[str] = []
+        self._emit: Optional[TokenCallback] = None
+        self._opened = False
+        self._cancelled = False
+
+    def __call__(self, text: str) -> None:
+        with self._lock:
+            if self._cancelled:
+                raise SpeculationCancelled()
+            if not self._opened:
+                self._buffer.append(text)
+            elif self._emit is not None:
+                self._emit(text)
+
+    def open(self, emit: Optional[TokenCallback]) -> None:
+        """
+        Release the branch; emit is None when the caller isn't streaming.
+        """
+        with self._lock:
+            buffered, self._buffer = self._buffer, []
+            self._emit, self._opened = emit, True
+            if emit is not None:
+                for text in buffered:
+                    emit(text)
+
+    def cancel(self) -> None:
+        with self._lock:
+            # An opened gate belongs to the winner, let it finish
+            if not self._opened:
+                self._cancelled = True
+                self._buffer = []
@@ -0,0 +1,414 @@
+import asyncio
+import contextlib
+import contextvars
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .config import settings
+
+# Upper bounds (seconds) of the latency histogram buckets
+_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list (0.0 when empty).
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+class Span:
+    """
+    A finished or in-flight unit of work. Only sampled traces create spans;
+    everything else just feeds the aggregate metrics.
+    """
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id",
+        "start_ns", "end_ns", "attributes", "status",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        start_ns: Optional[int] = None,
+        span_id: Optional[str] = None,
+    ) -> None:
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = span_id or _new_id(8)
+        self.parent_id = parent_id
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = {}
+        self.status = "ok"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+
+# (trace_id, parent span_id, sampled) of the work currently running
+TraceContext = Tuple[str, Optional[str], bool]
+
+_trace_ctx: contextvars.ContextVar[Optional[TraceContext]] = contextvars.ContextVar(
+    "newsgenie_trace", default=None
+)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "newsgenie_span", default=None
+)
+
+
+def _labels(labels: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Telemetry:
+    """
+    Span recorder and metric registry for the pipeline.
+
+    - Metrics (span latency histograms, token, cache and upstream status
+      counters) are always aggregated while enabled; they are cheap.
+    - Spans are only built for sampled traces (TRACE_SAMPLE_RATE) and are
+      kept in a bounded buffer until exported.
+    - Exports: OTLP/JSON trace payloads and Prometheus text exposition.
+    """
+
+    METRIC_HELP = {
+        "newsgenie_llm_tokens_total": "LLM tokens by model and kind.",
+        "newsgenie_llm_route_calls_total": "LLM calls by route and model.",
+        "newsgenie_llm_cost_usd_total": "Estimated LLM spend in USD by route and model.",
+        "newsgenie_cache_requests_total": "Cache lookups by cache and status.",
+        "newsgenie_speculative_runs_total": "Speculative news/general runs by winning branch and whether the loser was cancelled.",
+        "newsgenie_upstream_responses_total": "Upstream HTTP responses by provider and status code.",
+        "newsgenie_upstream_retries_total": "Upstream calls retried after a transient failure.",
+        "newsgenie_upstream_throttled_total": "Upstream 429 responses.",
+        "newsgenie_rate_limit_wait_seconds_total": "Time spent waiting on local rate limits.",
+        "newsgenie_circuit_rejections_total": "Calls rejected because a circuit was open.",
+        "newsgenie_circuit_state": "Circuit breaker state (0 closed, 1 half-open, 2 open).",
+    }
+
+    def __init__(self, enabled: bool, sample_rate: float, max_spans: int = 10000) -> None:
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._spans: "deque[Span]" = deque(maxlen=max_spans)
+        # span name -> [bucket counts..., +Inf count], sum
+        self._histograms: Dict[str, Tuple[List[int], List[float]]] = {}
+        self._counters: Dict[str, Dict[Tuple[Tuple[str, str], ...], float]] = {}
+        self._gauges: Dict[str, Dict[Tuple[Tuple[str, str], ...], float]] = {}
+
+    # -- traces -------------------------------------------------------------
+
+    def new_trace(self) -> TraceContext:
+        sampled = self.enabled and random.random() < self.sample_rate
+        return (_new_id(16), None, sampled)
+
+    def start_trace(self) -> Optional[Dict[str, Any]]:
+        """
+        Open a root span whose context can travel in graph state between
+        nodes (contextvars don't survive LangGraph's node scheduling).
+        """
+        if not self.enabled:
+            return None
+        trace_id, _, sampled = self.new_trace()
+        return {
+            "trace_id": trace_id,
+            "span_id": _new_id(8),
+            "start_ns": time.time_ns(),
+            "sampled": sampled,
+        }
+
+    def end_trace(
+        self, trace: Optional[Dict[str, Any]], name: str = "graph.run", **attributes: Any
+    ) -> None:
+        if not self.enabled or not trace:
+            return
+        end_ns = time.time_ns()
+        self.observe(name, (end_ns - trace["start_ns"]) / 1e9)
+        if trace["sampled"]:
+            root = Span(
+                name, trace["trace_id"], None,
+                start_ns=trace["start_ns"], span_id=trace["span_id"],
+            )
+            root.attributes.update(attributes)
+            root.end_ns = end_ns
+            self.finish(root)
+
+    @staticmethod
+    def parent_of(trace: Optional[Dict[str, Any]]) -> Optional[TraceContext]:
+        if not trace:
+            return None
+        return (trace["trace_id"], trace["span_id"], trace["sampled"])
+
+    @contextlib.contextmanager
+    def span(
+        self, name: str, parent: Optional[TraceContext] = None, **attributes: Any
+    ) -> Iterator[Optional[Span]]:
+        """
+        Time a block of work. Yields the Span when the trace is sampled,
+        otherwise None (the duration still lands in the histogram).
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        ctx = parent or _trace_ctx.get() or self.new_trace()
+        trace_id, parent_id, sampled = ctx
+        span = Span(name, trace_id, parent_id) if sampled else None
+        if span is not None:
+            span.attributes.update(attributes)
+
+        ctx_token = _trace_ctx.set((trace_id, span.span_id if span else parent_id, sampled))
+        span_token = _current_span.set(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            if span is not None:
+                span.status = "error"
+                span.set_attribute("error.type", type(e).__name__)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start)
+            _current_span.reset(span_token)
+            _trace_ctx.reset(ctx_token)
+            if span is not None:
+                self.finish(span)
+
+    def finish(self, span: Span) -> None:
+        span.end_ns = span.end_ns or time.time_ns()
+        with self._lock:
+            self._spans.append(span)
+
+    def drain_spans(self) -> List[Span]:
+        with self._lock:
+            spans = list(self._spans)
+            self._spans.clear()
+        return spans
+
+    # -- metrics ------------------------------------------------------------
+
+    def observe(self, name: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            buckets, total = self._histograms.setdefault(
+                name, ([0] * (len(_BUCKETS) + 1), [0.0])
+            )
+            for i, bound in enumerate(_BUCKETS):
+                if seconds <= bound:
+                    buckets[i] += 1
+                    break
+            else:
+                buckets[-1] += 1
+            total[0] += seconds
+
+    def span_summary(self) -> Dict[str, Tuple[int, float]]:
+        """
+        {span name: (count, total seconds)} from the latency histograms.
+        """
+        with self._lock:
+            return {
+                name: (sum(buckets), total[0])
+                for name, (buckets, total) in self._histograms.items()
+            }
+
+    def inc(self, metric: str, value: float = 1.0, **labels: Any) -> None:
+        if not self.enabled:
+            return
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(metric, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set_gauge(self, metric: str, value: float, **labels: Any) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges.setdefault(metric, {})[_labels(labels)] = value
+
+    # -- exporters ----------------------------------------------------------
+
+    def otlp_payload(self, spans: Optional[List[Span]] = None) -> Dict[str, Any]:
+        """
+        OTLP/JSON ExportTraceServiceRequest for the given (or drained) spans,
+        ready to POST to a collector's /v1/traces endpoint.
+        """
+        if spans is None:
+            spans = self.drain_spans()
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": settings.telemetry_service_name}},
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": "newsgenie"},
+                    "spans": [
+                        {
+                            "traceId": s.trace_id,
+                            "spanId": s.span_id,
+                            "parentSpanId": s.parent_id or "",
+                            "name": s.name,
+                            "kind": 1,
+                            "startTimeUnixNano": str(s.start_ns),
+                            "endTimeUnixNano": str(s.end_ns or s.start_ns),
+                            "attributes": [
+                                {"key": k, "value": _otlp_value(v)}
+                                for k, v in s.attributes.items()
+                            ],
+                            "status": {"code": 2 if s.status == "error" else 1},
+                        }
+                        for s in spans
+                    ],
+                }],
+            }],
+        }
+
+    def push_otlp(self, endpoint: Optional[str] = None) -> int:
+        """
+        Drain buffered spans and POST them to an OTLP/HTTP collector.
+        Returns the number of spans sent.
+        """
+        endpoint = endpoint or settings.telemetry_otlp_endpoint
+        spans = self.drain_spans()
+        if not endpoint or not spans:
+            return 0
+        import httpx
+
+        response = httpx.post(
+            endpoint.rstrip("/") + "/v1/traces", json=self.otlp_payload(spans), timeout=5.0
+        )
+        response.raise_for_status()
+        return len(spans)
+
+    def render_prometheus(self) -> str:
+        """
+        All metrics in the Prometheus text exposition format.
+        """
+        lines = [
+            "# HELP newsgenie_span_duration_seconds Duration of pipeline spans.",
+            "# TYPE newsgenie_span_duration_seconds histogram",
+        ]
+        with self._lock:
+            histograms = {k: (list(b), t[0]) for k, (b, t) in self._histograms.items()}
+            counters = {m: dict(series) for m, series in self._counters.items()}
+            counters.update({m: dict(series) for m, series in self._gauges.items()})
+
+        for name, (buckets, total) in sorted(histograms.items()):
+            label = _escape(name)
+            cumulative = 0
+            for bound, count in zip(_BUCKETS, buckets):
+                cumulative += count
+                lines.append(
+                    f'newsgenie_span_duration_seconds_bucket{{span="{label}",le="{bound}"}} {cumulative}'
+                )
+            cumulative += buckets[-1]
+            lines.append(
+                f'newsgenie_span_duration_seconds_bucket{{span="{label}",le="+Inf"}} {cumulative}'
+            )
+            lines.append(f'newsgenie_span_duration_seconds_sum{{span="{label}"}} {total:.6f}')
+            lines.append(f'newsgenie_span_duration_seconds_count{{span="{label}"}} {cumulative}')
+
+        for metric, series in sorted(counters.items()):
+            help_text = self.METRIC_HELP.get(metric, metric)
+            kind = "counter" if metric.endswith("_total") else "gauge"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for labels, value in sorted(series.items()):
+                number = int(value) if float(value).is_integer() else value
+                lines.append(f"{metric}{_format_labels(labels)} {number}")
+        return "\n".join(lines) + "\n"
+
+
+telemetry = Telemetry(
+    enabled=settings.telemetry_enabled,
+    sample_rate=settings.trace_sample_rate,
+    max_spans=settings.telemetry_max_spans,
+)
+
+
+async def flush_otlp() -> None:
+    """
+    Push buffered spans to OTEL_EXPORTER_OTLP_ENDPOINT without blocking the
+    loop. A failed push is logged and its spans are dropped.
+    """
+    try:
+        await asyncio.to_thread(telemetry.push_otlp)
+    except Exception as e:
+        print(f"[WARN] OTLP export failed: {e}")
+
+
+async def export_otlp_forever(interval: float) -> None:
+    """
+    Flush spans every `interval` seconds until cancelled (run by the API
+    server while OTEL_EXPORTER_OTLP_ENDPOINT is set).
+    """
+    while True:
+        await asyncio.sleep(interval)
+        await flush_otlp()
+
+
+# Convenience helpers used by tools, agents and the graph
+
+def span(name: str, **attributes: Any):
+    return telemetry.span(name, **attributes)
+
+
+def set_attribute(key: str, value: Any) -> None:
+    current = _current_span.get()
+    if current is not None:
+        current.set_attribute(key, value)
+
+
+def record_cache(cache: str, status: str) -> None:
+    telemetry.inc("newsgenie_cache_requests_total", cache=cache, status=status)
+    set_attribute(f"cache.{cache}", status)
+
+
+def record_upstream(provider: str, status_code: int) -> None:
+    telemetry.inc("newsgenie_upstream_responses_total", provider=provider, code=status_code)
+    set_attribute("http.status_code", status_code)
+
+
+def record_tokens(model: str, usage: Optional[Dict[str, Any]]) -> None:
+    if not usage:
+        return
+    prompt = int(usage.get("input_tokens", 0) or 0)
+    completion = int(usage.get("output_tokens", 0) or 0)
+    telemetry.inc("newsgenie_llm_tokens_total", prompt, model=model, kind="prompt")
+    telemetry.inc("newsgenie_llm_tokens_total", completion, model=model, kind="completion")
+    set_attribute("llm.prompt_tokens", prompt)
+    set_attribute("llm.completion_tokens", completion)
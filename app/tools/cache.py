@@ -0,0 +1,213 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..config import settings
+from ..telemetry import record_cache
+from .http_client import spawn
+
+CacheKey = Tuple[Any, ...]
+
+
+def make_cache_key(
+    kind: str,
+    category: Optional[str] = None,
+    query: Optional[str] = None,
+    language: Optional[str] = None,
+    page_size: Optional[int] = None,
+) -> CacheKey:
+    """
+    Build a normalized cache key so that "Latest  Tech news" and
+    "latest tech news" share an entry.
+    """
+    norm_query = " ".join((query or "").lower().split())
+    return (
+        kind,
+        (category or "").strip().lower(),
+        norm_query,
+        (language or "").strip().lower(),
+        page_size,
+    )
+
+
+class _Entry:
+    __slots__ = ("value", "stored_at", "ttl")
+
+    def __init__(self, value: Any, stored_at: float, ttl: float) -> None:
+        self.value = value
+        self.stored_at = stored_at
+        self.ttl = ttl
+
+
+class ResponseCache:
+    """
+    In-process TTL + LRU cache for upstream tool responses.
+
+    - Each category can have its own TTL (see RESPONSE_CACHE_TTLS).
+    - Entries past their TTL but within the stale window are served
+      immediately while a single background refresh runs
+      (stale-while-revalidate).
+    - Concurrent misses for the same key share one upstream call
+      (request coalescing), even across threads and event loops.
+    - Expired entries are kept for `fallback_ttl` more seconds and served
+      only if reloading them fails (last-known-good data during outages).
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        default_ttl: float,
+        stale_ttl: float,
+        ttl_overrides: Optional[Dict[str, float]] = None,
+        enabled: bool = True,
+        fallback_ttl: float = 0.0,
+    ) -> None:
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.ttl_overrides = dict(ttl_overrides or {})
+        self.enabled = enabled
+        self.fallback_ttl = fallback_ttl
+
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._inflight: Dict[CacheKey, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "refreshes": 0,
+            "evictions": 0,
+            "errors": 0,
+            "fallbacks": 0,
+        }
+
+    def ttl_for(self, category: Optional[str]) -> float:
+        return self.ttl_overrides.get((category or "").lower(), self.default_ttl)
+
+    async def get_or_load(
+        self,
+        key: CacheKey,
+        loader: Callable[[], Awaitable[Any]],
+        category: Optional[str] = None,
+    ) -> Any:
+        """
+        Return the cached value for `key`, calling `loader` on a miss.
+        Exceptions from the loader propagate and are never cached.
+        """
+        if not self.enabled:
+            return await loader()
+
+        ttl = self.ttl_for(category)
+        now = time.monotonic()
+
+        fallback: Optional[_Entry] = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry.stored_at
+                if age < entry.ttl:
+                    self._stats["hits"] += 1
+                    record_cache("response", "hit")
+                    self._entries.move_to_end(key)
+                    return entry.value
+                if age < entry.ttl + self.stale_ttl:
+                    self._stats["stale_hits"] += 1
+                    record_cache("response", "stale")
+                    self._entries.move_to_end(key)
+                    if key not in self._inflight:
+                        self._stats["refreshes"] += 1
+                        future: concurrent.futures.Future = concurrent.futures.Future()
+                        self._inflight[key] = future
+                        spawn(self._load(key, ttl, loader, future))
+                    return entry.value
+                if age < entry.ttl + self.stale_ttl + self.fallback_ttl:
+                    fallback = entry
+                else:
+                    del self._entries[key]
+
+            future = self._inflight.get(key)
+            if future is None:
+                self._stats["misses"] += 1
+                record_cache("response", "miss")
+                future = concurrent.futures.Future()
+                self._inflight[key] = future
+                owner = True
+            else:
+                self._stats["coalesced"] += 1
+                record_cache("response", "coalesced")
+                owner = False
+
+        if owner:
+            await self._load(key, ttl, loader, future)
+
+        try:
+            # shield() so a cancelled waiter doesn't cancel the shared future
+            return await asyncio.shield(asyncio.wrap_future(future))
+        except Exception:
+            if fallback is None:
+                raise
+            with self._lock:
+                self._stats["fallbacks"] += 1
+            record_cache("response", "fallback")
+            return fallback.value
+
+    async def _load(
+        self,
+        key: CacheKey,
+        ttl: float,
+        loader: Callable[[], Awaitable[Any]],
+        future: concurrent.futures.Future,
+    ) -> None:
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            self._finish(key)
+            future.set_exception(RuntimeError("upstream request was cancelled"))
+            raise
+        except Exception as e:
+            with self._lock:
+                self._stats["errors"] += 1
+            self._finish(key)
+            future.set_exception(e)
+            return
+
+        with self._lock:
+            self._entries[key] = _Entry(value, time.monotonic(), ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        self._finish(key)
+        future.set_result(value)
+
+    def _finish(self, key: CacheKey) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Snapshot of the hit/miss counters plus the current size.
+        """
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["size"] = len(self._entries)
+        return snapshot
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache(
+    max_entries=settings.response_cache_max_entries,
+    default_ttl=settings.response_cache_ttl,
+    stale_ttl=settings.response_cache_stale_ttl,
+    ttl_overrides=settings.response_cache_ttls,
+    enabled=settings.response_cache_enabled,
+    fallback_ttl=settings.response_cache_fallback_ttl,
+)
@@ -0,0 +1,175 @@
+import asyncio
+import atexit
+import concurrent.futures
+import contextvars
+import importlib.util
+import threading
+import weakref
+from typing import Awaitable, Optional, TypeVar
+from urllib.parse import urlsplit
+
+import httpx
+
+from ..config import settings
+
+T = TypeVar("T")
+
+# httpx connection pools are bound to the event loop that created them,
+# so we keep one pooled client per running loop.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_lock = threading.Lock()
+
+# Long-lived loop used by synchronous callers (see run_sync).
+_io_loop: Optional[asyncio.AbstractEventLoop] = None
+_io_thread: Optional[threading.Thread] = None
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _build_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry,
+    )
+    return httpx.AsyncClient(
+        limits=limits,
+        timeout=httpx.Timeout(
+            settings.http_timeout, connect=settings.http_connect_timeout
+        ),
+        http2=settings.http2_enabled and _http2_available(),
+    )
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Return the pooled AsyncClient for the running event loop.
+    The client is created on first use and reused by every tool afterwards,
+    so TCP/TLS connections are kept alive between requests.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _clients.get(loop)
+        if client is None or client.is_closed:
+            client = _build_client()
+            _clients[loop] = client
+        return client
+
+
+def timeout_for(url: str) -> httpx.Timeout:
+    """
+    Pick the request timeout for a URL, honouring HTTP_HOST_TIMEOUTS.
+    A configured host also matches its subdomains.
+    """
+    host = (urlsplit(url).hostname or "").lower()
+    for pattern, seconds in settings.http_host_timeouts.items():
+        if host == pattern or host.endswith("." + pattern):
+            return httpx.Timeout(
+                seconds, connect=min(seconds, settings.http_connect_timeout)
+            )
+    return httpx.Timeout(settings.http_timeout, connect=settings.http_connect_timeout)
+
+
+def _ensure_io_loop() -> asyncio.AbstractEventLoop:
+    global _io_loop, _io_thread
+    with _lock:
+        if _io_loop is None or _io_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name="newsgenie-io", daemon=True
+            )
+            thread.start()
+            _io_loop, _io_thread = loop, thread
+        return _io_loop
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """
+    Run a coroutine from synchronous code on the shared I/O event loop.
+    Unlike asyncio.run, the loop (and the pooled connections bound to it)
+    outlives the call, so keep-alive connections are reused across requests.
+    """
+    if threading.current_thread() is _io_thread:
+        raise RuntimeError("run_sync() cannot be called from the I/O loop itself")
+    # Carry the caller's contextvars (e.g. the active tracing span) along
+    return spawn(coro, context=contextvars.copy_context()).result()
+
+
+def spawn(
+    coro: Awaitable[T], context: Optional[contextvars.Context] = None
+) -> "concurrent.futures.Future[T]":
+    """
+    Schedule a coroutine on the shared I/O loop without waiting for it.
+    Used for background work (e.g. cache refreshes) that must outlive the
+    caller's own event loop.
+    """
+    if context is None:
+        return asyncio.run_coroutine_threadsafe(coro, _ensure_io_loop())
+
+    loop = _ensure_io_loop()
+    future: "concurrent.futures.Future[T]" = concurrent.futures.Future()
+
+    def _copy_result(task: "asyncio.Task[T]") -> None:
+        if future.cancelled():
+            return
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+    def _start() -> None:
+        task = loop.create_task(coro, context=context)
+        task.add_done_callback(_copy_result)
+        future.add_done_callback(
+            lambda f: f.cancelled() and loop.call_soon_threadsafe(task.cancel)
+        )
+
+    loop.call_soon_threadsafe(_start)
+    return future
+
+
+async def aclose_async_client() -> None:
+    """
+    Close the pooled client of the running loop.
+    Async applications should await this on shutdown.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+
+
+def shutdown() -> None:
+    """
+    Close the shared I/O loop and its client. Registered with atexit.
+    """
+    global _io_loop, _io_thread
+    with _lock:
+        loop, thread = _io_loop, _io_thread
+        _io_loop = _io_thread = None
+
+    if loop is None or loop.is_closed():
+        return
+
+    try:
+        asyncio.run_coroutine_threadsafe(aclose_async_client(), loop).result(
+            timeout=5
+        )
+    except Exception as e:
+        print(f"[WARN] Could not close HTTP client cleanly: {e}")
+
+    loop.call_soon_threadsafe(loop.stop)
+    if thread is not None:
+        thread.join(timeout=5)
+    if not loop.is_running():
+        loop.close()
+
+
+atexit.register(shutdown)
@@ -1,7 +1,18 @@
+import asyncio
 from typing import List, Dict, Optional
-import httpx
-
+from ..article_index import get_article_index
+from ..articles import SeenArticles, to_articles
 from ..config import settings
+from ..telemetry import span
+from .cache import make_cache_key, response_cache
+from .news_providers import fan_out_news, news_providers
+
+# Categories offered in the UI and kept warm by the prefetcher
+NEWS_CATEGORIES = ["technology", "finance", "sports", "general"]
+
+# Article versions already written to the index, so a re-fetch of an
+# unchanged feed only refreshes timestamps instead of re-indexing
+seen_articles = SeenArticles(settings.article_index_max_entries)
 
 
 def _mock_news(category: str) -> List[Dict]:
@@ -77,6 +88,37 @@ def _mock_news(category: str) -> List[Dict]:
     ]
 
 
+async def request_news(
+    category: Optional[str],
+    query: Optional[str],
+    language: str,
+    page_size: int,
+) -> List[Dict]:
+    """
+    Fetch normalized articles from the configured news providers
+    (hedged fan-out, merged and deduplicated; see news_providers.py).
+    Raises when every provider fails so failures are never cached.
+    New or changed articles are also added to the local article index;
+    unchanged ones are only marked as seen again.
+    """
+    results = await fan_out_news(
+        news_providers,
+        category,
+        query,
+        language,
+        page_size,
+        hedge_delay=settings.news_hedge_delay_ms / 1000,
+        merge_window=settings.news_merge_window_ms / 1000,
+        dedup_threshold=settings.news_dedup_threshold,
+    )
+    fresh, unchanged = seen_articles.split(results, category or "general")
+    if fresh:
+        await asyncio.to_thread(get_article_index().ingest, fresh, category or "general")
+    if unchanged:
+        await asyncio.to_thread(get_article_index().touch, [a["url"] for a in unchanged if a.get("url")])
+    return results
+
+
 async def fetch_news_async(
     category: Optional[str] = None,
     query: Optional[str] = None,
@@ -84,52 +126,35 @@ async def fetch_news_async(
     page_size: int = 5,
 ) -> List[Dict]:
     """
-    Fetch news using a real API if NEWS_API_KEY is set.
+    Fetch news from the configured providers if any has an API key.
     Otherwise, return mock news items.
-    This function is async so it integrates nicely if you later use async workflows.
+    Responses are served from the shared response cache when possible.
     """
-    if not settings.news_api_key:
+    if not news_providers:
         # Use mock data
         return _mock_news(category or "general")
 
-    # Example: using NewsAPI.org-style endpoint
-    params = {
-        "apiKey": settings.news_api_key,
-        "language": language,
-        "pageSize": page_size,
-    }
-
-    if category:
-        params["category"] = category
-    if query:
-        params["q"] = query
-
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(settings.news_api_base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-        articles = data.get("articles", [])
-        results: List[Dict] = []
-
-        for art in articles:
-            results.append(
-                {
-                    "title": art.get("title", ""),
-                    "description": art.get("description") or "",
-                    "url": art.get("url") or "",
-                    "source": (art.get("source") or {}).get("name", ""),
-                    "published_at": art.get("publishedAt") or "",
-                }
+        key = make_cache_key("news", category, query, language, page_size)
+        with span("tool.fetch_news", category=category or "general"):
+            results = await response_cache.get_or_load(
+                key,
+                lambda: request_news(category, query, language, page_size),
+                category=category or "general",
             )
 
         if not results:
             return _mock_news(category or "general")
 
-        return results
+        # Shallow copy so callers can't mutate the cached list; the Article
+        # objects themselves are read-only and shared, not copied
+        return list(results)
 
     except Exception as e:
         print(f"[ERROR] fetch_news_async failed: {e}")
-        # On error, use mock so UX is not broken
-        return _mock_news(category or "general")
+        # On error (e.g. every provider's circuit is open), serve the newest
+        # indexed articles regardless of age, then mock so UX is not broken
+        indexed = await asyncio.to_thread(
+            get_article_index().search, query or "", category or "general", page_size
+        )
+        return to_articles(indexed) or _mock_news(category or "general")
@@ -0,0 +1,276 @@
+import asyncio
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from urllib.parse import urlsplit
+
+from ..articles import Article, parse_timestamp
+from ..config import settings
+from ..resilience import guard_for
+from ..telemetry import record_upstream, set_attribute, span
+from .http_client import get_async_client, timeout_for
+
+
+# Request shape -> (validator headers, normalized articles of that response)
+_Validators = Dict[str, str]
+_RequestKey = Tuple[Optional[str], Optional[str], str, int]
+
+
+class NewsProvider:
+    """
+    A NewsAPI-compatible headlines endpoint.
+
+    Requests are conditional when the provider sent validators (ETag /
+    Last-Modified) for the same request before: a 304 answer reuses the
+    articles normalized last time instead of downloading them again.
+    """
+
+    def __init__(
+        self, name: str, base_url: str, api_key: str, max_validators: int = 256
+    ) -> None:
+        self.name = name
+        self.base_url = base_url
+        self.api_key = api_key
+        self.max_validators = max_validators
+        self._validators: "OrderedDict[_RequestKey, Tuple[_Validators, List[Article]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def _last_response(
+        self, key: _RequestKey
+    ) -> Optional[Tuple[_Validators, List[Article]]]:
+        with self._lock:
+            entry = self._validators.get(key)
+            if entry is not None:
+                self._validators.move_to_end(key)
+            return entry
+
+    def _remember(self, key: _RequestKey, response, articles: List[Article]) -> None:
+        validators: _Validators = {}
+        if response.headers.get("etag"):
+            validators["If-None-Match"] = response.headers["etag"]
+        if response.headers.get("last-modified"):
+            validators["If-Modified-Since"] = response.headers["last-modified"]
+        with self._lock:
+            if not validators:
+                self._validators.pop(key, None)
+                return
+            self._validators[key] = (validators, articles)
+            self._validators.move_to_end(key)
+            while len(self._validators) > self.max_validators:
+                self._validators.popitem(last=False)
+
+    async def fetch(
+        self,
+        category: Optional[str],
+        query: Optional[str],
+        language: str,
+        page_size: int,
+    ) -> List[Article]:
+        """
+        Call the endpoint (rate limited, retried and circuit-broken per
+        provider and key) and normalize the articles.
+        Raises on transport/HTTP errors and CircuitOpenError.
+        """
+        key = (category, query, language, page_size)
+        last = self._last_response(key)
+        with span("news.provider", provider=self.name):
+            response = await guard_for(self.name, self.api_key).call(
+                lambda: self._request(
+                    category, query, language, page_size, last[0] if last else None
+                )
+            )
+            if response.status_code == 304 and last is not None:
+                set_attribute("news.not_modified", True)
+                return last[1]
+
+        data = response.json()
+        articles = [
+            Article(
+                art.get("title") or "",
+                art.get("description") or "",
+                art.get("url") or "",
+                (art.get("source") or {}).get("name") or "",
+                parse_timestamp(art.get("publishedAt")),
+            )
+            for art in data.get("articles", [])
+        ]
+        self._remember(key, response, articles)
+        return articles
+
+    async def _request(
+        self,
+        category: Optional[str],
+        query: Optional[str],
+        language: str,
+        page_size: int,
+        validators: Optional[_Validators] = None,
+    ):
+        params = {
+            "apiKey": self.api_key,
+            "language": language,
+            "pageSize": page_size,
+        }
+
+        if category:
+            params["category"] = category
+        if query:
+            params["q"] = query
+
+        client = get_async_client()
+        response = await client.get(
+            self.base_url,
+            params=params,
+            headers=validators,
+            timeout=timeout_for(self.base_url),
+        )
+        record_upstream(self.name, response.status_code)
+        if response.status_code == 304 and validators:
+            return response
+        response.raise_for_status()
+        return response
+
+
+# -- dedup ------------------------------------------------------------------
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize_url(url: str) -> str:
+    """
+    Scheme-, "www."-, query- and fragment-insensitive form of a URL.
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip().lower())
+    host = parts.netloc[4:] if parts.netloc.startswith("www.") else parts.netloc
+    return host + parts.path.rstrip("/")
+
+
+def title_shingles(title: str, size: int = 3) -> Set[str]:
+    words = _WORD_RE.findall((title or "").lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b)
+
+
+def dedupe_articles(articles: Sequence[Dict], threshold: float) -> List[Dict]:
+    """
+    Drop articles whose normalized URL was already seen or whose title
+    shingles overlap an earlier title by at least `threshold` (Jaccard).
+    Earlier articles win, so pass them in provider priority order.
+    """
+    kept: List[Dict] = []
+    seen_urls: Set[str] = set()
+    kept_shingles: List[Set[str]] = []
+
+    for article in articles:
+        url = normalize_url(article.get("url", ""))
+        if url and url in seen_urls:
+            continue
+        shingles = title_shingles(article.get("title", ""))
+        if shingles and any(_jaccard(shingles, other) >= threshold for other in kept_shingles):
+            continue
+        if url:
+            seen_urls.add(url)
+        if shingles:
+            kept_shingles.append(shingles)
+        kept.append(article)
+
+    return kept
+
+
+# -- fan-out ----------------------------------------------------------------
+
+async def fan_out_news(
+    providers: Sequence[NewsProvider],
+    category: Optional[str],
+    query: Optional[str],
+    language: str,
+    page_size: int,
+    hedge_delay: float,
+    merge_window: float,
+    dedup_threshold: float,
+) -> List[Dict]:
+    """
+    Hedged fan-out across providers, in priority order.
+
+    - The first provider starts immediately; each next one starts when the
+      previous hasn't answered within `hedge_delay` seconds, or right away
+      when a provider fails or returns nothing.
+    - Once one provider answers, the others already in flight get
+      `merge_window` seconds to finish; the rest are cancelled.
+    - Answers are merged in priority order and deduplicated.
+    Raises the last provider error if every provider failed.
+    """
+    queue = list(providers)
+    pending: Dict[asyncio.Task, NewsProvider] = {}
+    answers: Dict[str, List[Dict]] = {}
+    errors: List[Exception] = []
+    answered_empty = False
+
+    def launch() -> None:
+        provider = queue.pop(0)
+        task = asyncio.ensure_future(provider.fetch(category, query, language, page_size))
+        pending[task] = provider
+
+    def collect(done) -> bool:
+        nonlocal answered_empty
+        progressed = False
+        for task in done:
+            provider = pending.pop(task)
+            try:
+                items = task.result()
+            except Exception as e:
+                print(f"[WARN] News provider {provider.name} failed: {e}")
+                errors.append(e)
+                progressed = True
+                continue
+            if items:
+                answers[provider.name] = items
+            else:
+                answered_empty = True
+                progressed = True
+        return progressed
+
+    if queue:
+        launch()
+    try:
+        while pending and not answers:
+            done, _ = await asyncio.wait(
+                pending,
+                timeout=hedge_delay if queue else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            # Hedge on timeout; fail over at once on an error or empty answer
+            if (not done or collect(done)) and not answers and queue:
+                launch()
+
+        if answers and pending and merge_window > 0:
+            done, _ = await asyncio.wait(pending, timeout=merge_window)
+            collect(done)
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if not answers:
+        if errors and not answered_empty:
+            raise errors[-1]
+        return []
+
+    merged: List[Dict] = []
+    for provider in providers:
+        merged.extend(answers.get(provider.name, ()))
+    return dedupe_articles(merged, dedup_threshold)
+
+
+# Providers with an API key, in priority order
+news_providers: List[NewsProvider] = [
+    NewsProvider(name, url, key) for name, url, key in settings.news_providers if key
+]
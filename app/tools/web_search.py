@@ -1,7 +1,11 @@
+import asyncio
 from typing import List, Dict
-import httpx
-
+from ..article_index import get_article_index
 from ..config import settings
+from ..resilience import guard_for
+from ..telemetry import record_upstream, span
+from .cache import make_cache_key, response_cache
+from .http_client import get_async_client, timeout_for
 
 
 def _mock_search(query: str) -> List[Dict]:
@@ -17,13 +21,12 @@ def _mock_search(query: str) -> List[Dict]:
     ]
 
 
-async def search_web_async(query: str, num_results: int = 3) -> List[Dict]:
+async def _request_search(query: str, num_results: int) -> List[Dict]:
     """
-    Call a web search API if configured; otherwise return mock results.
+    Call the upstream search endpoint (rate limited, retried and
+    circuit-broken). Raises on transport/HTTP errors and CircuitOpenError.
+    Hits are also added to the local article index.
     """
-    if not settings.search_api_key:
-        return _mock_search(query)
-
     # This is a placeholder; you would adapt this to your actual search provider.
     params = {
         "api_key": settings.search_api_key,
@@ -31,30 +34,58 @@ async def search_web_async(query: str, num_results: int = 3) -> List[Dict]:
         "num": num_results,
     }
 
+    async def request() -> Dict:
+        client = get_async_client()
+        response = await client.get(
+            settings.web_search_base_url,
+            params=params,
+            timeout=timeout_for(settings.web_search_base_url),
+        )
+        record_upstream("search", response.status_code)
+        response.raise_for_status()
+        return response.json()
+
+    data = await guard_for("search", settings.search_api_key).call(request)
+
+    # The shape of `data` will depend on the provider.
+    # We'll assume it returns a list of results under "results".
+    results_raw = data.get("results", [])
+    results: List[Dict] = []
+
+    for item in results_raw[:num_results]:
+        results.append(
+            {
+                "title": item.get("title", ""),
+                "snippet": item.get("snippet", ""),
+                "url": item.get("url", ""),
+            }
+        )
+
+    await asyncio.to_thread(get_article_index().ingest, results, None, "search")
+    return results
+
+
+async def search_web_async(query: str, num_results: int = 3) -> List[Dict]:
+    """
+    Call a web search API if configured; otherwise return mock results.
+    Responses are served from the shared response cache when possible.
+    """
+    if not settings.search_api_key:
+        return _mock_search(query)
+
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(settings.web_search_base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-        # The shape of `data` will depend on the provider.
-        # We'll assume it returns a list of results under "results".
-        results_raw = data.get("results", [])
-        results: List[Dict] = []
-
-        for item in results_raw[:num_results]:
-            results.append(
-                {
-                    "title": item.get("title", ""),
-                    "snippet": item.get("snippet", ""),
-                    "url": item.get("url", ""),
-                }
+        key = make_cache_key("search", query=query, page_size=num_results)
+        with span("tool.web_search"):
+            results = await response_cache.get_or_load(
+                key,
+                lambda: _request_search(query, num_results),
+                category="search",
             )
 
         if not results:
             return _mock_search(query)
 
-        return results
+        return list(results)
 
     except Exception as e:
         print(f"[ERROR] search_web_async failed: {e}")
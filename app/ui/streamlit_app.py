@@ -1,30 +1,48 @@
 # isort: skip_file
 import os
 import sys
+import uuid
 import streamlit as st
 
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
-from app.graph import build_graph
-
-# --------------------------------------------------------
-if "graph" not in st.session_state:
-    st.session_state.graph = build_graph()
-
-if "chat_history" not in st.session_state:
-    # list of {"role": "...", "content": "..."}
-    st.session_state.chat_history = []
-
-graph = st.session_state.graph
+from app.client import NewsGenieClient
+from app.config import settings
+from app.tools.news_api import NEWS_CATEGORIES
 
+# Must be the first Streamlit command of the script
 st.set_page_config(
     page_title="NewsGenie – AI News Assistant",
     page_icon="🧞",
     layout="wide",
 )
 
+
+# --------------------------------------------------------
+# The UI is a thin client of the API server (app/server.py), which hosts
+# the shared graph and the per-session memory. Without NEWSGENIE_API_URL
+# one server is started in this process (once, shared by all sessions).
+@st.cache_resource
+def get_client() -> NewsGenieClient:
+    if settings.api_url:
+        return NewsGenieClient(settings.api_url)
+    from app.server import start_embedded_server
+
+    return NewsGenieClient(start_embedded_server())
+
+
+client = get_client()
+
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
+if "chat_history" not in st.session_state:
+    # Full transcript shown in the UI: list of {"role": "...", "content": "..."}
+    # (the server keeps its own bounded memory for the graph)
+    st.session_state.chat_history = []
+
 st.title("🧞‍♂️ NewsGenie – AI-Powered Information & News Assistant")
 st.write(
     "Ask general questions or request the latest news. "
@@ -35,7 +53,7 @@ st.write(
 st.sidebar.header("News Options")
 news_category = st.sidebar.selectbox(
     "Preferred news category:",
-    ["auto-detect", "technology", "finance", "sports", "general"],
+    ["auto-detect"] + NEWS_CATEGORIES,
     index=0,
 )
 
@@ -47,6 +65,29 @@ st.sidebar.caption(
     "- 'Give me today's finance headlines'"
 )
 
+
+def render_news_cards(news_items):
+    st.markdown("### Related News Articles")
+    for item in news_items:
+        st.markdown(f"**{item.get('title', 'Untitled')}**")
+
+        meta_parts = []
+        if item.get("source"):
+            meta_parts.append(item["source"])
+        if item.get("published_at"):
+            meta_parts.append(item["published_at"])
+        if meta_parts:
+            st.caption(" • ".join(meta_parts))
+
+        if item.get("description"):
+            st.write(item["description"])
+
+        if item.get("url"):
+            st.markdown(f"[Read more]({item['url']})")
+
+        st.markdown("---")
+
+
 # Show chat history
 st.subheader("Conversation")
 
@@ -65,51 +106,61 @@ if user_input:
     with st.chat_message("user"):
         st.markdown(user_input)
 
-    state = {
-        "user_query": user_input,
-        "chat_history": st.session_state.chat_history[:-1],
-        "news_category": None if news_category == "auto-detect" else news_category,
-    }
+    category = None if news_category == "auto-detect" else news_category
 
     try:
-        result_state = graph.invoke(state)
-
-        answer = result_state.get("final_answer", "No answer generated.")
-        news_items = result_state.get("news_results", [])
-        error = result_state.get("error")
-
-        # Update history from graph
-        st.session_state.chat_history = result_state.get("chat_history", [])
+        # Filled in by token_stream() while the server answers
+        run = {"result": {}, "shown_cards": False}
 
         with st.chat_message("assistant"):
-            st.markdown(answer)
-
-            if news_items:
-                st.markdown("### Related News Articles")
-                for item in news_items:
-                    st.markdown(f"**{item.get('title', 'Untitled')}**")
-
-                    meta_parts = []
-                    if item.get("source"):
-                        meta_parts.append(item["source"])
-                    if item.get("published_at"):
-                        meta_parts.append(item["published_at"])
-                    if meta_parts:
-                        st.caption(" • ".join(meta_parts))
-
-                    if item.get("description"):
-                        st.write(item["description"])
-
-                    if item.get("url"):
-                        st.markdown(f"[Read more]({item['url']})")
-
-                    st.markdown("---")
+            answer_area = st.container()
+            cards_area = st.container()
+
+            def token_stream():
+                """
+                Yield answer tokens for st.write_stream while rendering
+                article cards as soon as the news tool returns.
+                """
+                for event, data in client.stream(
+                    user_input, st.session_state.session_id, category
+                ):
+                    if event == "token":
+                        yield data["text"]
+                    elif event == "news_results" and data["items"]:
+                        with cards_area:
+                            render_news_cards(data["items"])
+                        run["shown_cards"] = True
+                    elif event == "done":
+                        run["result"] = data
+                    elif event == "error":
+                        raise RuntimeError(data["error"])
+
+            with answer_area:
+                streamed = st.write_stream(token_stream())
+
+            result = run["result"]
+            answer = result.get("answer") or "No answer generated."
+            news_items = result.get("news_results", [])
+            error = result.get("error")
+
+            # Answers that were not produced token by token (errors,
+            # "no news" replies) still need to be shown
+            if not streamed:
+                answer_area.markdown(answer)
+
+            if news_items and not run["shown_cards"]:
+                with cards_area:
+                    render_news_cards(news_items)
 
             if error:
                 st.warning(
                     "Some data could not be fetched. Showing fallback results."
                 )
 
+        st.session_state.chat_history.append(
+            {"role": "assistant", "content": answer}
+        )
+
     except Exception as e:
         with st.chat_message("assistant"):
             st.error(f"Unexpected error occurred: {e}")
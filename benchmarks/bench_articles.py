@@ -0,0 +1,114 @@
+"""
+Benchmark the compact Article representation against plain NewsItem dicts.
+
+Usage:
+    python benchmarks/bench_articles.py [--articles 50000] [--sources 50] [--repeat 5]
+"""
+# isort: skip_file
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from app import articles
+from app.articles import format_timestamp, pack_articles, to_articles, unpack_articles
+
+
+_WORDS = (
+    "market rally central bank inflation startup chip quantum vaccine election "
+    "climate storm league final merger earnings outage launch court ruling "
+    "policy energy oil rate cut tariff satellite robot"
+).split()
+
+
+def make_dicts(n: int, n_sources: int, seed: int = 42):
+    """
+    NewsItem dicts shaped like provider responses.
+    """
+    rng = random.Random(seed)
+    sources = [f"Source {i}" for i in range(n_sources)]
+    base_ts = 1_760_000_000
+    items = []
+    for i in range(n):
+        title = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(6, 12))).capitalize()
+        description = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(20, 40)))
+        items.append({
+            "title": title,
+            "description": description,
+            "url": f"https://news.example.com/{i}/{title[:24].replace(' ', '-').lower()}",
+            "source": rng.choice(sources),
+            "published_at": format_timestamp(base_ts - rng.randint(0, 86400 * 3)),
+        })
+    return items
+
+
+def _measure(build):
+    """
+    (result, bytes retained by the result) for a builder function.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--articles", type=int, default=50000)
+    parser.add_argument("--sources", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Parsed from JSON like a provider response, so every source name is its
+    # own string object until Article interns it
+    raw = json.dumps(make_dicts(args.articles, args.sources))
+    dicts, dict_bytes = _measure(lambda: json.loads(raw))
+    compact, article_bytes = _measure(lambda: to_articles(json.loads(raw)))
+    packed, packed_bytes = _measure(lambda: pack_articles(compact))
+
+    codec = articles._msgpack.__name__ if articles._msgpack else "json"
+    n = len(dicts)
+    print(f"{n} articles, {args.sources} sources, binary codec: {codec}")
+    print("  memory")
+    for name, size in (
+        ("list of dicts", dict_bytes),
+        ("list of Article", article_bytes),
+        ("packed columns (bytes)", packed_bytes),
+    ):
+        print(f"    {name:<24} {size / 1e6:8.1f} MB  {size / n:7.0f} B/article")
+
+    print(f"  serialization, best of {args.repeat} runs")
+    runs = {
+        "json.dumps(dicts)": lambda: json.dumps(dicts),
+        "json.loads": lambda: json.loads(raw),
+        "pack_articles": lambda: pack_articles(compact),
+        "unpack_articles": lambda: unpack_articles(packed),
+    }
+    for name, fn in runs.items():
+        seconds = _time(fn, args.repeat)
+        print(f"    {name:<24} {seconds * 1000:8.1f} ms")
+    print(f"  payload: json {len(raw) / 1e6:.1f} MB, packed {len(packed) / 1e6:.1f} MB")
+
+    assert [a.to_dict() for a in unpack_articles(packed)] == dicts
+
+
+if __name__ == "__main__":
+    main()
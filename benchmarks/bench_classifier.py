@@ -0,0 +1,181 @@
+"""
+Benchmark the compiled query classifier against the original substring scans.
+
+Usage:
+    python benchmarks/bench_classifier.py [--queries 20000] [--repeat 5]
+    python benchmarks/bench_classifier.py --check
+
+Both modes first check a small labelled query set against the routing the
+graph would pick (news, general, or speculative when the confidence is
+below SPECULATIVE_CONFIDENCE) and exit with status 1 on any mismatch.
+"""
+# isort: skip_file
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from app.classifier import QueryClassifier, TfidfIntentModel
+from app.config import settings
+
+
+# --- Original implementation (app/agents.py + app/graph.py before the change)
+
+_LEGACY_NEWS_KEYWORDS = [
+    "news", "headline", "headlines", "latest", "today", "market update",
+    "stock market", "breaking", "technology news", "sports scores",
+    "finance news",
+]
+
+
+def legacy_classify(user_query: str) -> str:
+    query_lower = user_query.lower()
+    if any(keyword in query_lower for keyword in _LEGACY_NEWS_KEYWORDS):
+        return "news"
+    if "what happened" in query_lower:
+        return "news"
+    return "general"
+
+
+def legacy_category(user_query: str) -> str:
+    q_lower = user_query.lower()
+    if "tech" in q_lower or "ai" in q_lower or "software" in q_lower:
+        return "technology"
+    if "stock" in q_lower or "market" in q_lower or "finance" in q_lower:
+        return "finance"
+    if "sport" in q_lower or "game" in q_lower or "score" in q_lower:
+        return "sports"
+    return "general"
+
+
+# --- Routing check
+
+_LABELLED = [
+    ("latest", "news"),
+    ("latest on the election", "news"),
+    ("what's happening today", "news"),
+    ("any updates on the strike", "news"),
+    ("today's headlines", "news"),
+    ("breaking news", "news"),
+    ("tech news", "news"),
+    ("who won last night", "news"),
+    ("stock market update", "news"),
+    ("what happened in congress", "news"),
+    ("explain inflation", "general"),
+    ("what is the capital of france", "general"),
+    ("write a haiku about autumn", "general"),
+    ("how does photosynthesis work", "general"),
+    ("how do markets react to rate hikes", "general"),
+    ("bitcoin price", "speculative"),
+    ("apple earnings", "speculative"),
+    ("explain the latest inflation numbers", "speculative"),
+]
+
+
+def route(classifier: QueryClassifier, query: str) -> str:
+    result = classifier.classify(query)
+    if result.confidence < settings.speculative_confidence:
+        return "speculative"
+    return result.query_type
+
+
+def check_routing() -> bool:
+    ok = True
+    for name, classifier in (
+        ("rules", QueryClassifier()),
+        ("rules + tfidf", QueryClassifier(TfidfIntentModel())),
+    ):
+        wrong = [
+            (query, expected, route(classifier, query))
+            for query, expected in _LABELLED
+            if route(classifier, query) != expected
+        ]
+        print(f"routing check ({name}): {len(_LABELLED) - len(wrong)}/{len(_LABELLED)} ok")
+        for query, expected, got in wrong:
+            print(f"  {query!r}: expected {expected}, got {got}")
+        ok = ok and not wrong
+    return ok
+
+
+# --- Workload
+
+_TEMPLATES = [
+    "Show me the latest {topic} news",
+    "Give me today's {topic} headlines",
+    "Explain {concept} in simple terms",
+    "What happened with {topic} yesterday?",
+    "He said the {concept} report was fine",
+    "How does {concept} work?",
+    "Any breaking updates on {topic}?",
+    "Write a short poem about {concept}",
+]
+_TOPICS = ["tech", "AI", "stock market", "sports", "finance", "election", "weather"]
+_CONCEPTS = ["inflation", "photosynthesis", "neural networks", "compound interest", "gravity"]
+
+
+def make_queries(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    return [
+        rng.choice(_TEMPLATES).format(
+            topic=rng.choice(_TOPICS), concept=rng.choice(_CONCEPTS)
+        )
+        for _ in range(n)
+    ]
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="only run the routing check")
+    args = parser.parse_args()
+
+    routing_ok = check_routing()
+    if args.check:
+        sys.exit(0 if routing_ok else 1)
+
+    queries = make_queries(args.queries)
+    rules = QueryClassifier()
+    tfidf = QueryClassifier(TfidfIntentModel())
+
+    runs = {
+        "legacy (classify + category)": lambda: [
+            (legacy_classify(q), legacy_category(q)) for q in queries
+        ],
+        "compiled, per query": lambda: [rules.classify(q) for q in queries],
+        "compiled, classify_many": lambda: rules.classify_many(queries),
+        "compiled + tfidf, classify_many": lambda: tfidf.classify_many(queries),
+    }
+
+    print(f"{len(queries)} queries, best of {args.repeat} runs")
+    for name, fn in runs.items():
+        seconds = _time(fn, args.repeat)
+        per_query_us = seconds / len(queries) * 1e6
+        print(f"  {name:<34} {seconds * 1000:8.1f} ms  {per_query_us:6.2f} us/query")
+
+    new = rules.classify_many(queries)
+    type_diff = sum(legacy_classify(q) != r.query_type for q, r in zip(queries, new))
+    cat_diff = sum(legacy_category(q) != r.category for q, r in zip(queries, new))
+    print(f"  disagreements with legacy: type={type_diff}, category={cat_diff}")
+    print(f"  e.g. 'He said ...': legacy category={legacy_category('He said it')!r}, "
+          f"compiled={rules.infer_category('He said it')!r}")
+    if not routing_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Measure cold import time of the app's entry modules against a budget.
+
+Usage:
+    python benchmarks/bench_import.py [--repeat 5] [--detail app.graph] [--top 15]
+
+Each module is imported in a fresh interpreter with `python -X importtime`
+and the best cumulative time of `repeat` runs is compared to its budget.
+Exits non-zero when a module is over budget, so it can run in CI.
+"""
+# isort: skip_file
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cold-import budget per entry point, in milliseconds. app.client is what
+# the Streamlit UI loads on every rerun; app.agents must not construct (or
+# import) the OpenAI client; app.graph/app.server pay for langgraph itself.
+BUDGETS_MS: Dict[str, float] = {
+    "app.config": 50,
+    "app.client": 250,
+    "app.agents": 700,
+    "app.graph": 1500,
+    "app.server": 1700,
+}
+
+
+def import_times(module: str) -> List[Tuple[str, int, int]]:
+    """
+    (module, self us, cumulative us) rows from one `-X importtime` run.
+    """
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def best_cumulative_ms(module: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        rows = import_times(module)
+        total = next(c for name, _, c in reversed(rows) if name == module)
+        best = min(best, total / 1000)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--detail", help="show the slowest imports under this module")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    over = []
+    print(f"cold import, best of {args.repeat} runs")
+    for module, budget in BUDGETS_MS.items():
+        ms = best_cumulative_ms(module, args.repeat)
+        status = "ok" if ms <= budget else "OVER"
+        if ms > budget:
+            over.append(module)
+        print(f"  {module:<12} {ms:8.1f} ms  (budget {budget:.0f} ms)  {status}")
+
+    if args.detail:
+        rows = import_times(args.detail)
+        print(f"\nslowest packages imported by {args.detail} (cumulative):")
+        # Top-level packages only: nested rows are already in their parent's total
+        top_level = {}
+        own = args.detail.split(".")[0]
+        for name, _, cumulative in rows:
+            root = name.split(".")[0]
+            if root == own:
+                continue
+            top_level[root] = max(top_level.get(root, 0), cumulative)
+        for name, cumulative in sorted(top_level.items(), key=lambda kv: -kv[1])[: args.top]:
+            print(f"  {name:<28} {cumulative / 1000:8.1f} ms")
+
+    if over:
+        print(f"\nover budget: {', '.join(over)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
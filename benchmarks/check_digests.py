@@ -0,0 +1,94 @@
+"""
+Check that headline changes reach the stored digests, against local stubs.
+
+A category digest is built, then the same set comes back with one story
+re-titled under its URL: that must produce a new digest through the
+"digest.update" patch route, and summarize_news_items must serve it
+instead of the old one. Exits with status 1 on any failure.
+
+Usage:
+    python benchmarks/check_digests.py
+"""
+# isort: skip_file
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from stubs import StubConfig, StubServers
+
+
+def _route_calls(telemetry, route: str) -> float:
+    prefix = "newsgenie_llm_route_calls_total{"
+    total = 0.0
+    for line in telemetry.render_prometheus().splitlines():
+        if line.startswith(prefix) and f'route="{route}"' in line:
+            total += float(line.rsplit(" ", 1)[1])
+    return total
+
+
+def _articles(titles):
+    return [
+        {
+            "title": title,
+            "description": f"Details about {title.lower()}.",
+            "url": f"https://example.com/story/{i}",
+            "source": "Example",
+            "published_at": "2025-01-01T00:00:00Z",
+        }
+        for i, title in enumerate(titles)
+    ]
+
+
+def main() -> None:
+    stubs = StubServers(StubConfig(latency_ms=5, jitter_ms=0, tokens_per_answer=8)).start()
+
+    # Settings are read at import time, so configure the env first
+    workdir = tempfile.mkdtemp(prefix="newsgenie-check-")
+    os.environ.update(stubs.env())
+    os.environ.update({
+        "DIGEST_STORE_PATH": os.path.join(workdir, "digests.sqlite3"),
+        "PREFETCH_STORE_PATH": os.path.join(workdir, "headlines.json"),
+        "LLM_CACHE_ENABLED": "false",
+        "DIGEST_ENABLED": "true",
+        "DIGEST_PERSONALIZE": "false",
+        "TELEMETRY_ENABLED": "true",
+    })
+
+    from app.agents import build_digest, summarize_news_items
+    from app.digests import fingerprint
+    from app.prefetch import HeadlineStore
+    from app.telemetry import telemetry
+
+    store = HeadlineStore(os.path.join(workdir, "headlines.json"))
+    titles = [f"Story number {i} about the markets" for i in range(10)]
+    before = _articles(titles)
+    first = build_digest(before, "business", store.put("business", before))
+
+    titles[3] = "Story number 3 about the markets, now with a correction"
+    after = _articles(titles)
+    delta = store.put("business", after)
+    updates = _route_calls(telemetry, "digest.update")
+    second = build_digest(after, "business", delta)
+
+    checks = {
+        "edit is reported as a change": [a["url"] for a in delta.changed] == [after[3]["url"]],
+        "edited set has a new fingerprint": fingerprint(before) != fingerprint(after),
+        "digest was patched via digest.update": (
+            _route_calls(telemetry, "digest.update") == updates + 1
+        ),
+        "new digest differs from the old one": second != first,
+        "summaries serve the new digest": summarize_news_items(after, "markets") == second,
+    }
+    stubs.stop()
+
+    for name, ok in checks.items():
+        print(f"  {'ok  ' if ok else 'FAIL'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Drive build_graph() against the local stand-ins at a fixed concurrency and
+report latency percentiles, throughput and allocations. Needs no network.
+
+Usage:
+    python benchmarks/run_scenarios.py --scenario mixed --requests 200 --concurrency 16
+    python benchmarks/run_scenarios.py --scenario news --mode async --no-cache --json out.json
+"""
+# isort: skip_file
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+for path in (ROOT_DIR, BENCH_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from stubs import StubConfig, StubServers
+
+_NEWS_QUERIES = [
+    "Show me the latest tech news",
+    "Give me today's finance headlines",
+    "Latest sports scores",
+    "What happened in the stock market today?",
+    "Breaking news about AI startups",
+    "Top headlines right now",
+]
+_GENERAL_QUERIES = [
+    "Explain inflation",
+    "How does photosynthesis work?",
+    "Define opportunity cost",
+    "Why is the sky blue?",
+    "Explain how neural networks learn",
+]
+SCENARIOS = {
+    "news": 1.0,
+    "general": 0.0,
+    "mixed": 0.6,
+}
+
+
+def make_workload(scenario: str, n: int, unique: float, seed: int) -> List[str]:
+    """
+    Deterministic query list. `unique` is the fraction of queries made
+    distinct so caches cannot serve everything.
+    """
+    rng = random.Random(seed)
+    news_share = SCENARIOS[scenario]
+    queries = []
+    for i in range(n):
+        pool = _NEWS_QUERIES if rng.random() < news_share else _GENERAL_QUERIES
+        query = rng.choice(pool)
+        if rng.random() < unique:
+            query = f"{query} (variant {i})"
+        queries.append(query)
+    return queries
+
+
+def _state(query: str, stream: bool) -> Dict:
+    return {"user_query": query, "chat_history": [], "stream": stream}
+
+
+def run_sync_mode(graph, queries: List[str], concurrency: int, stream: bool) -> List[float]:
+    def one(query: str) -> float:
+        start = time.perf_counter()
+        if stream:
+            for _ in graph.stream(_state(query, True), stream_mode=["custom", "values"]):
+                pass
+        else:
+            graph.invoke(_state(query, False))
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, queries))
+
+
+def run_async_mode(graph, queries: List[str], concurrency: int, stream: bool) -> List[float]:
+    async def main() -> List[float]:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(query: str) -> float:
+            async with semaphore:
+                start = time.perf_counter()
+                if stream:
+                    async for _ in graph.astream(
+                        _state(query, True), stream_mode=["custom", "values"]
+                    ):
+                        pass
+                else:
+                    await graph.ainvoke(_state(query, False))
+                return time.perf_counter() - start
+
+        return await asyncio.gather(*(one(q) for q in queries))
+
+    return asyncio.run(main())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline NewsGenie load scenarios")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--stream", action="store_true", help="use graph.stream/astream")
+    parser.add_argument("--unique", type=float, default=0.3,
+                        help="fraction of queries made unique (defeats caches)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="disable response, LLM and digest caches")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--alloc-requests", type=int, default=50,
+                        help="requests in the separate tracemalloc pass (0 to skip)")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    stubs = StubServers(StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    )).start()
+
+    # Settings are read at import time, so configure the env first
+    workdir = tempfile.mkdtemp(prefix="newsgenie-bench-")
+    os.environ.update(stubs.env())
+    os.environ.update({
+        "LLM_CACHE_PATH": os.path.join(workdir, "llm_cache.sqlite3"),
+        "DIGEST_STORE_PATH": os.path.join(workdir, "digests.sqlite3"),
+        "ARTICLE_INDEX_PATH": os.path.join(workdir, "articles.sqlite3"),
+        "PREFETCH_STORE_PATH": os.path.join(workdir, "headlines.json"),
+        "PREFETCH_ENABLED": "false",
+    })
+    if args.no_cache:
+        os.environ.update({
+            "RESPONSE_CACHE_ENABLED": "false",
+            "LLM_CACHE_ENABLED": "false",
+            "DIGEST_ENABLED": "false",
+        })
+
+    from app.graph import build_graph
+    from app.telemetry import percentile
+
+    graph = build_graph()
+    queries = make_workload(args.scenario, args.requests, args.unique, args.seed)
+    runner = run_async_mode if args.mode == "async" else run_sync_mode
+
+    # Warm-up: import paths, connection pool, graph compilation caches
+    runner(graph, queries[: min(4, len(queries))], 1, args.stream)
+
+    start = time.perf_counter()
+    latencies = sorted(runner(graph, queries, args.concurrency, args.stream))
+    wall = time.perf_counter() - start
+
+    report = {
+        "scenario": args.scenario,
+        "mode": args.mode,
+        "stream": args.stream,
+        "requests": len(queries),
+        "concurrency": args.concurrency,
+        "cache": not args.no_cache,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(queries) / wall, 2),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 1),
+            "p95": round(percentile(latencies, 95) * 1000, 1),
+            "p99": round(percentile(latencies, 99) * 1000, 1),
+            "max": round(latencies[-1] * 1000, 1),
+        },
+        "upstream_calls": stubs.counters,
+    }
+
+    # Allocations are measured in a separate pass so tracing doesn't skew latency
+    if args.alloc_requests:
+        alloc_queries = make_workload(
+            args.scenario, args.alloc_requests, args.unique, args.seed + 1
+        )
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        runner(graph, alloc_queries, args.concurrency, args.stream)
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        stats = after.compare_to(before, "filename")
+        report["allocations"] = {
+            "requests": len(alloc_queries),
+            "net_kib_per_request": round(
+                sum(s.size_diff for s in stats) / 1024 / len(alloc_queries), 2
+            ),
+            "net_blocks_per_request": round(
+                sum(s.count_diff for s in stats) / len(alloc_queries), 1
+            ),
+            "peak_traced_mib": round(peak / 1024 / 1024, 2),
+        }
+
+    stubs.stop()
+
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Local HTTP stand-ins for NewsAPI, the web search endpoint and an
+OpenAI-compatible chat endpoint, so the pipeline can be benchmarked with
+no network. Latency, jitter and error injection are configurable and all
+randomness comes from a seeded RNG.
+
+Run standalone to poke at them by hand:
+    python benchmarks/stubs.py --latency-ms 80 --error-rate 0.05
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+
+class StubConfig:
+    def __init__(
+        self,
+        latency_ms: float = 50.0,
+        jitter_ms: float = 10.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        seed: int = 1234,
+        tokens_per_answer: int = 60,
+        token_interval_ms: float = 5.0,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        # Fraction of requests answered with HTTP 500 / HTTP 429
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.tokens_per_answer = tokens_per_answer
+        self.token_interval_ms = token_interval_ms
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self):
+        """
+        Return (delay seconds, status code) for the next request.
+        """
+        with self._lock:
+            delay = max(0.0, self.latency_ms + self._rng.uniform(-1, 1) * self.jitter_ms)
+            roll = self._rng.random()
+        if roll < self.error_rate:
+            return delay / 1000, 500
+        if roll < self.error_rate + self.rate_limit_rate:
+            return delay / 1000, 429
+        return delay / 1000, 200
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config: StubConfig = StubConfig()
+    counters: Dict[str, int] = {}
+
+    def log_message(self, format, *args):  # keep benchmark output clean
+        pass
+
+    def _count(self, name: str) -> None:
+        with self.config._lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _maybe_fail(self, status: int) -> bool:
+        if status == 200:
+            return False
+        headers = {"Retry-After": "1"} if status == 429 else None
+        self._send_json(status, {"error": {"message": f"injected {status}"}}, headers)
+        return True
+
+    # -- news + search --------------------------------------------------------
+
+    def do_GET(self):
+        delay, status = self.config.draw()
+        time.sleep(delay)
+        url = urlsplit(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if url.path.endswith("/search"):
+            self._count("search")
+            if self._maybe_fail(status):
+                return
+            num = int(params.get("num", 3))
+            query = params.get("q", "")
+            self._send_json(200, {"results": [
+                {
+                    "title": f"Result {i} for {query}",
+                    "snippet": f"Deterministic snippet {i} about {query}.",
+                    "url": f"https://search.local/{i}?q={query}",
+                }
+                for i in range(num)
+            ]})
+            return
+
+        self._count("news")
+        if self._maybe_fail(status):
+            return
+        category = params.get("category", "general")
+        page_size = int(params.get("pageSize", 5))
+        # Same content -> same ETag, so conditional polls get a 304
+        etag = f'"{category}-{page_size}"'
+        if self.headers.get("If-None-Match") == etag:
+            self._count("news_not_modified")
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._send_json(200, {"status": "ok", "articles": [
+            {
+                "title": f"{category.title()} headline #{i}",
+                "description": f"Deterministic description of {category} story {i}. " * 3,
+                "url": f"https://news.local/{category}/{i}",
+                "source": {"name": f"Stub {category.title()} Wire"},
+                "publishedAt": f"2025-01-01T{i % 24:02d}:00:00Z",
+            }
+            for i in range(page_size)
+        ]}, {"ETag": etag})
+
+    # -- OpenAI-compatible chat completions -------------------------------------
+
+    def do_POST(self):
+        delay, status = self.config.draw()
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        self._count("chat")
+        time.sleep(delay)
+        if self._maybe_fail(status):
+            return
+
+        prompt = (request.get("messages") or [{}])[-1].get("content", "")
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+        words = [f"word{(i * 7) % 97}" for i in range(self.config.tokens_per_answer)]
+        words[0] = f"[{digest}]"
+        model = request.get("model", "stub-model")
+
+        if not request.get("stream"):
+            self._send_json(200, {
+                "id": f"chatcmpl-{digest}",
+                "object": "chat.completion",
+                "created": 0,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": " ".join(words)},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": len(prompt) // 4,
+                    "completion_tokens": len(words),
+                    "total_tokens": len(prompt) // 4 + len(words),
+                },
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for word in words:
+            chunk = {
+                "id": f"chatcmpl-{digest}",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(self.config.token_interval_ms / 1000)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+
+class StubServers:
+    """
+    Starts one threaded HTTP server that serves all three stand-ins.
+    """
+
+    def __init__(self, config: Optional[StubConfig] = None, port: int = 0) -> None:
+        handler = type("Handler", (_StubHandler,), {
+            "config": config or StubConfig(),
+            "counters": {},
+        })
+        self.handler = handler
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        return dict(self.handler.counters)
+
+    def env(self) -> Dict[str, str]:
+        """
+        Environment variables that point NewsGenie at the stand-ins.
+        """
+        return {
+            "OPENAI_API_KEY": "sk-benchmark",
+            "NEWS_API_KEY": "benchmark",
+            "SEARCH_API_KEY": "benchmark",
+            "OPENAI_BASE_URL": f"{self.base_url}/v1",
+            "NEWS_API_BASE_URL": f"{self.base_url}/v2/top-headlines",
+            "WEB_SEARCH_BASE_URL": f"{self.base_url}/v1/search",
+        }
+
+    def start(self) -> "StubServers":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the NewsGenie stand-in servers")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    stubs = StubServers(
+        StubConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate),
+        port=args.port,
+    ).start()
+    for key, value in stubs.env().items():
+        print(f"export {key}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stubs.stop()
+
+
+if __name__ == "__main__":
+    main()